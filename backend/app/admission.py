@@ -0,0 +1,247 @@
+"""Global admission control for new bot sessions.
+
+Every running bot holds one slot. The slot limit starts at ``max_bots`` and
+is adapted to measured capacity: a monitor samples event-loop lag and CPU use,
+shrinks the limit when either is over budget and grows it back one slot at a
+time while healthy and the limit is in use. Bots in this process are measured
+here. With ``BOT_WORKERS``, each worker samples its own loop and CPU and relays
+them with its stats, and the busiest of this process and the workers counts.
+Requests over the limit wait in a bounded FIFO queue up to a deadline and are
+then rejected, so a spike degrades into fast 503s instead of slow calls.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Iterable, Optional, Tuple
+
+from .metrics import ADMISSION_REJECTIONS, ADMISSION_WAIT_MS
+
+logger = logging.getLogger("agent-console")
+
+
+class AdmissionRejected(RuntimeError):
+    def __init__(self, reason: str, retry_after_secs: int):
+        super().__init__(f"admission rejected: {reason}")
+        self.reason = reason
+        self.retry_after_secs = retry_after_secs
+
+
+class AdmissionTicket:
+    """One admitted bot slot; :meth:`release` is idempotent."""
+
+    __slots__ = ("_controller", "_released")
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release()
+
+
+class LoadSampler:
+    """Event-loop lag and process CPU share, measured across one sleep."""
+
+    def __init__(self, interval_secs: float):
+        self.interval_secs = interval_secs
+        self._last_wall, self._last_cpu = time.perf_counter(), time.process_time()
+
+    async def sample(self) -> Tuple[float, float]:
+        """Sleep one interval; return (loop lag ms, CPU share) since the last sample."""
+        started = time.perf_counter()
+        await asyncio.sleep(self.interval_secs)
+        now, cpu_now = time.perf_counter(), time.process_time()
+        lag_ms = max(0.0, (now - started - self.interval_secs) * 1000)
+        cpu = (cpu_now - self._last_cpu) / max(now - self._last_wall, 1e-6)
+        self._last_wall, self._last_cpu = now, cpu_now
+        return lag_ms, cpu
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_bots: int,
+        min_bots: int = 1,
+        queue_size: int = 50,
+        queue_timeout_secs: float = 5.0,
+        max_loop_lag_ms: float = 50.0,
+        max_cpu: float = 0.85,
+        sample_interval_secs: float = 0.5,
+        worker_load: Optional[Callable[[], Iterable[Tuple[float, float]]]] = None,
+    ):
+        self.max_bots = max_bots
+        self.min_bots = min(min_bots, max_bots)
+        self.limit = max_bots
+        self.queue_size = queue_size
+        self.queue_timeout_secs = queue_timeout_secs
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.max_cpu = max_cpu
+        self._sample_interval_secs = sample_interval_secs
+        # Returns (loop lag ms, CPU share) per bot worker process.
+        self.worker_load = worker_load
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.loop_lag_ms = 0.0
+        self.cpu = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def retry_after_secs(self) -> int:
+        return max(1, math.ceil(self.queue_timeout_secs))
+
+    async def acquire(self) -> AdmissionTicket:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return self._admit(0.0)
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout_secs)
+        except asyncio.TimeoutError:
+            self._reject("timeout")
+        except BaseException:
+            # Cancelled (e.g. the client went away) after a slot was handed over.
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        return self._admit((time.monotonic() - started) * 1000)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_bots": self.max_bots,
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "loop_lag_ms": round(self.loop_lag_ms, 1),
+            "cpu": round(self.cpu, 2),
+        }
+
+    def update_limit(self, loop_lag_ms: float, cpu: float) -> None:
+        """Adjust the limit from one capacity sample: grow additively, shrink by 10%."""
+        self.loop_lag_ms = loop_lag_ms
+        self.cpu = cpu
+        healthy = loop_lag_ms <= self.max_loop_lag_ms and cpu <= self.max_cpu
+        if self.active == 0:
+            # Load with no bots running (startup imports, RAG seeding, ingestion) says
+            # nothing about bot capacity: never shrink, and recover while idle and healthy.
+            if healthy and self.limit < self.max_bots:
+                self.limit += 1
+            return
+        if not healthy:
+            limit = max(self.min_bots, math.floor(min(self.limit, self.active) * 0.9))
+            if limit < self.limit:
+                logger.warning(
+                    "admission: lowering bot limit to %d (loop lag %.0f ms, cpu %.2f)",
+                    limit,
+                    loop_lag_ms,
+                    cpu,
+                )
+            self.limit = limit
+        elif self.limit < self.max_bots and (self.active >= self.limit or self._waiters):
+            self.limit += 1
+            self._wake()
+
+    def _admit(self, waited_ms: float) -> AdmissionTicket:
+        self.admitted += 1
+        ADMISSION_WAIT_MS.observe(waited_ms)
+        return AdmissionTicket(self)
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        ADMISSION_REJECTIONS.inc(reason=reason)
+        raise AdmissionRejected(reason, self.retry_after_secs)
+
+    def _release(self) -> None:
+        self.active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.active < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    async def _monitor(self) -> None:
+        sampler = LoadSampler(self._sample_interval_secs)
+        while True:
+            lag_ms, cpu = await sampler.sample()
+            if self.worker_load is not None:
+                for worker_lag_ms, worker_cpu in self.worker_load():
+                    lag_ms, cpu = max(lag_ms, worker_lag_ms), max(cpu, worker_cpu)
+            self.update_limit(lag_ms, cpu)
+
+
+_controller: AdmissionController | None = None
+
+
+def _default_max_bots() -> int:
+    # With bot worker processes, the ceiling is what the pool can hold.
+    workers = int(os.environ.get("BOT_WORKERS", "0"))
+    if workers > 0:
+        return workers * int(os.environ.get("BOT_WORKER_MAX_SESSIONS", "20"))
+    return 20
+
+
+def admission() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            max_bots=int(os.environ.get("ADMISSION_MAX_BOTS") or _default_max_bots()),
+            queue_size=int(os.environ.get("ADMISSION_QUEUE_SIZE", "50")),
+            queue_timeout_secs=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECS", "5")),
+            max_loop_lag_ms=float(os.environ.get("ADMISSION_MAX_LOOP_LAG_MS", "50")),
+            max_cpu=float(os.environ.get("ADMISSION_MAX_CPU", "0.85")),
+        )
+    return _controller
+
+
+def start_admission(
+    worker_load: Optional[Callable[[], Iterable[Tuple[float, float]]]] = None,
+) -> AdmissionController:
+    controller = admission()
+    if worker_load is not None:
+        controller.worker_load = worker_load
+    controller.start()
+    return controller
+
+
+async def stop_admission() -> None:
+    global _controller
+    if _controller is not None:
+        await _controller.stop()
+        _controller = None
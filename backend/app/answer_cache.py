@@ -0,0 +1,285 @@
+"""Semantic answer cache that lets repeated questions skip the LLM.
+
+Answers the LLM gives to a user turn are stored with the turn's embedding,
+scoped by model and system prompt. When a later turn's embedding is within
+``threshold`` cosine similarity of a cached question in the same scope, the
+cached answer is streamed straight to TTS and the LLM call is skipped.
+
+Only a call's opening question is looked up or stored. A later turn ("yes",
+"how much is that?") depends on the conversation so far, and its answer must
+never be replayed in another caller's call.
+
+Two processors share one :class:`AnswerCacheSession` per bot: the
+``AnswerCacheProcessor`` sits before retrieval and serves hits, the
+``AnswerRecorder`` sits after the LLM and stores completed, uninterrupted
+answers for the misses. Enable with ``ANSWER_CACHE=1``.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    FunctionCallsStartedFrame,
+    InterruptionFrame,
+    LLMContextFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    LLMMessagesFrame,
+    LLMTextFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from . import rag
+from .context_window import is_summary_slot
+from .embedding_cache import normalize
+from .metrics import ANSWER_CACHE_LOOKUPS, ANSWER_CACHE_SAVED_MS
+
+logger = logging.getLogger("agent-console")
+
+Key = Tuple[str, str]
+
+
+def answer_scope(system_prompt: str, model: str) -> str:
+    """Cached answers are only reused for the same model and system prompt."""
+    return hashlib.sha256(f"{model}\n{system_prompt}".encode()).hexdigest()[:16]
+
+
+class CachedAnswer:
+    __slots__ = ("question", "answer", "vector", "created_at", "generation_ms", "hits")
+
+    def __init__(self, question: str, answer: str, vector: np.ndarray, generation_ms: float):
+        self.question = question
+        self.answer = answer
+        self.vector = vector
+        self.created_at = time.time()
+        self.generation_ms = generation_ms
+        self.hits = 0
+
+
+class SemanticAnswerCache:
+    """LRU + TTL cache of answers, looked up by question embedding similarity."""
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 1000,
+        ttl_secs: float = 24 * 3600,
+        max_answer_chars: int = 1000,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self.max_answer_chars = max_answer_chars
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_ms = 0.0
+        # LRU order across scopes; _scopes indexes the same entries by scope for lookups.
+        self._entries: "OrderedDict[Key, CachedAnswer]" = OrderedDict()
+        self._scopes: Dict[str, Dict[str, CachedAnswer]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, scope: str, vector) -> Optional[CachedAnswer]:
+        entries = self._scopes.get(scope)
+        best = None
+        if entries:
+            self._expire(scope, entries)
+            if entries:
+                keys = list(entries)
+                matrix = np.stack([entries[k].vector for k in keys])
+                scores = matrix @ _unit(vector)
+                i = int(np.argmax(scores))
+                if scores[i] >= self.threshold:
+                    best = entries[keys[i]]
+                    self._entries.move_to_end((scope, keys[i]))
+        if best is None:
+            self.misses += 1
+            ANSWER_CACHE_LOOKUPS.inc(outcome="miss")
+            return None
+        best.hits += 1
+        self.hits += 1
+        self.saved_ms += best.generation_ms
+        ANSWER_CACHE_LOOKUPS.inc(outcome="hit")
+        ANSWER_CACHE_SAVED_MS.observe(best.generation_ms)
+        return best
+
+    def put(
+        self, scope: str, question: str, vector, answer: str, generation_ms: float = 0.0
+    ) -> bool:
+        answer = answer.strip()
+        if not answer or len(answer) > self.max_answer_chars:
+            return False
+        text = normalize(question)
+        entry = CachedAnswer(text, answer, _unit(vector), generation_ms)
+        self._entries[(scope, text)] = entry
+        self._entries.move_to_end((scope, text))
+        self._scopes.setdefault(scope, {})[text] = entry
+        while len(self._entries) > self.max_entries:
+            (old_scope, old_text), _ = self._entries.popitem(last=False)
+            self._drop(old_scope, old_text)
+            self.evictions += 1
+        return True
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else None,
+            "saved_ms": round(self.saved_ms),
+        }
+
+    def _expire(self, scope: str, entries: Dict[str, CachedAnswer]) -> None:
+        cutoff = time.time() - self.ttl_secs
+        for text in [t for t, e in entries.items() if e.created_at < cutoff]:
+            del self._entries[(scope, text)]
+            self._drop(scope, text)
+            self.evictions += 1
+
+    def _drop(self, scope: str, text: str) -> None:
+        entries = self._scopes[scope]
+        del entries[text]
+        if not entries:
+            del self._scopes[scope]
+
+
+def _unit(vector) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm else array
+
+
+def _opening_question(messages) -> str | None:
+    """The user's text if this is the first turn of the call, else ``None``."""
+    users = [m for m in messages if isinstance(m, dict) and m.get("role") == "user"]
+    # A summary slot means earlier turns were folded away, so this is not the opener.
+    if len(users) != 1 or any(is_summary_slot(m) for m in messages):
+        return None
+    content = users[0].get("content")
+    return content if isinstance(content, str) and content.strip() else None
+
+
+class AnswerCacheSession:
+    """Per-bot state shared by ``AnswerCacheProcessor`` and ``AnswerRecorder``."""
+
+    def __init__(self, cache: SemanticAnswerCache, scope: str, timeout_secs: float = 0.3):
+        self.cache = cache
+        self.scope = scope
+        self.timeout_secs = timeout_secs
+        # (question, vector, monotonic start) of the turn the LLM is answering.
+        self.pending: Optional[Tuple[str, list, float]] = None
+
+    async def answer(self, messages) -> Optional[str]:
+        """Return a cached answer for the opening turn, or remember it as pending."""
+        self.pending = None
+        question = _opening_question(messages)
+        if question is None:
+            return None
+        try:
+            vector = (
+                await asyncio.wait_for(rag._aembed([question]), timeout=self.timeout_secs)
+            )[0]
+        except Exception:
+            ANSWER_CACHE_LOOKUPS.inc(outcome="error")
+            logger.warning("answer cache: embedding failed, calling the LLM", exc_info=True)
+            return None
+        entry = self.cache.lookup(self.scope, vector)
+        if entry is not None:
+            return entry.answer
+        self.pending = (question, vector, time.monotonic())
+        return None
+
+    def store(self, answer: str) -> None:
+        if self.pending is None:
+            return
+        question, vector, started = self.pending
+        self.pending = None
+        self.cache.put(
+            self.scope, question, vector, answer, (time.monotonic() - started) * 1000
+        )
+
+
+class AnswerCacheProcessor(FrameProcessor):
+    """Placed before retrieval; answers cache hits without forwarding the context."""
+
+    def __init__(self, session: AnswerCacheSession, **kwargs):
+        super().__init__(**kwargs)
+        self._session = session
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if direction == FrameDirection.DOWNSTREAM and isinstance(
+            frame, (LLMContextFrame, LLMMessagesFrame)
+        ):
+            if isinstance(frame, LLMContextFrame):
+                messages = frame.context.get_messages()
+            else:
+                messages = frame.messages
+            answer = await self._session.answer(messages)
+            if answer is not None:
+                await self.push_frame(LLMFullResponseStartFrame())
+                await self.push_frame(LLMTextFrame(answer))
+                await self.push_frame(LLMFullResponseEndFrame())
+                return
+
+        await self.push_frame(frame, direction)
+
+
+class AnswerRecorder(FrameProcessor):
+    """Placed after the LLM; caches answers that finish without interruption."""
+
+    def __init__(self, session: AnswerCacheSession, **kwargs):
+        super().__init__(**kwargs)
+        self._session = session
+        self._text: Optional[list] = None
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, LLMFullResponseStartFrame):
+            self._text = [] if self._session.pending is not None else None
+        elif isinstance(frame, LLMTextFrame):
+            if self._text is not None:
+                self._text.append(frame.text)
+        elif isinstance(frame, LLMFullResponseEndFrame):
+            if self._text is not None:
+                self._session.store("".join(self._text))
+            self._text = None
+        elif isinstance(
+            frame, (InterruptionFrame, FunctionCallsStartedFrame, EndFrame, CancelFrame)
+        ):
+            # Partial or tool-dependent answers must not be replayed later.
+            self._text = None
+            self._session.pending = None
+
+        await self.push_frame(frame, direction)
+
+
+_cache: SemanticAnswerCache | None = None
+
+
+def answer_cache() -> SemanticAnswerCache | None:
+    """The process-wide cache, or ``None`` unless ``ANSWER_CACHE`` is enabled."""
+    global _cache
+    if _cache is None and os.environ.get("ANSWER_CACHE", "0").lower() in ("1", "true", "yes"):
+        _cache = SemanticAnswerCache(
+            threshold=float(os.environ.get("ANSWER_CACHE_THRESHOLD", "0.95")),
+            max_entries=int(os.environ.get("ANSWER_CACHE_SIZE", "1000")),
+            ttl_secs=float(os.environ.get("ANSWER_CACHE_TTL_SECS", str(24 * 3600))),
+        )
+    return _cache
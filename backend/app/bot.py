@@ -1,16 +1,15 @@
 import os
 import asyncio
-
-import aiohttp
+import logging
 
 from pipecat.audio.interruptions.min_words_interruption_strategy import (
     MinWordsInterruptionStrategy,
 )
-from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.audio.vad.vad_analyzer import VADParams
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
+from pipecat.processors.frame_processor import FrameProcessor
 from pipecat.processors.aggregators.llm_context import LLMContext
 from pipecat.processors.aggregators.llm_response_universal import (
     LLMContextAggregatorPair,
@@ -24,9 +23,36 @@ from pipecat.services.deepgram.stt import DeepgramSTTService
 from pipecat.services.openai.llm import OpenAILLMService
 from pipecat.transports.daily.transport import DailyParams, DailyTransport
 
+from .answer_cache import (
+    AnswerCacheProcessor,
+    AnswerCacheSession,
+    AnswerRecorder,
+    answer_cache,
+    answer_scope,
+)
+from .clients import clients
+from .context_window import ContextWindowProcessor
+from .embedding_cache import embedding_cache
 from .models import AgentConfig
 from .observability import BotStateObserver
-from .rag_processor import RAGProcessor
+from .rag import init_collection_locked
+from .rag_processor import (
+    InterimRetrievalProcessor,
+    RAGProcessor,
+    SpeculativeRetrieval,
+    speculation_stats,
+)
+from .tts_cache import CachedCartesiaTTSService, prewarm_texts, prewarm_tts_cache, tts_cache
+from .vad import SharedSileroVADAnalyzer, load_vad_model
+
+logger = logging.getLogger("agent-console")
+
+
+class PooledOpenAILLMService(OpenAILLMService):
+    """OpenAI LLM service that uses the process-wide client instead of one per bot."""
+
+    def create_client(self, api_key=None, base_url=None, **kwargs):
+        return clients().openai()
 
 
 async def run_bot(
@@ -36,119 +62,234 @@ async def run_bot(
     on_state_change,
     on_latency,
     on_error,
+    on_stage_latency=None,
 ) -> None:
-    # Map STT temperature loosely to VAD confidence (higher temp -> lower confidence)
-    vad_confidence = max(0.3, min(0.9, 0.9 - (config.stt.temperature * 0.5)))
-    vad_params = VADParams(
-        confidence=vad_confidence,
-        start_secs=0.2,
-        stop_secs=0.8,
-        min_volume=0.6,
+    transport = DailyTransport(
+        room_url,
+        token,
+        "Agent",
+        DailyParams(
+            api_url=os.environ.get("DAILY_API_URL", "https://api.daily.co/v1"),
+            api_key=os.environ.get("DAILY_API_KEY"),
+            audio_in_enabled=True,
+            audio_out_enabled=True,
+            transcription_enabled=True,
+        ),
+    )
+
+    stt = DeepgramSTTService(
+        api_key=os.environ.get("DEEPGRAM_API_KEY"),
     )
 
+    llm = PooledOpenAILLMService(
+        api_key=os.environ.get("OPENAI_API_KEY"),
+        model=_llm_model(),
+        temperature=config.llm.temperature,
+        max_tokens=config.llm.max_tokens,
+    )
+
+    tts = _make_tts(config)
+
+    observer = BotStateObserver(
+        on_state_change=on_state_change,
+        on_latency=on_latency,
+        on_error=on_error,
+        on_stage_latency=on_stage_latency,
+    )
+
+    task = build_pipeline_task(
+        config,
+        transport_input=transport.input(),
+        stt=stt,
+        llm=llm,
+        tts=tts,
+        transport_output=transport.output(),
+        observer=observer,
+        vad_analyzer=SharedSileroVADAnalyzer(params=_vad_params(config)),
+    )
+
+    @transport.event_handler("on_first_participant_joined")
+    async def on_first_participant_joined(transport, participant):
+        await transport.capture_participant_transcription(participant["id"])
+
+    runner = PipelineRunner()
+    await runner.run(task)
+
+
+def _make_tts(config: AgentConfig) -> CartesiaTTSService:
+    voice_id = config.tts.voice
+    if not voice_id:
+        voice_id = os.environ.get("CARTESIA_DEFAULT_VOICE_ID")
+    if not voice_id:
+        raise RuntimeError("CARTESIA_DEFAULT_VOICE_ID is not set")
+
+    kwargs = dict(
+        api_key=os.environ.get("CARTESIA_API_KEY"),
+        voice_id=voice_id,
+        speed=config.tts.speed,
+        temperature=config.tts.temperature,
+    )
+    cache = tts_cache()
+    if cache is not None:
+        return CachedCartesiaTTSService(cache=cache, **kwargs)
+    return CartesiaTTSService(**kwargs)
+
+
+def build_pipeline_task(
+    config: AgentConfig,
+    *,
+    transport_input,
+    stt,
+    llm,
+    tts,
+    transport_output,
+    observer: BotStateObserver,
+    vad_analyzer=None,
+) -> PipelineTask:
+    """Assemble the per-session pipeline around the given I/O and provider processors.
+
+    ``run_bot`` passes the real Daily/Deepgram/OpenAI/Cartesia services; the
+    benchmark harness passes the fakes from ``bench.fakes``.
+    """
     allow_interruptions, min_words = _map_interruptibility(config.interruptibility_pct)
 
-    async with aiohttp.ClientSession() as http_session:
-        transport = DailyTransport(
-            room_url,
-            token,
-            "Agent",
-            DailyParams(
-                api_url=os.environ.get("DAILY_API_URL", "https://api.daily.co/v1"),
-                api_key=os.environ.get("DAILY_API_KEY"),
-                audio_in_enabled=True,
-                audio_out_enabled=True,
-                transcription_enabled=True,
-            ),
-        )
+    context = LLMContext(
+        messages=[
+            {
+                "role": "system",
+                "content": config.llm.system_prompt,
+            }
+        ]
+    )
 
-        stt = DeepgramSTTService(
-            api_key=os.environ.get("DEEPGRAM_API_KEY"),
-            http_session=http_session,
+    user_turn_strategies = None
+    if allow_interruptions:
+        user_turn_strategies = UserTurnStrategies(
+            start=[MinWordsUserTurnStartStrategy(min_words=min_words)],
+            stop=[TranscriptionUserTurnStopStrategy(timeout=0.5)],
         )
 
-        llm = OpenAILLMService(
-            api_key=os.environ.get("OPENAI_API_KEY"),
-            model=os.environ.get("OPENAI_MODEL", "gpt-4o-mini"),
-            temperature=config.llm.temperature,
-            max_tokens=config.llm.max_tokens,
-        )
+    user_params = LLMUserAggregatorParams(
+        vad_analyzer=vad_analyzer,
+        user_turn_strategies=user_turn_strategies,
+    )
 
-        voice_id = config.tts.voice
-        if not voice_id:
-            voice_id = os.environ.get("CARTESIA_DEFAULT_VOICE_ID")
-        if not voice_id:
-            raise RuntimeError("CARTESIA_DEFAULT_VOICE_ID is not set")
-
-        tts = CartesiaTTSService(
-            api_key=os.environ.get("CARTESIA_API_KEY"),
-            voice_id=voice_id,
-            speed=config.tts.speed,
-            temperature=config.tts.temperature,
-            http_session=http_session,
-        )
+    user_aggregator, assistant_aggregator = LLMContextAggregatorPair(
+        context,
+        user_params=user_params,
+    )
 
-        context = LLMContext(
-            messages=[
-                {
-                    "role": "system",
-                    "content": config.llm.system_prompt,
-                }
-            ]
-        )
+    speculation = SpeculativeRetrieval()
 
-        user_turn_strategies = None
-        if allow_interruptions:
-            user_turn_strategies = UserTurnStrategies(
-                start=[MinWordsUserTurnStartStrategy(min_words=min_words)],
-                stop=[TranscriptionUserTurnStopStrategy(timeout=0.5)],
-            )
+    processors = [
+        transport_input,
+        stt,
+        InterimRetrievalProcessor(speculation),
+        user_aggregator,
+        RAGProcessor(speculation=speculation),
+        ContextWindowProcessor(reserve_tokens=config.llm.max_tokens),
+        llm,
+        tts,
+        transport_output,
+        assistant_aggregator,
+    ]
+    cache = answer_cache()
+    if cache is not None:
+        # Hits are answered before retrieval; misses are recorded after the LLM.
+        session = AnswerCacheSession(cache, answer_scope(config.llm.system_prompt, _llm_model()))
+        processors.insert(processors.index(llm) + 1, AnswerRecorder(session))
+        processors.insert(processors.index(user_aggregator) + 1, AnswerCacheProcessor(session))
 
-        user_params = LLMUserAggregatorParams(
-            vad_analyzer=SileroVADAnalyzer(params=vad_params),
-            user_turn_strategies=user_turn_strategies,
-        )
+    pipeline = Pipeline(processors)
 
-        user_aggregator, assistant_aggregator = LLMContextAggregatorPair(
-            context,
-            user_params=user_params,
-        )
+    params = PipelineParams(
+        allow_interruptions=allow_interruptions,
+        interruption_strategies=(
+            [MinWordsInterruptionStrategy(min_words=min_words)]
+            if allow_interruptions
+            else []
+        ),
+        observers=[observer],
+    )
 
-        observer = BotStateObserver(
-            on_state_change=on_state_change, on_latency=on_latency, on_error=on_error
-        )
+    return PipelineTask(pipeline, params=params)
 
-        pipeline = Pipeline(
-            [
-                transport.input(),
-                stt,
-                user_aggregator,
-                RAGProcessor(),
-                llm,
-                tts,
-                transport.output(),
-                assistant_aggregator,
-            ]
-        )
 
-        params = PipelineParams(
-            allow_interruptions=allow_interruptions,
-            interruption_strategies=(
-                [MinWordsInterruptionStrategy(min_words=min_words)]
-                if allow_interruptions
-                else []
-            ),
-            observers=[observer],
-        )
+def prewarm() -> None:
+    """Pay one-time startup costs before the first call instead of during it.
+
+    Loads the shared VAD model, opens the pooled provider clients and builds
+    a throwaway pipeline so aggregator, RAG and observer setup is warm.
+    """
+    load_vad_model()
+    clients().openai()
+    if tts_cache() is not None:
+        # Only the TTS cache's background synthesis goes over Cartesia's HTTP API.
+        clients().http("cartesia")
+
+    config = AgentConfig()
+    build_pipeline_task(
+        config,
+        transport_input=FrameProcessor(name="prewarm-input"),
+        stt=FrameProcessor(name="prewarm-stt"),
+        llm=FrameProcessor(name="prewarm-llm"),
+        tts=FrameProcessor(name="prewarm-tts"),
+        transport_output=FrameProcessor(name="prewarm-output"),
+        observer=BotStateObserver(
+            on_state_change=lambda state: None,
+            on_latency=lambda ms: None,
+            on_error=lambda error: None,
+        ),
+        vad_analyzer=SharedSileroVADAnalyzer(params=_vad_params(config)),
+    )
+
+
+async def prewarm_tts(config: AgentConfig | None = None) -> int:
+    """Synthesize the ``TTS_CACHE_PREWARM_FILE`` utterances for the default voice."""
+    texts = prewarm_texts()
+    if tts_cache() is None or not texts:
+        return 0
+    try:
+        tts = _make_tts(config or AgentConfig())
+        return await prewarm_tts_cache(tts, texts, PipelineParams().audio_out_sample_rate)
+    except Exception:
+        logger.exception("TTS cache prewarm failed")
+        return 0
+
+
+def runtime_stats() -> dict:
+    """Cache and retrieval stats of the bots in this process (relayed by bot workers)."""
+    answers, audio = answer_cache(), tts_cache()
+    return {
+        "embedding_cache": embedding_cache().stats(),
+        "speculation": speculation_stats(),
+        "answer_cache": answers.stats() if answers else None,
+        "tts_cache": audio.stats() if audio else None,
+    }
+
+
+def init_bot_worker() -> None:
+    """Initializer for bot worker processes (see ``app.workers``)."""
+    try:
+        init_collection_locked()
+    except Exception:
+        logger.exception("RAG init failed")
+    prewarm()
+
 
-        task = PipelineTask(pipeline, params=params)
+def _llm_model() -> str:
+    return os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
 
-        @transport.event_handler("on_first_participant_joined")
-        async def on_first_participant_joined(transport, participant):
-            await transport.capture_participant_transcription(participant["id"])
 
-        runner = PipelineRunner()
-        await runner.run(task)
+def _vad_params(config: AgentConfig) -> VADParams:
+    # Map STT temperature loosely to VAD confidence (higher temp -> lower confidence)
+    vad_confidence = max(0.3, min(0.9, 0.9 - (config.stt.temperature * 0.5)))
+    return VADParams(
+        confidence=vad_confidence,
+        start_secs=0.2,
+        stop_secs=0.8,
+        min_volume=0.6,
+    )
 
 
 def _map_interruptibility(pct: int) -> tuple[bool, int]:
@@ -0,0 +1,213 @@
+import logging
+import os
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import aiohttp
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+    from qdrant_client import AsyncQdrantClient, QdrantClient
+    from redis.asyncio import Redis
+
+logger = logging.getLogger("agent-console")
+
+HTTP_PROVIDERS = ("daily", "cartesia")
+
+
+class ClientRegistry:
+    """Process-wide, keep-alive clients for every external provider.
+
+    Each provider gets one connection pool that all sessions share, so a turn
+    reuses warm TCP/TLS connections instead of opening new ones. Clients are
+    created on first use and closed together by :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_per_host: int = 20,
+        keepalive_secs: float = 30.0,
+    ):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.keepalive_secs = keepalive_secs
+        self._http: Dict[str, "aiohttp.ClientSession"] = {}
+        self._openai: Optional["AsyncOpenAI"] = None
+        self._openai_no_retry: Optional["AsyncOpenAI"] = None
+        self._openai_sync: Optional["OpenAI"] = None
+        self._qdrant: Optional["AsyncQdrantClient"] = None
+        self._qdrant_sync: Optional["QdrantClient"] = None
+        self._redis: Optional["Redis"] = None
+
+    def http(self, provider: str) -> "aiohttp.ClientSession":
+        session = self._http.get(provider)
+        if session is None or session.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_per_host,
+                keepalive_timeout=self.keepalive_secs,
+                ttl_dns_cache=300,
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._http[provider] = session
+        return session
+
+    def openai(self, retries: bool = True) -> "AsyncOpenAI":
+        """Shared async OpenAI client; ``retries=False`` for latency-budgeted calls."""
+        if self._openai is None:
+            # The SDK takes most of a second to import, so it is loaded on first use.
+            import httpx
+            from openai import AsyncOpenAI
+
+            self._openai = AsyncOpenAI(
+                api_key=os.environ.get("OPENAI_API_KEY"),
+                http_client=httpx.AsyncClient(limits=self._httpx_limits(), timeout=60.0),
+            )
+        if retries:
+            return self._openai
+        if self._openai_no_retry is None:
+            # Same connection pool, different retry policy.
+            self._openai_no_retry = self._openai.with_options(max_retries=0)
+        return self._openai_no_retry
+
+    def openai_sync(self) -> "OpenAI":
+        if self._openai_sync is None:
+            import httpx
+            from openai import OpenAI
+
+            self._openai_sync = OpenAI(
+                api_key=os.environ.get("OPENAI_API_KEY"),
+                http_client=httpx.Client(limits=self._httpx_limits(), timeout=60.0),
+            )
+        return self._openai_sync
+
+    def qdrant(self) -> "AsyncQdrantClient":
+        if self._qdrant is None:
+            # Imported lazily so deployments without Qdrant don't need qdrant-client.
+            from qdrant_client import AsyncQdrantClient
+
+            self._qdrant = AsyncQdrantClient(url=_qdrant_url(), limits=self._httpx_limits())
+        return self._qdrant
+
+    def qdrant_sync(self) -> "QdrantClient":
+        if self._qdrant_sync is None:
+            from qdrant_client import QdrantClient
+
+            self._qdrant_sync = QdrantClient(url=_qdrant_url(), limits=self._httpx_limits())
+        return self._qdrant_sync
+
+    def redis(self) -> "Redis":
+        if self._redis is None:
+            # Imported lazily so single-process deployments don't need redis-py.
+            from redis.asyncio import Redis
+
+            self._redis = Redis.from_url(
+                os.environ.get("REDIS_URL", "redis://redis:6379/0"),
+                max_connections=self.max_connections,
+                health_check_interval=self.keepalive_secs,
+            )
+        return self._redis
+
+    def override(self, *, openai=None, openai_sync=None, redis=None) -> None:
+        """Install stand-in clients, e.g. the offline fakes used by benchmarks and tests."""
+        if openai is not None:
+            self._openai = self._openai_no_retry = openai
+        if openai_sync is not None:
+            self._openai_sync = openai_sync
+        if redis is not None:
+            self._redis = redis
+
+    def stats(self) -> dict:
+        pools = {name: _aiohttp_stats(session) for name, session in self._http.items()}
+        if self._openai is not None:
+            pools["openai"] = _httpx_stats(
+                getattr(self._openai, "_client", None), self.max_connections
+            )
+        return pools
+
+    async def close(self) -> None:
+        for session in self._http.values():
+            await session.close()
+        self._http.clear()
+        if self._openai is not None:
+            await self._openai.close()
+        if self._openai_sync is not None:
+            self._openai_sync.close()
+        for client in (self._qdrant, self._qdrant_sync):
+            if client is None:
+                continue
+            try:
+                result = client.close()
+                if hasattr(result, "__await__"):
+                    await result
+            except Exception:
+                logger.warning("clients: failed to close qdrant client", exc_info=True)
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                logger.warning("clients: failed to close redis client", exc_info=True)
+        self._openai = self._openai_no_retry = self._openai_sync = None
+        self._qdrant = self._qdrant_sync = self._redis = None
+
+    def _httpx_limits(self) -> "httpx.Limits":
+        import httpx
+
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_per_host,
+            keepalive_expiry=self.keepalive_secs,
+        )
+
+
+def _qdrant_url() -> str:
+    return os.environ.get("QDRANT_URL", "http://qdrant:6333")
+
+
+def _aiohttp_stats(session: "aiohttp.ClientSession") -> dict:
+    connector = session.connector
+    in_use = len(getattr(connector, "_acquired", ()))
+    idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+    limit = connector.limit if connector else 0
+    return {
+        "in_use": in_use,
+        "idle": idle,
+        "limit": limit,
+        "utilization": (in_use / limit) if limit else None,
+    }
+
+
+def _httpx_stats(client: "httpx.AsyncClient | None", limit: int) -> dict:
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    idle = sum(1 for c in connections if c.is_idle())
+    in_use = len(connections) - idle
+    return {
+        "in_use": in_use,
+        "idle": idle,
+        "limit": limit,
+        "utilization": (in_use / limit) if limit else None,
+    }
+
+
+_registry: ClientRegistry | None = None
+
+
+def clients() -> ClientRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ClientRegistry(
+            max_connections=int(os.environ.get("HTTP_POOL_MAX_CONNECTIONS", "100")),
+            max_per_host=int(os.environ.get("HTTP_POOL_MAX_PER_HOST", "20")),
+            keepalive_secs=float(os.environ.get("HTTP_POOL_KEEPALIVE_SECS", "30")),
+        )
+    return _registry
+
+
+async def close_clients() -> None:
+    global _registry
+    if _registry is not None:
+        await _registry.close()
+        _registry = None
@@ -0,0 +1,207 @@
+"""Bounded LLM context for long calls.
+
+``ContextWindowProcessor`` sits right before the LLM. It keeps the leading
+system prompt, a rolling summary slot and the most recent whole turns that
+fit in a token budget. Older turns are dropped from the prompt and handed to a
+background task that folds them into the summary, so summarization never
+delays a reply; the refreshed summary is used from the next turn on.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional
+
+from pipecat.frames.frames import LLMContextFrame, LLMMessagesFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from .clients import clients
+from .metrics import CONTEXT_SUMMARIES, PROMPT_TOKENS
+from .rag import estimate_tokens
+from .rag_processor import is_retrieval_slot
+
+logger = logging.getLogger("agent-console")
+
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+_SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a customer support call. Merge the previous summary "
+    "and the new transcript into one short summary that keeps the customer's problem, "
+    "account or device details, what was already tried or promised, and open questions. "
+    "Reply with the summary only."
+)
+
+Summarizer = Callable[[Optional[str], List[dict]], Awaitable[str]]
+
+
+def _role(message) -> str | None:
+    return message.get("role") if isinstance(message, dict) else None
+
+
+def is_summary_slot(message) -> bool:
+    return _role(message) == "system" and str(message.get("content", "")).startswith(
+        SUMMARY_HEADER
+    )
+
+
+def message_tokens(message) -> int:
+    if not isinstance(message, dict):
+        return estimate_tokens(str(message))
+    content = message.get("content")
+    text = content if isinstance(content, str) else str(content or "")
+    # Tool calls carry their arguments outside ``content``.
+    if message.get("tool_calls"):
+        text += str(message["tool_calls"])
+    return estimate_tokens(text) + 4
+
+
+def prompt_tokens(messages: list) -> int:
+    return sum(message_tokens(m) for m in messages)
+
+
+def _transcript(messages: List[dict]) -> str:
+    lines = []
+    for message in messages:
+        role = _role(message) or "message"
+        content = message.get("content") if isinstance(message, dict) else message
+        if content:
+            lines.append(f"{role}: {content}")
+    return "\n".join(lines)
+
+
+async def summarize_turns(previous: Optional[str], messages: List[dict]) -> str:
+    """Fold ``messages`` into ``previous`` with one small chat completion."""
+    prompt = (
+        f"Previous summary:\n{previous or '(none)'}\n\n"
+        f"New transcript:\n{_transcript(messages)}"
+    )
+    resp = await clients().openai().chat.completions.create(
+        model=os.environ.get("CONTEXT_SUMMARY_MODEL")
+        or os.environ.get("OPENAI_MODEL", "gpt-4o-mini"),
+        messages=[
+            {"role": "system", "content": _SUMMARY_INSTRUCTIONS},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0,
+        max_tokens=int(os.environ.get("CONTEXT_SUMMARY_MAX_TOKENS", "250")),
+    )
+    return (resp.choices[0].message.content or "").strip()
+
+
+class ContextWindowProcessor(FrameProcessor):
+    """Keeps the prompt within budget: system prompt + summary + recent turns.
+
+    ``token_budget`` bounds the recent turns. The whole prompt plus the reply's
+    ``reserve_tokens`` (``LLMConfig.max_tokens``) is additionally kept under
+    ``max_context_tokens``. The latest user turn is always kept.
+    """
+
+    def __init__(
+        self,
+        reserve_tokens: int = 512,
+        token_budget: int | None = None,
+        max_context_tokens: int | None = None,
+        summarize: Summarizer = summarize_turns,
+        max_pending_tokens: int = 8000,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        if token_budget is None:
+            token_budget = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "2000"))
+        if max_context_tokens is None:
+            max_context_tokens = int(os.environ.get("CONTEXT_MAX_TOKENS", "16000"))
+        self._reserve_tokens = reserve_tokens
+        self._token_budget = token_budget
+        self._max_context_tokens = max_context_tokens
+        self._summarize = summarize
+        self._max_pending_tokens = max_pending_tokens
+        self.summary: Optional[str] = None
+        self._pending: List[dict] = []
+        self._task: Optional[asyncio.Task] = None
+        self.last_prompt_tokens = 0
+
+    def window_messages(self, messages: list) -> list:
+        head = []
+        for message in messages:
+            if _role(message) != "system" or is_summary_slot(message) or is_retrieval_slot(message):
+                break
+            head.append(message)
+        rest = [m for m in messages[len(head) :] if not is_summary_slot(m)]
+        retrieval = next((m for m in rest if is_retrieval_slot(m)), None)
+        rest = [m for m in rest if m is not retrieval]
+
+        summary = None
+        if self.summary:
+            summary = {"role": "system", "content": f"{SUMMARY_HEADER}\n{self.summary}"}
+        fixed = prompt_tokens([m for m in (*head, summary, retrieval) if m is not None])
+        budget = min(
+            self._token_budget, self._max_context_tokens - self._reserve_tokens - fixed
+        )
+
+        start = self._window_start(rest, budget)
+        if start:
+            self._queue_summary(rest[:start])
+        recent = rest[start:]
+        if retrieval is not None:
+            # The retrieval slot stays just before the latest user message.
+            last_user = max(
+                (i for i, m in enumerate(recent) if _role(m) == "user"), default=len(recent)
+            )
+            recent.insert(last_user, retrieval)
+
+        windowed = head + ([summary] if summary else []) + recent
+        self.last_prompt_tokens = prompt_tokens(windowed)
+        PROMPT_TOKENS.observe(self.last_prompt_tokens)
+        return windowed
+
+    def _window_start(self, rest: list, budget: int) -> int:
+        # Only cut where a user turn starts, so assistant replies and tool
+        # results are never separated from the turn that produced them.
+        turn_starts = [i for i, m in enumerate(rest) if _role(m) == "user"]
+        if not turn_starts:
+            return 0
+        start = turn_starts[-1]
+        used = prompt_tokens(rest[start:])
+        for candidate in reversed(turn_starts[:-1]):
+            cost = prompt_tokens(rest[candidate:start])
+            if used + cost > budget:
+                break
+            used += cost
+            start = candidate
+        return start
+
+    def _queue_summary(self, dropped: List[dict]) -> None:
+        self._pending.extend(dropped)
+        # If the summarizer falls behind, forget the oldest turns rather than grow without bound.
+        while len(self._pending) > 1 and prompt_tokens(self._pending) > self._max_pending_tokens:
+            self._pending.pop(0)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._fold())
+
+    async def _fold(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                self.summary = await self._summarize(self.summary, batch) or self.summary
+                CONTEXT_SUMMARIES.inc(outcome="ok")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                CONTEXT_SUMMARIES.inc(outcome="error")
+                logger.warning("context: summarizing %d messages failed", len(batch), exc_info=True)
+
+    async def cleanup(self):
+        await super().cleanup()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if direction == FrameDirection.DOWNSTREAM:
+            if isinstance(frame, LLMContextFrame):
+                frame.context.set_messages(self.window_messages(list(frame.context.get_messages())))
+            elif isinstance(frame, LLMMessagesFrame):
+                frame = LLMMessagesFrame(messages=self.window_messages(list(frame.messages)))
+
+        await self.push_frame(frame, direction)
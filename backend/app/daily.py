@@ -2,20 +2,19 @@ import asyncio
 import os
 import random
 import time
+from dataclasses import dataclass
 from typing import Tuple
 
-import aiohttp
-
-from pipecat.transports.daily.utils import (
-    DailyRESTHelper,
-    DailyRoomParams,
-    DailyRoomProperties,
-)
-
 import logging
 
+from .clients import clients
+from .metrics import DAILY_RETRIES
+
 logger = logging.getLogger("agent-console")
 
+# Rooms and their tokens share one lifetime.
+ROOM_TTL_SECS = int(os.environ.get("ROOM_TTL_SECS", str(60 * 60)))
+
 
 async def _retry_async(operation, *, attempts: int, base_delay: float, name: str):
     last_exc = None
@@ -26,6 +25,7 @@ async def _retry_async(operation, *, attempts: int, base_delay: float, name: str
             last_exc = exc
             if attempt >= attempts:
                 break
+            DAILY_RETRIES.inc(operation=name)
             # Exponential backoff with small jitter
             delay = base_delay * (2 ** (attempt - 1))
             delay += random.uniform(0, base_delay)
@@ -40,42 +40,73 @@ async def _retry_async(operation, *, attempts: int, base_delay: float, name: str
             await asyncio.sleep(delay)
     raise last_exc
 
-async def create_room_and_tokens(session_name: str) -> Tuple[str, str, str]:
-    api_key = os.environ.get("DAILY_API_KEY")
-    if not api_key:
-        raise RuntimeError("DAILY_API_KEY is not set")
-
-    async with aiohttp.ClientSession() as session:
-        helper = DailyRESTHelper(daily_api_key=api_key, aiohttp_session=session)
-
-        async def _create_room():
-            return await helper.create_room(
-                DailyRoomParams(
-                    name=session_name,
-                    properties=DailyRoomProperties(
-                        exp=int(time.time()) + 60 * 60,
-                        enable_chat=False,
-                        enable_screenshare=False,
-                    ),
-                )
-            )
+@dataclass
+class DailyRoom:
+    url: str
+    client_token: str
+    bot_token: str
+    expires_at: float
 
-        room = await _retry_async(_create_room, attempts=3, base_delay=0.5, name="daily.create_room")
 
-        room_url = room.url
+async def provision_room(session_name: str, helper=None) -> DailyRoom:
+    """Create a Daily room plus client and bot tokens that expire with it.
 
-        async def _get_client_token():
-            return await helper.get_token(room_url, owner=False)
+    ``helper`` defaults to a ``DailyRESTHelper`` on the shared Daily connection
+    pool; tests pass ``bench.fakes.FakeDailyRESTHelper`` to run offline.
+    """
+    if helper is None:
+        # Imported here: pipecat is slow to import and the API process should start fast.
+        from pipecat.transports.daily.utils import DailyRESTHelper
 
-        async def _get_bot_token():
-            return await helper.get_token(room_url, owner=True)
-
-        # API: owner flag controls privileges
-        client_token = await _retry_async(
-            _get_client_token, attempts=3, base_delay=0.3, name="daily.get_token.client"
+        api_key = os.environ.get("DAILY_API_KEY")
+        if not api_key:
+            raise RuntimeError("DAILY_API_KEY is not set")
+        helper = DailyRESTHelper(
+            daily_api_key=api_key,
+            daily_api_url=os.environ.get("DAILY_API_URL", "https://api.daily.co/v1"),
+            aiohttp_session=clients().http("daily"),
         )
-        bot_token = await _retry_async(
-            _get_bot_token, attempts=3, base_delay=0.3, name="daily.get_token.bot"
+    return await _provision(helper, session_name)
+
+
+async def _provision(helper, session_name: str) -> DailyRoom:
+    from pipecat.transports.daily.utils import DailyRoomParams, DailyRoomProperties
+
+    expires_at = int(time.time()) + ROOM_TTL_SECS
+
+    async def _create_room():
+        return await helper.create_room(
+            DailyRoomParams(
+                name=session_name,
+                properties=DailyRoomProperties(
+                    exp=expires_at,
+                    enable_chat=False,
+                    enable_screenshare=False,
+                ),
+            )
         )
 
-        return room_url, client_token, bot_token
+    room = await _retry_async(_create_room, attempts=3, base_delay=0.5, name="daily.create_room")
+
+    room_url = room.url
+
+    async def _get_client_token():
+        return await helper.get_token(room_url, expiry_time=ROOM_TTL_SECS, owner=False)
+
+    async def _get_bot_token():
+        return await helper.get_token(room_url, expiry_time=ROOM_TTL_SECS, owner=True)
+
+    # API: owner flag controls privileges. Both tokens are minted concurrently.
+    client_token, bot_token = await asyncio.gather(
+        _retry_async(_get_client_token, attempts=3, base_delay=0.3, name="daily.get_token.client"),
+        _retry_async(_get_bot_token, attempts=3, base_delay=0.3, name="daily.get_token.bot"),
+    )
+
+    return DailyRoom(
+        url=room_url, client_token=client_token, bot_token=bot_token, expires_at=expires_at
+    )
+
+
+async def create_room_and_tokens(session_name: str, helper=None) -> Tuple[str, str, str]:
+    room = await provision_room(session_name, helper=helper)
+    return room.url, room.client_token, room.bot_token
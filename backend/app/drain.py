@@ -0,0 +1,102 @@
+"""Graceful drain of live bot sessions for rolling restarts.
+
+Once draining starts (``POST /drain``, or shutdown itself), the node stops
+admitting sessions and ``GET /ready`` fails so the load balancer routes new
+calls elsewhere. In-flight bots keep running until they end on their own or
+``DRAIN_TIMEOUT_SECS`` passes; whatever is still live then is cancelled, and
+shutdown continues with the pooled clients. A drain started over HTTP can be
+called off with ``DELETE /drain`` until shutdown takes it over.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from .metrics import DRAIN_CANCELLED_BOTS
+from .state import active_bot_tasks
+
+logger = logging.getLogger("agent-console")
+
+
+class Drainer:
+    def __init__(self, timeout_secs: float = 120.0, poll_interval_secs: float = 1.0):
+        self.timeout_secs = timeout_secs
+        self._poll_interval_secs = poll_interval_secs
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.initial_bots = 0
+        self.cancelled_bots = 0
+        self._shutting_down = False
+
+    @property
+    def draining(self) -> bool:
+        return self.started_at is not None
+
+    @property
+    def deadline(self) -> Optional[float]:
+        return None if self.started_at is None else self.started_at + self.timeout_secs
+
+    def begin(self) -> None:
+        """Stop admitting sessions; idempotent, the first call sets the deadline."""
+        if self.started_at is None:
+            self.started_at = time.time()
+            self.initial_bots = len(active_bot_tasks())
+            logger.info(
+                "drain: started with %d live bots, deadline in %.0fs",
+                self.initial_bots,
+                self.timeout_secs,
+            )
+
+    def cancel(self) -> bool:
+        """Resume admitting sessions; False once shutdown has started draining."""
+        if self._shutting_down:
+            return False
+        if self.started_at is not None:
+            logger.info("drain: cancelled after %.0fs", time.time() - self.started_at)
+        self.started_at = None
+        self.initial_bots = 0
+        return True
+
+    async def drain(self) -> None:
+        """Wait for live bots to finish by the deadline, then cancel the rest."""
+        self._shutting_down = True
+        self.begin()
+        while True:
+            live = active_bot_tasks()
+            left = self.deadline - time.time()
+            if not live or left <= 0:
+                break
+            await asyncio.wait(live, timeout=min(left, self._poll_interval_secs))
+        if live:
+            logger.warning("drain: deadline passed, cancelling %d live bots", len(live))
+            for task in live:
+                task.cancel()
+            await asyncio.gather(*live, return_exceptions=True)
+            self.cancelled_bots += len(live)
+            DRAIN_CANCELLED_BOTS.inc(len(live))
+        self.finished_at = time.time()
+        logger.info("drain: finished in %.1fs", self.finished_at - self.started_at)
+
+    def stats(self) -> dict:
+        deadline = self.deadline
+        return {
+            "draining": self.draining,
+            "done": self.finished_at is not None,
+            "initial_bots": self.initial_bots,
+            "remaining_bots": len(active_bot_tasks()) if self.draining else None,
+            "cancelled_bots": self.cancelled_bots,
+            "timeout_secs": self.timeout_secs,
+            "secs_left": max(0.0, round(deadline - time.time(), 1)) if deadline else None,
+        }
+
+
+_drainer: Drainer | None = None
+
+
+def drainer() -> Drainer:
+    global _drainer
+    if _drainer is None:
+        _drainer = Drainer(timeout_secs=float(os.environ.get("DRAIN_TIMEOUT_SECS", "120")))
+    return _drainer
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("agent-console")
+
+EmbedBatchFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class EmbeddingBatcher:
+    """Coalesces embed requests from all sessions into batched API calls.
+
+    Requests are collected for up to ``window_secs`` (or until ``max_batch``
+    texts are waiting), sent as a single call to ``embed_batch`` and the
+    vectors are fanned back out to each waiting caller.
+    """
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatchFn,
+        window_secs: float = 0.005,
+        max_batch: int = 64,
+    ):
+        self._embed_batch = embed_batch
+        self.window_secs = window_secs
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._call_total = 0.0
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future, now))
+            futures.append(future)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_secs, self._flush)
+        return list(await asyncio.gather(*futures))
+
+    def stats(self) -> dict:
+        occupancy = (self.items / (self.batches * self.max_batch)) if self.batches else None
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "failures": self.failures,
+            "pending": len(self._pending),
+            "avg_batch_size": (self.items / self.batches) if self.batches else None,
+            "avg_occupancy": occupancy,
+            "avg_wait_ms": (self._wait_total / self.items * 1000) if self.items else None,
+            "max_wait_ms": self._wait_max * 1000,
+            "avg_call_ms": (self._call_total / self.batches * 1000) if self.batches else None,
+            "window_ms": self.window_secs * 1000,
+            "max_batch": self.max_batch,
+        }
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+            task = asyncio.create_task(self._send(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        now = time.monotonic()
+        live = [entry for entry in batch if not entry[1].done()]
+        if not live:
+            return
+        for _, _, enqueued in live:
+            waited = now - enqueued
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        # Sessions often ask for the same text at once; embed each distinct text once.
+        unique = list(dict.fromkeys(text for text, _, _ in live))
+        self.batches += 1
+        self.items += len(live)
+        try:
+            vectors = await self._embed_batch(unique)
+        except Exception as exc:
+            self.failures += 1
+            for _, future, _ in live:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            self._call_total += time.monotonic() - now
+
+        by_text = dict(zip(unique, vectors))
+        for text, future, _ in live:
+            if not future.done():
+                future.set_result(by_text[text])
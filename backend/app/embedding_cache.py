@@ -0,0 +1,200 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger("agent-console")
+
+Key = Tuple[str, str]
+
+# Writes queued for the sqlite thread; past this, new entries are only kept in memory.
+_MAX_PENDING_WRITES = 10_000
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class EmbeddingCache:
+    """LRU + TTL cache of embeddings keyed by (model, normalized text).
+
+    Vectors are kept in memory as compact float32 arrays. When ``path`` is set,
+    entries are also written to a sqlite file so a restarted process starts warm:
+    the newest ``max_entries`` rows are loaded on open, so lookups never touch
+    sqlite. Writes go through a background thread that commits in batches and
+    prunes expired rows and rows past ``max_entries`` every ``prune_interval_secs``.
+    The cache is used from the event loop and from ``asyncio.to_thread`` (RAG
+    seeding), so the in-memory LRU is guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_secs: float = 7 * 24 * 3600,
+        path: str | None = None,
+        prune_interval_secs: float = 300.0,
+    ):
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self.prune_interval_secs = prune_interval_secs
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dropped_writes = 0
+        self._entries: "OrderedDict[Key, Tuple[float, array]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes: "queue.Queue[Optional[Tuple[Key, float, bytes]]]" = queue.Queue(
+            maxsize=_MAX_PENDING_WRITES
+        )
+        self._writer: Optional[threading.Thread] = None
+        if path:
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        # Only the writer thread uses the connection after this.
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text TEXT NOT NULL, created_at REAL NOT NULL, "
+            "vector BLOB NOT NULL, PRIMARY KEY (model, text))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_created_at ON embeddings (created_at)"
+        )
+        self._prune()
+        rows = self._db.execute(
+            "SELECT model, text, created_at, vector FROM embeddings ORDER BY created_at, rowid"
+        ).fetchall()
+        for model, text, created_at, blob in rows:
+            vector = array("f")
+            vector.frombytes(blob)
+            self._insert((model, text), (created_at, vector))
+        self._writer = threading.Thread(
+            target=self._write_loop, name="embedding-cache-writer", daemon=True
+        )
+        self._writer.start()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = (model, normalize(text))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl_secs:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[1].tolist()
+
+    def put(self, model: str, text: str, vector: List[float]) -> None:
+        key = (model, normalize(text))
+        entry = (time.time(), array("f", vector))
+        with self._lock:
+            self._insert(key, entry)
+        if self._writer is not None:
+            try:
+                self._writes.put_nowait((key, entry[0], entry[1].tobytes()))
+            except queue.Full:
+                # The writer is behind; the entry is still cached in memory.
+                self.dropped_writes += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else None,
+            "persistent": self._db is not None,
+            "dropped_writes": self.dropped_writes,
+        }
+
+    def close(self) -> None:
+        """Write out pending entries and close the sqlite file."""
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _insert(self, key: Key, entry: Tuple[float, array]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _write_loop(self) -> None:
+        next_prune = time.monotonic() + self.prune_interval_secs
+        while True:
+            try:
+                item = self._writes.get(timeout=max(0.0, next_prune - time.monotonic()))
+            except queue.Empty:
+                item = ()
+            batch = [item] if item else []
+            stop = item is None
+            while not stop:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            try:
+                if batch:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                        [(key[0], key[1], created_at, blob) for key, created_at, blob in batch],
+                    )
+                if stop or time.monotonic() >= next_prune:
+                    self._prune()
+                    next_prune = time.monotonic() + self.prune_interval_secs
+                self._db.commit()
+            except sqlite3.Error:
+                logger.exception("embedding cache: failed to persist %d entries", len(batch))
+            if stop:
+                return
+
+    def _prune(self) -> None:
+        """Drop expired rows and keep only the newest ``max_entries``."""
+        self._db.execute(
+            "DELETE FROM embeddings WHERE created_at < ?", (time.time() - self.ttl_secs,)
+        )
+        self._db.execute(
+            "DELETE FROM embeddings WHERE rowid IN ("
+            "SELECT rowid FROM embeddings ORDER BY created_at DESC, rowid DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._db.commit()
+
+
+_cache: EmbeddingCache | None = None
+
+
+def embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(
+            max_entries=int(os.environ.get("EMBEDDING_CACHE_SIZE", "10000")),
+            ttl_secs=float(os.environ.get("EMBEDDING_CACHE_TTL_SECS", str(7 * 24 * 3600))),
+            path=os.environ.get("EMBEDDING_CACHE_PATH") or None,
+        )
+    return _cache
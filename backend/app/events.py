@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+import os
+from typing import AsyncIterator, Dict, Optional, Set
+
+logger = logging.getLogger("agent-console")
+
+
+class SessionEvents:
+    """Fan-out of one session's bot events to any number of stream subscribers.
+
+    Every subscriber has its own bounded queue. When a slow client falls behind,
+    its oldest events are dropped so the newest state always gets through and
+    the bot never waits on a reader.
+    """
+
+    def __init__(self, queue_size: int = 64):
+        self._queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, event: Optional[dict]) -> None:
+        self.published += 1
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    def close(self) -> None:
+        # ``None`` tells streams to finish.
+        self.publish(None)
+        self._subscribers.clear()
+
+
+_buses: Dict[str, SessionEvents] = {}
+
+
+def session_events(session_id: str) -> SessionEvents:
+    bus = _buses.get(session_id)
+    if bus is None:
+        bus = SessionEvents(queue_size=int(os.environ.get("EVENT_QUEUE_SIZE", "64")))
+        _buses[session_id] = bus
+    return bus
+
+
+def publish_event(session_id: str, event: dict) -> None:
+    bus = _buses.get(session_id)
+    if bus is not None:
+        bus.publish(event)
+
+
+def close_events(session_id: str) -> None:
+    bus = _buses.pop(session_id, None)
+    if bus is not None:
+        bus.close()
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_events(bus: SessionEvents, snapshot: dict, keepalive_secs: float = 15.0):
+    """Yield server-sent events: the current snapshot first, then every update."""
+    queue = bus.subscribe()
+    try:
+        yield format_sse(snapshot)
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive_secs)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                return
+            yield format_sse(event)
+    finally:
+        bus.unsubscribe(queue)
+
+
+async def relay_events(
+    subscription: AsyncIterator[dict], snapshot: dict, keepalive_secs: float = 15.0
+):
+    """Like :func:`stream_events`, for a session hosted on another node.
+
+    Events come from the session store's channel instead of a local bus.
+    """
+    bus = SessionEvents(queue_size=int(os.environ.get("EVENT_QUEUE_SIZE", "64")))
+
+    async def _pump() -> None:
+        try:
+            async for event in subscription:
+                bus.publish(event)
+        except Exception:
+            logger.warning("session event relay failed", exc_info=True)
+        bus.close()
+
+    relay = asyncio.create_task(_pump())
+    try:
+        async for chunk in stream_events(bus, snapshot, keepalive_secs):
+            yield chunk
+    finally:
+        relay.cancel()
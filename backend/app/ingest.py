@@ -0,0 +1,495 @@
+"""Incremental bulk ingestion of help-center content into the RAG index.
+
+Documents are streamed from JSONL files or Markdown directories, split into
+chunks, and each chunk gets a deterministic point id and a content hash.
+Chunks whose hash is already stored are skipped, so a refresh only embeds
+what changed. New chunks are embedded in concurrent batched calls and upserted
+in bulk; previously ingested points that no longer exist are deleted::
+
+    cd backend && python -m app.ingest ./help-center --prune
+
+Seed FAQs from ``rag.FAQS`` carry no content hash and are never pruned.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from . import rag
+from .clients import clients
+
+logger = logging.getLogger("agent-console")
+
+_ID_NAMESPACE = uuid.UUID("6f1c8a4e-2f0b-4d7a-9a53-1f0e3c2b7d11")
+
+
+@dataclass(slots=True)
+class Document:
+    id: str
+    title: str
+    body: str
+    url: str | None = None
+
+
+@dataclass(slots=True)
+class Chunk:
+    point_id: str
+    text: str
+    content_hash: str
+    payload: Dict[str, Any]
+
+
+@dataclass
+class IngestReport:
+    documents: int = 0
+    chunks: int = 0
+    skipped: int = 0
+    embedded: int = 0
+    deleted: int = 0
+    secs: float = 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.secs if self.secs else 0.0
+
+    def as_dict(self) -> dict:
+        return dict(asdict(self), chunks_per_sec=round(self.chunks_per_sec, 1))
+
+
+# --- Reading and chunking ------------------------------------------------------
+
+
+def read_documents(path: str) -> Iterator[Document]:
+    """Stream documents from a ``.jsonl`` file or a directory of ``.md``/``.jsonl`` files.
+
+    JSONL lines need ``id`` plus ``title``/``question`` and ``body``/``answer``.
+    A Markdown file's id is its path relative to ``path`` and its title is the
+    first ``#`` heading.
+    """
+    if os.path.isfile(path):
+        yield from _read_file(path, os.path.dirname(path))
+        return
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            yield from _read_file(os.path.join(root, name), path)
+
+
+def _read_file(file_path: str, base: str) -> Iterator[Document]:
+    if file_path.endswith(".jsonl"):
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield document_from_dict(json.loads(line))
+    elif file_path.endswith(".md"):
+        with open(file_path, encoding="utf-8") as f:
+            text = f.read()
+        heading = re.search(r"^#\s+(.+)$", text, flags=re.MULTILINE)
+        doc_id = os.path.relpath(file_path, base)
+        title = heading.group(1).strip() if heading else os.path.splitext(doc_id)[0]
+        yield Document(id=doc_id, title=title, body=text)
+
+
+def document_from_dict(data: dict) -> Document:
+    return Document(
+        id=str(data["id"]),
+        title=data.get("title") or data.get("question") or "",
+        body=data.get("body") or data.get("answer") or "",
+        url=data.get("url"),
+    )
+
+
+def chunk_document(doc: Document, max_chars: int = 1500) -> List[Chunk]:
+    """Split a document on paragraph boundaries into chunks of at most ``max_chars``."""
+    pieces: List[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", doc.body):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        pieces.append(current)
+
+    chunks = []
+    for i, piece in enumerate(pieces):
+        text = f"Q: {doc.title}\nA: {piece}"
+        content_hash = hashlib.sha256(text.encode()).hexdigest()[:32]
+        payload = {
+            "question": doc.title,
+            "answer": piece,
+            "source": doc.id,
+            "chunk": i,
+            "content_hash": content_hash,
+        }
+        if doc.url:
+            payload["url"] = doc.url
+        chunks.append(
+            Chunk(
+                point_id=str(uuid.uuid5(_ID_NAMESPACE, f"{doc.id}#{i}")),
+                text=text,
+                content_hash=content_hash,
+                payload=payload,
+            )
+        )
+    return chunks
+
+
+# --- Index sinks -----------------------------------------------------------------
+
+
+class NumpySink:
+    """Writes into the in-process index in batches, off the event loop.
+
+    Upserts are buffered until ``flush_rows`` of them are pending and then
+    written in a worker thread, so memory stays bounded and live calls keep
+    running while the matrix grows and BM25 tokenizes. ``close`` writes the
+    rest and saves the index once. With ``lexical`` set, the BM25 index is
+    kept in step with the vector index.
+    """
+
+    def __init__(self, index, lexical=None, flush_rows: int = 2048):
+        self._index = index
+        self._lexical = lexical
+        self._flush_rows = flush_rows
+        self._ids: List[str] = []
+        self._vectors: List[List[float]] = []
+        self._payloads: List[dict] = []
+        self._lock = asyncio.Lock()
+
+    async def ensure(self, dim: int) -> None:
+        pass
+
+    async def existing_chunks(self) -> Dict[Any, Tuple[str, str]]:
+        chunks = {}
+        for point_id in self._index.ids():
+            payload = self._index.payload(point_id) or {}
+            if payload.get("content_hash"):
+                chunks[point_id] = (payload["content_hash"], payload.get("source"))
+        return chunks
+
+    async def upsert(self, ids: List[str], vectors: List[List[float]], payloads: List[dict]):
+        self._ids.extend(ids)
+        self._vectors.extend(vectors)
+        self._payloads.extend(payloads)
+        if len(self._ids) >= self._flush_rows:
+            await self._write()
+
+    async def delete(self, ids: List[Any]) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._delete, ids)
+
+    async def close(self) -> None:
+        await self._write()
+        async with self._lock:
+            await asyncio.to_thread(self._index.flush)
+
+    async def _write(self) -> None:
+        # Take the batch before waiting, so upserts that land meanwhile start the next one.
+        ids, vectors, payloads = self._ids, self._vectors, self._payloads
+        self._ids, self._vectors, self._payloads = [], [], []
+        if not ids:
+            return
+        async with self._lock:
+            await asyncio.to_thread(self._write_batch, ids, vectors, payloads)
+
+    def _write_batch(self, ids: List[str], vectors: List[List[float]], payloads: List[dict]):
+        self._index.upsert(ids, vectors, payloads)
+        if self._lexical is not None:
+            self._lexical.upsert(ids, payloads)
+
+    def _delete(self, ids: List[Any]) -> None:
+        self._index.delete(ids)
+        if self._lexical is not None:
+            self._lexical.delete(ids)
+
+
+class QdrantSink:
+    def __init__(self, client, collection: str, scroll_batch: int = 1000, lexical=None):
+        self._client = client
+        self._collection = collection
+        self._scroll_batch = scroll_batch
+        self._lexical = lexical
+
+    async def ensure(self, dim: int) -> None:
+        from qdrant_client.http.models import Distance, VectorParams
+
+        if not await self._client.collection_exists(self._collection):
+            await self._client.create_collection(
+                collection_name=self._collection,
+                vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+            )
+
+    async def existing_chunks(self) -> Dict[Any, Tuple[str, str]]:
+        chunks: Dict[Any, Tuple[str, str]] = {}
+        if not await self._client.collection_exists(self._collection):
+            return chunks
+        offset = None
+        while True:
+            points, offset = await self._client.scroll(
+                collection_name=self._collection,
+                limit=self._scroll_batch,
+                offset=offset,
+                with_payload=["content_hash", "source"],
+                with_vectors=False,
+            )
+            for point in points:
+                payload = point.payload or {}
+                if payload.get("content_hash"):
+                    chunks[str(point.id)] = (payload["content_hash"], payload.get("source"))
+            if offset is None:
+                return chunks
+
+    async def upsert(self, ids: List[str], vectors: List[List[float]], payloads: List[dict]):
+        from qdrant_client.http.models import PointStruct
+
+        points = [
+            PointStruct(id=point_id, vector=vector, payload=payload)
+            for point_id, vector, payload in zip(ids, vectors, payloads)
+        ]
+        await self._client.upsert(collection_name=self._collection, points=points, wait=False)
+        if self._lexical is not None:
+            await asyncio.to_thread(self._lexical.upsert, ids, payloads)
+
+    async def delete(self, ids: List[Any]) -> None:
+        from qdrant_client.http.models import PointIdsList
+
+        await self._client.delete(
+            collection_name=self._collection, points_selector=PointIdsList(points=list(ids))
+        )
+        if self._lexical is not None:
+            await asyncio.to_thread(self._lexical.delete, ids)
+
+    async def close(self) -> None:
+        pass
+
+
+def default_sink():
+    lexical = rag.lexical_index() if rag._hybrid() else None
+    if rag._backend() == "numpy":
+        return NumpySink(rag._index(), lexical=lexical)
+    return QdrantSink(clients().qdrant(), rag._collection(), lexical=lexical)
+
+
+# --- Pipeline --------------------------------------------------------------------
+
+
+async def _openai_embed(texts: List[str]) -> List[List[float]]:
+    resp = await clients().openai().embeddings.create(model=rag._embedding_model(), input=texts)
+    return [item.embedding for item in resp.data]
+
+
+def _batches(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+async def _aiter(documents: Iterable[Document]) -> AsyncIterator[Document]:
+    for doc in documents:
+        yield doc
+
+
+async def ingest(
+    documents: Iterable[Document] | AsyncIterator[Document],
+    sink=None,
+    embed=_openai_embed,
+    prune: bool = False,
+    embed_batch: int = 128,
+    concurrency: int = 4,
+    window: int = 2048,
+    max_chars: int = 1500,
+) -> IngestReport:
+    """Embed and upsert new or changed chunks; with ``prune``, delete the rest.
+
+    A re-ingested document that now splits into fewer chunks loses its old
+    trailing chunks even without ``prune``.
+    Chunks are processed in windows of ``window`` so memory stays bounded for
+    large corpora. Within a window, up to ``concurrency`` embedding calls of
+    ``embed_batch`` texts run at once and each batch is upserted as it lands.
+    """
+    sink = sink or default_sink()
+    report = IngestReport()
+    started = time.perf_counter()
+    existing = await sink.existing_chunks()
+    by_source: Dict[str, List[Any]] = {}
+    for point_id, (_, source) in existing.items():
+        by_source.setdefault(source, []).append(point_id)
+    seen: set = set()
+    stale: List[Any] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    ensured = False
+
+    async def embed_and_upsert(batch: Sequence[Chunk]) -> None:
+        nonlocal ensured
+        async with semaphore:
+            vectors = await embed([c.text for c in batch])
+        if not ensured:
+            await sink.ensure(len(vectors[0]))
+            ensured = True
+        await sink.upsert([c.point_id for c in batch], vectors, [c.payload for c in batch])
+        report.embedded += len(batch)
+
+    async def flush(pending: List[Chunk]) -> None:
+        if not pending:
+            return
+        if not ensured:
+            # Create the collection once, before concurrent upserts race to do it.
+            await embed_and_upsert(pending[:embed_batch])
+            pending = pending[embed_batch:]
+        await asyncio.gather(*(embed_and_upsert(b) for b in _batches(pending, embed_batch)))
+
+    if not hasattr(documents, "__aiter__"):
+        documents = _aiter(documents)
+
+    pending: List[Chunk] = []
+    async for doc in documents:
+        report.documents += 1
+        chunks = chunk_document(doc, max_chars=max_chars)
+        for chunk in chunks:
+            report.chunks += 1
+            seen.add(chunk.point_id)
+            known = existing.get(chunk.point_id)
+            if known and known[0] == chunk.content_hash:
+                report.skipped += 1
+                continue
+            pending.append(chunk)
+        ids = {chunk.point_id for chunk in chunks}
+        stale.extend(p for p in by_source.pop(doc.id, ()) if p not in ids)
+        if len(pending) >= window:
+            await flush(pending)
+            pending = []
+    await flush(pending)
+
+    if prune:
+        stale = [point_id for point_id in existing if point_id not in seen]
+    for batch in _batches(stale, 1000):
+        await sink.delete(list(batch))
+    report.deleted = len(stale)
+    await sink.close()
+
+    report.secs = time.perf_counter() - started
+    logger.info(
+        "RAG ingest: %d docs, %d chunks (%d unchanged), %d embedded, %d deleted in %.1fs "
+        "(%.0f chunks/s)",
+        report.documents,
+        report.chunks,
+        report.skipped,
+        report.embedded,
+        report.deleted,
+        report.secs,
+        report.chunks_per_sec,
+    )
+    return report
+
+
+# --- Background jobs -------------------------------------------------------------
+
+
+class IngestBusyError(RuntimeError):
+    pass
+
+
+class IngestJobs:
+    """Runs ``POST /rag/ingest`` requests one at a time off the request path.
+
+    A job's status and report stay readable until ``keep`` newer jobs replace it.
+    """
+
+    def __init__(self, keep: int = 20):
+        self._keep = keep
+        self._jobs: Dict[str, dict] = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self, documents: List[Document], prune: bool = False, **options: Any) -> dict:
+        if self._task is not None and not self._task.done():
+            raise IngestBusyError("an ingest job is already running")
+        job = {
+            "id": uuid.uuid4().hex,
+            "state": "running",
+            "documents": len(documents),
+            "prune": prune,
+            "started_at": time.time(),
+            "finished_at": None,
+            "report": None,
+            "error": None,
+        }
+        self._jobs[job["id"]] = job
+        while len(self._jobs) > self._keep:
+            del self._jobs[next(iter(self._jobs))]
+        self._task = asyncio.create_task(self._run(job, documents, prune, options))
+        return dict(job)
+
+    def get(self, job_id: str) -> dict | None:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def wait(self) -> None:
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self, job: dict, documents: List[Document], prune: bool, options: dict):
+        try:
+            report = await ingest(documents, prune=prune, **options)
+        except Exception as exc:
+            logger.exception("RAG ingest job %s failed", job["id"])
+            job.update(state="failed", error=str(exc) or type(exc).__name__)
+        else:
+            job.update(state="done", report=report.as_dict())
+        finally:
+            job["finished_at"] = time.time()
+
+
+_ingest_jobs: IngestJobs | None = None
+
+
+def ingest_jobs() -> IngestJobs:
+    global _ingest_jobs
+    if _ingest_jobs is None:
+        _ingest_jobs = IngestJobs()
+    return _ingest_jobs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest help-center content into the RAG index.")
+    parser.add_argument("path", help="a .jsonl file or a directory of .md/.jsonl files")
+    parser.add_argument("--prune", action="store_true", help="delete chunks missing from path")
+    parser.add_argument("--embed-batch", type=int, default=128)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-chars", type=int, default=1500)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def run() -> IngestReport:
+        try:
+            return await ingest(
+                read_documents(args.path),
+                prune=args.prune,
+                embed_batch=args.embed_batch,
+                concurrency=args.concurrency,
+                max_chars=args.max_chars,
+            )
+        finally:
+            await clients().close()
+
+    print(json.dumps(asyncio.run(run()).as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import math
+import re
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .vector_index import Hit
+
+_STOPWORDS = frozenset(
+    "a about am an and any are as at be but by can could did do does for from get got had has "
+    "have how i if in is it its me my no not of on or our please should so that the their them "
+    "then there this to us was we what when where which who why will with would you your".split()
+)
+
+
+def _stem(word: str) -> str:
+    # Just enough folding for help-center wording: refunds/refund, devices/device.
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(w) for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in _STOPWORDS]
+
+
+def _document_text(payload: Dict[str, Any]) -> str:
+    # The question is counted twice so title words outweigh body words.
+    question = payload.get("question", "")
+    return f"{question} {question} {payload.get('answer', '')}"
+
+
+def _term_counts(payload: Dict[str, Any]) -> Tuple[Dict[str, int], int]:
+    tokens = tokenize(_document_text(payload))
+    counts: Dict[str, int] = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    return counts, len(tokens)
+
+
+class LexicalIndex:
+    """In-process BM25 inverted index over help-center payloads.
+
+    Postings are compact ``array`` pairs per term (document positions and term
+    frequencies, both in insertion order) and are scored with numpy, so a
+    lookup is a few vector operations and needs no embedding. New documents
+    append to the postings. Replaced or deleted ones are only marked dead and
+    skipped when scoring. Once dead documents outnumber live ones, the postings
+    are compacted by renumbering positions, which needs no re-tokenizing.
+
+    Ingestion writes from a worker thread while calls search on the event
+    loop. Documents are tokenized outside the lock, so the loop only waits
+    while postings are appended.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._ids: List[Any] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._positions: Dict[Any, int] = {}
+        self._lengths = array("I")
+        self._live = bytearray()
+        self._dead = 0
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def upsert(self, ids: Sequence[Any], payloads: Sequence[Dict[str, Any]]) -> None:
+        counts = [_term_counts(payload) for payload in payloads]
+        with self._lock:
+            replaced = [point_id for point_id in ids if point_id in self._positions]
+            if replaced:
+                self._delete(replaced)
+            for point_id, payload, terms in zip(ids, payloads, counts):
+                self._add(point_id, payload, terms)
+
+    def delete(self, ids: Iterable[Any]) -> None:
+        with self._lock:
+            self._delete(ids)
+
+    def search(self, query: str, limit: int = 3) -> List[Hit]:
+        terms = set(tokenize(query))
+        with self._lock:
+            return self._search(terms, limit)
+
+    def _delete(self, ids: Iterable[Any]) -> None:
+        for point_id in ids:
+            pos = self._positions.pop(point_id, None)
+            if pos is None:
+                continue
+            self._live[pos] = 0
+            self._payloads[pos] = None
+            self._total_length -= self._lengths[pos]
+            self._dead += 1
+        if self._dead > len(self._positions):
+            self._compact()
+
+    def _search(self, terms: set, limit: int) -> List[Hit]:
+        terms = [t for t in terms if t in self._postings]
+        count = len(self._positions)
+        if not terms or not count or limit <= 0:
+            return []
+        live = np.frombuffer(self._live, dtype=np.bool_)
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float32)
+        norms = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / count))
+        scores = np.zeros(len(self._ids), dtype=np.float32)
+        for term in terms:
+            docs, freqs = self._postings[term]
+            positions = np.frombuffer(docs, dtype=np.uint32)
+            tf = np.frombuffer(freqs, dtype=np.uint16).astype(np.float32)
+            if self._dead:
+                alive = live[positions]
+                positions, tf = positions[alive], tf[alive]
+            if not len(positions):
+                continue
+            idf = math.log(1 + (count - len(positions) + 0.5) / (len(positions) + 0.5))
+            scores[positions] += idf * tf * (self.k1 + 1) / (tf + norms[positions])
+        matched = np.flatnonzero(scores)
+        top = matched[np.argsort(-scores[matched], kind="stable")[:limit]]
+        return [
+            Hit(id=self._ids[p], score=float(scores[p]), payload=self._payloads[p]) for p in top
+        ]
+
+    def is_confident(self, query: str, hits: List[Hit], margin: float = 2.0) -> bool:
+        """True if the best hit contains every query term and clearly beats the runner-up."""
+        if not hits:
+            return False
+        terms = set(tokenize(query))
+        if not terms or not terms <= set(tokenize(_document_text(hits[0].payload))):
+            return False
+        return len(hits) == 1 or hits[0].score >= margin * hits[1].score
+
+    def _compact(self) -> None:
+        live = np.frombuffer(self._live, dtype=np.bool_).copy()
+        renumbered = (np.cumsum(live) - 1).astype(np.uint32)
+        for term, (docs, freqs) in list(self._postings.items()):
+            positions = np.frombuffer(docs, dtype=np.uint32)
+            alive = live[positions]
+            if not alive.any():
+                del self._postings[term]
+                continue
+            self._postings[term] = (
+                array("I", renumbered[positions[alive]].tobytes()),
+                array("H", np.frombuffer(freqs, dtype=np.uint16)[alive].tobytes()),
+            )
+        kept = np.flatnonzero(live)
+        self._ids = [self._ids[p] for p in kept]
+        self._payloads = [self._payloads[p] for p in kept]
+        self._lengths = array("I", np.frombuffer(self._lengths, dtype=np.uint32)[live].tobytes())
+        self._positions = {point_id: pos for pos, point_id in enumerate(self._ids)}
+        self._live = bytearray(b"\x01" * len(self._ids))
+        self._dead = 0
+
+    def _add(self, point_id: Any, payload: Dict[str, Any], terms: Tuple[Dict[str, int], int]):
+        counts, length = terms
+        pos = len(self._ids)
+        self._positions[point_id] = pos
+        self._ids.append(point_id)
+        self._payloads.append(payload)
+        self._live.append(1)
+        self._lengths.append(length)
+        self._total_length += length
+        for token, tf in counts.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = (array("I"), array("H"))
+            postings[0].append(pos)
+            postings[1].append(min(tf, 65535))
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hit]], limit: int, k: int = 60
+) -> List[Hit]:
+    """Merge ranked hit lists by summed ``1 / (k + rank)``; ties keep first-seen order."""
+    scores: Dict[Any, float] = {}
+    hits: Dict[Any, Hit] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking):
+            key = str(hit.id)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+            hits.setdefault(key, hit)
+    ordered = sorted(scores, key=lambda key: -scores[key])
+    return [
+        Hit(id=hits[key].id, score=scores[key], payload=hits[key].payload)
+        for key in ordered[:limit]
+    ]
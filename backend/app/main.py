@@ -1,30 +1,120 @@
 import asyncio
+import importlib
 import logging
 import os
+import secrets
+import sys
 import time
 import uuid
-from collections import defaultdict, deque
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
-from .models import AgentConfig, CreateSessionResponse, BotState
-from .state import create_session, get_session
-from .daily import create_room_and_tokens
-from .bot import run_bot
-from .rag import init_collection
+from .models import AgentConfig, CreateSessionResponse, BotState, IngestRequest
+from . import metrics
+from .metrics import (
+    BOT_FAILURES,
+    RATE_LIMITED,
+    ROUND_TRIP_MS,
+    SESSIONS_CREATED,
+    STAGE_LATENCY_MS,
+)
+from .state import (
+    SessionLimitError,
+    active_bot_count,
+    attach_task,
+    create_session,
+    get_session,
+    remove_session,
+    session_count,
+    sweep_sessions,
+)
+from .events import publish_event, relay_events, session_events, stream_events
+from .room_pool import acquire_room, room_pool, start_room_pool, stop_room_pool
+from .rag import embed_batcher, init_status, start_init_collection
+from .clients import clients, close_clients
+from .drain import drainer
+from .embedding_cache import embedding_cache
+from .ingest import Document, IngestBusyError, ingest_jobs
+from .admission import (
+    AdmissionRejected,
+    AdmissionTicket,
+    admission,
+    start_admission,
+    stop_admission,
+)
+from .ratelimit import POLICIES, rate_limiter
+from .session_store import session_mirror, session_store
+from .workers import WorkerPoolFullError, start_worker_pool, stop_worker_pool, worker_pool
 
 logger = logging.getLogger("agent-console")
 logging.basicConfig(level=logging.INFO)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+# The bot stack (pipecat, VAD, provider SDKs) takes seconds to import. It is loaded
+# after startup, or on first use, so the API answers /health right away.
+def _bot():
+    return importlib.import_module(".bot", __package__)
+
+
+def _tts_cache():
+    return importlib.import_module(".tts_cache", __package__).tts_cache()
+
+
+def _worker_reports() -> dict:
+    pool = worker_pool()
+    return pool.worker_stats() if pool else {}
+
+
+def _worker_total(section: str, field: str) -> int:
+    # Bots in worker processes have their own caches; their counts arrive in reports.
+    return sum((report.get(section) or {}).get(field) or 0 for report in _worker_reports().values())
+
+
+def _tts_cache_hits() -> int | None:
+    hits = _worker_total("tts_cache", "hits") if _worker_reports() else None
+    # Scrapes must not pull in pipecat; until the bot stack is loaded there is no cache.
+    if f"{__package__}.tts_cache" in sys.modules and _tts_cache():
+        hits = (hits or 0) + _tts_cache().hits
+    return hits
+
+
+async def _warm_up(prewarm_bots: bool) -> None:
     try:
-        init_collection()
+        bot = await asyncio.to_thread(_bot)
+        if prewarm_bots:
+            await asyncio.to_thread(bot.load_vad_model)
+            bot.prewarm()
     except Exception:
-        logger.exception("RAG init failed")
+        logger.exception("bot prewarm failed")
+        return
+    await bot.prewarm_tts()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Seeding waits on Qdrant and the embedding API; serve (but report not ready) meanwhile.
+    rag_init = start_init_collection()
+    start_room_pool()
+    # With worker processes, bots (and so the VAD model) live there, not here.
+    pool = start_worker_pool()
+    start_admission(worker_load=pool.worker_load if pool else None)
+    bots_here = pool is None
+    sweeper = asyncio.create_task(sweep_sessions())
+    warm_up = asyncio.create_task(_warm_up(bots_here))
     yield
+    warm_up.cancel()
+    rag_init.cancel()
+    # Let live calls finish (up to DRAIN_TIMEOUT_SECS) before tearing anything down.
+    await drainer().drain()
+    sweeper.cancel()
+    await stop_room_pool()
+    await stop_worker_pool()
+    await stop_admission()
+    await session_mirror().flush()
+    await close_clients()
+    embedding_cache().close()
 
 
 app = FastAPI(title="Agent Console Backend", lifespan=lifespan)
@@ -38,90 +128,370 @@ app.add_middleware(
 )
 
 
+metrics.register(metrics.Gauge("agent_active_bots", "Running bot pipelines", active_bot_count))
+metrics.register(metrics.Gauge("agent_sessions", "Session records held in memory", session_count))
+metrics.register(
+    metrics.Gauge(
+        "agent_embedding_cache_hits",
+        "Embedding cache hits",
+        lambda: embedding_cache().hits + _worker_total("embedding_cache", "hits"),
+    )
+)
+metrics.register(
+    metrics.Gauge(
+        "agent_embedding_cache_misses",
+        "Embedding cache misses",
+        lambda: embedding_cache().misses + _worker_total("embedding_cache", "misses"),
+    )
+)
+metrics.register(
+    metrics.Gauge(
+        "agent_tts_cache_hits",
+        "Sentences played from the TTS audio cache",
+        _tts_cache_hits,
+    )
+)
+metrics.register(
+    metrics.Gauge(
+        "agent_admission_queue_depth",
+        "Sessions waiting for a bot slot",
+        lambda: admission().queue_depth,
+    )
+)
+metrics.register(
+    metrics.Gauge(
+        "agent_admission_limit", "Current adaptive bot concurrency limit", lambda: admission().limit
+    )
+)
+metrics.register(
+    metrics.Gauge(
+        "agent_draining",
+        "1 while this node is draining live sessions",
+        lambda: int(drainer().draining),
+    )
+)
+metrics.register(
+    metrics.Gauge(
+        "agent_room_pool_available",
+        "Pre-provisioned Daily rooms ready",
+        lambda: room_pool().stats()["available"] if room_pool() else None,
+    )
+)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 def health():
-    return {"ok": True}
+    return {"ok": True, "draining": drainer().draining}
+
+
+@app.get("/ready")
+def ready():
+    """Readiness for the load balancer: fails while RAG is seeding and once draining starts."""
+    rag = init_status()
+    draining = drainer().draining
+    body = {"ready": not draining and rag["state"] != "running", "draining": draining, "rag": rag}
+    if not body["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+@app.get("/drain")
+def drain_status():
+    return drainer().stats()
+
+
+@app.post("/drain")
+def start_drain(request: Request):
+    """Stop taking sessions ahead of a restart; live bots run until shutdown's deadline."""
+    _require_admin(request)
+    drainer().begin()
+    return drainer().stats()
+
+
+@app.delete("/drain")
+def cancel_drain(request: Request):
+    """Call off a drain started by ``POST /drain``; a shutdown drain can't be undone."""
+    _require_admin(request)
+    if not drainer().cancel():
+        raise HTTPException(status_code=409, detail="server is shutting down")
+    return drainer().stats()
+
+
+@app.get("/rag/stats")
+def rag_stats():
+    from .answer_cache import answer_cache
+    from .rag_processor import speculation_stats
+
+    cache = answer_cache()
+    return {
+        "collection": init_status(),
+        "embedding_cache": embedding_cache().stats(),
+        "embedding_batches": embed_batcher().stats(),
+        "speculation": speculation_stats(),
+        "answer_cache": cache.stats() if cache else None,
+        # With BOT_WORKERS, retrieval and the answer cache run in the workers.
+        "workers": {
+            index: {k: v for k, v in report.items() if k != "tts_cache"}
+            for index, report in _worker_reports().items()
+        }
+        or None,
+    }
+
+
+@app.post("/rag/ingest", status_code=202)
+async def rag_ingest(body: IngestRequest, request: Request):
+    """Start a background job that embeds new or changed articles; poll it by id."""
+    _require_admin(request)
+    documents = [Document(**doc.model_dump()) for doc in body.documents]
+    try:
+        return ingest_jobs().start(documents, prune=body.prune)
+    except IngestBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
+@app.get("/rag/ingest/{job_id}")
+def rag_ingest_status(job_id: str, request: Request):
+    _require_admin(request)
+    job = ingest_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="ingest job not found")
+    return job
+
+
+@app.get("/clients/stats")
+def clients_stats():
+    return {"pools": clients().stats()}
+
+
+@app.get("/rooms/stats")
+def rooms_stats():
+    pool = room_pool()
+    return {"pool": pool.stats() if pool else None}
+
+
+@app.get("/tts/stats")
+def tts_stats():
+    cache = _tts_cache()
+    workers = {index: report.get("tts_cache") for index, report in _worker_reports().items()}
+    return {"cache": cache.stats() if cache else None, "workers": workers or None}
+
+
+@app.get("/admission/stats")
+def admission_stats():
+    return admission().stats()
+
+
+@app.get("/workers/stats")
+def workers_stats():
+    pool = worker_pool()
+    return {"pool": pool.stats() if pool else None}
 
 
 @app.post("/sessions", response_model=CreateSessionResponse)
 async def create_session_endpoint(config: AgentConfig, request: Request):
     ip = request.client.host if request.client else "unknown"
-    _rate_limit(ip)
+    await _rate_limit("create_session", ip)
     _require_env()
+    _reject_if_draining()
+    try:
+        ticket = await admission().acquire()
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="server at capacity, retry later",
+            headers={"Retry-After": str(exc.retry_after_secs)},
+        ) from exc
+    try:
+        # A drain may have started while this request was queued for a slot.
+        _reject_if_draining()
+        return await _start_session(config, ticket)
+    except BaseException:
+        ticket.release()
+        raise
+
+
+async def _start_session(config: AgentConfig, ticket: AdmissionTicket) -> CreateSessionResponse:
     session_id = str(uuid.uuid4())
-    session = create_session(session_id, config)
+    try:
+        session = create_session(session_id, config)
+    except SessionLimitError as exc:
+        raise HTTPException(status_code=503, detail="too many live sessions") from exc
+    pool = worker_pool()
+    if pool is not None and not pool.has_capacity():
+        remove_session(session_id)
+        raise HTTPException(status_code=503, detail="all bot workers are busy")
 
     try:
-        room_url, client_token, bot_token = await create_room_and_tokens(
-            f"agent-{session_id}"
-        )
+        room = await acquire_room(f"agent-{session_id}")
     except Exception as exc:
         logger.exception("daily room creation failed")
+        remove_session(session_id)
         raise HTTPException(status_code=500, detail="failed to create room") from exc
 
+    room_url, client_token, bot_token = room.url, room.client_token, room.bot_token
     session.room_url = room_url
     session.client_token = client_token
     session.bot_token = bot_token
+    session.expires_at = room.expires_at
+    _publish(session_id, "created", session)
 
     def on_state_change(state: str):
         session.bot_state = state
         if state != "error":
             session.last_error = None
+        _publish(session_id, "state", session)
 
     def on_latency(latency_ms: int):
+        ROUND_TRIP_MS.observe(latency_ms)
         session.round_trip_latency_ms = latency_ms
         session.last_error = None
+        _publish(session_id, "latency", session)
+
+    def on_stage_latency(breakdown: dict):
+        for stage, value in breakdown.items():
+            if value is not None:
+                STAGE_LATENCY_MS.observe(value, stage=stage)
+        session.stage_latency_ms = breakdown
+        _publish(session_id, "stages", session)
 
     def on_error(message: str | None):
         if message:
             session.last_error = message
             session.bot_state = "error"
+            _publish(session_id, "error", session)
+
+    bot_args = dict(
+        room_url=room_url,
+        token=bot_token,
+        config=config,
+        on_state_change=on_state_change,
+        on_latency=on_latency,
+        on_error=on_error,
+        on_stage_latency=on_stage_latency,
+    )
+    if pool is not None:
+        try:
+            bot = pool.start_bot(session_id, **bot_args)
+        except WorkerPoolFullError as exc:
+            remove_session(session_id)
+            raise HTTPException(status_code=503, detail="all bot workers are busy") from exc
+    else:
+        bot = _bot().run_bot(**bot_args)
 
     async def _run_wrapper():
         try:
-            await run_bot(
-                room_url=room_url,
-                token=bot_token,
-                config=config,
-                on_state_change=on_state_change,
-                on_latency=on_latency,
-                on_error=on_error,
-            )
+            await bot
         except Exception:
             logger.exception("bot session failed")
+            BOT_FAILURES.inc()
             session.bot_state = "error"
             session.last_error = "bot session failed"
+        finally:
+            _publish(session_id, "ended", session)
 
-    session.task = asyncio.create_task(_run_wrapper())
+    task = asyncio.create_task(_run_wrapper())
+    task.add_done_callback(lambda _: ticket.release())
+    attach_task(session, task)
+    SESSIONS_CREATED.inc()
 
     return CreateSessionResponse(session_id=session_id, room_url=room_url, token=client_token)
 
 
 @app.get("/sessions/{session_id}/state", response_model=BotState)
-def get_state(session_id: str):
+async def get_state(session_id: str):
     session = get_session(session_id)
-    if not session:
+    if session:
+        return BotState(
+            state=session.bot_state,
+            round_trip_latency_ms=session.round_trip_latency_ms,
+            stage_latency_ms=session.stage_latency_ms,
+            error_message=session.last_error,
+            node_id=session.node_id,
+        )
+    # Hosted on another node (or already gone): answer from the shared store.
+    record = await session_store().load(session_id)
+    if not record:
         raise HTTPException(status_code=404, detail="session not found")
     return BotState(
-        state=session.bot_state,
-        round_trip_latency_ms=session.round_trip_latency_ms,
-        error_message=session.last_error,
+        state=record["state"],
+        round_trip_latency_ms=record.get("round_trip_latency_ms"),
+        stage_latency_ms=record.get("stage_latency_ms"),
+        error_message=record.get("error_message"),
+        node_id=record.get("node_id"),
     )
 
 
-_WINDOW_SECONDS = 60
-_MAX_SESSIONS_PER_WINDOW = 5
-_hits = defaultdict(lambda: deque())
+@app.get("/sessions/{session_id}/events")
+async def stream_state(session_id: str):
+    """Server-sent events for every bot state, latency and error update."""
+    session = get_session(session_id)
+    if session:
+        stream = stream_events(session_events(session_id), _event("snapshot", session))
+    else:
+        record = await session_store().load(session_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="session not found")
+        snapshot = dict(record, type="snapshot", ts=time.time())
+        stream = relay_events(session_store().subscribe(session_id), snapshot)
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _publish(session_id: str, kind: str, session) -> None:
+    event = _event(kind, session)
+    publish_event(session_id, event)
+    # A call can outlast its room's expiry; until it ends, the store's own TTL applies.
+    live = session.task is not None and kind != "ended"
+    session_mirror().update(session_id, event, expires_at=None if live else session.expires_at)
+
+
+def _event(kind: str, session) -> dict:
+    return {
+        "type": kind,
+        "ts": time.time(),
+        "state": session.bot_state,
+        "round_trip_latency_ms": session.round_trip_latency_ms,
+        "stage_latency_ms": session.stage_latency_ms,
+        "error_message": session.last_error,
+    }
+
+
+async def _rate_limit(route: str, key: str) -> None:
+    result = await rate_limiter().check(POLICIES[route], key)
+    if not result.allowed:
+        RATE_LIMITED.inc(route=route)
+        raise HTTPException(
+            status_code=429,
+            detail="rate limit exceeded",
+            headers={"Retry-After": str(result.retry_after_secs)},
+        )
+
+
+def _reject_if_draining() -> None:
+    if drainer().draining:
+        raise HTTPException(
+            status_code=503,
+            detail="server is draining, retry on another node",
+            headers={"Retry-After": "1"},
+        )
 
 
-def _rate_limit(ip: str) -> None:
-    now = time.time()
-    bucket = _hits[ip]
-    while bucket and (now - bucket[0]) > _WINDOW_SECONDS:
-        bucket.popleft()
-    if len(bucket) >= _MAX_SESSIONS_PER_WINDOW:
-        raise HTTPException(status_code=429, detail="rate limit exceeded")
-    bucket.append(now)
+def _require_admin(request: Request) -> None:
+    """Admin routes need ``Authorization: Bearer $ADMIN_TOKEN``; unset disables them."""
+    token = os.environ.get("ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=403, detail="admin endpoints are disabled")
+    scheme, _, given = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(given.encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="admin token required")
 
 
 def _require_env() -> None:
@@ -0,0 +1,277 @@
+"""In-process Prometheus-style metrics.
+
+Everything here is updated from the event loop thread, so plain integer and
+float updates need no locks. ``render()`` produces the text exposition format
+served at ``GET /metrics``. Bot worker processes relay their counters and
+histograms as :func:`snapshot` dicts, which ``render()`` adds to this process's.
+"""
+
+import bisect
+import math
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+LATENCY_BUCKETS_MS = (25, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_key(labels), 0)
+
+    def snapshot(self) -> list:
+        return list(self._values.items())
+
+    def render(self, remote: Sequence[list] = ()) -> List[str]:
+        values = dict(self._values)
+        for items in remote:
+            for key, value in items:
+                values[key] = values.get(key, 0) + value
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in values.items():
+            lines.append(f"{self.name}{_fmt_labels(key)} {_fmt_value(value)}")
+        return lines
+
+
+class Gauge:
+    """A gauge either set directly or read from ``fn`` at scrape time."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float] | None = None):
+        self.name = name
+        self.help = help
+        self._fn = fn
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        if self._fn is not None and not labels:
+            return self._fn()
+        return self._values.get(_key(labels), 0)
+
+    def render(self, remote: Sequence[list] = ()) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        values = dict(self._values)
+        if self._fn is not None:
+            values[()] = self._fn()
+        for key, value in values.items():
+            if value is None:
+                continue
+            lines.append(f"{self.name}{_fmt_labels(key)} {_fmt_value(value)}")
+        return lines
+
+
+class _Series:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """Fixed-bucket histogram with p50/p95/p99 estimates.
+
+    Quantiles are interpolated within buckets the same way PromQL's
+    ``histogram_quantile`` does, and are also exported as ``<name>_quantile``.
+    """
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelKey, _Series] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(len(self.buckets))
+        series.counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(_key(labels))
+        return series.count if series else 0
+
+    def snapshot(self) -> list:
+        return [(key, list(s.counts), s.sum, s.count) for key, s in self._series.items()]
+
+    def quantile(self, q: float, **labels) -> float | None:
+        series = self._series.get(_key(labels))
+        if series is None or series.count == 0:
+            return None
+        rank = q * series.count
+        cumulative = 0
+        for i, bucket_count in enumerate(series.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                upper = self.buckets[i]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if upper == math.inf:
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-2]
+
+    def render(self, remote: Sequence[list] = ()) -> List[str]:
+        if any(remote):
+            merged = Histogram(self.name, self.help, self.buckets[:-1])
+            for key, series in self._series.items():
+                merged._add(key, series.counts, series.sum, series.count)
+            for items in remote:
+                for key, counts, total, count in items:
+                    merged._add(key, counts, total, count)
+            return merged.render()
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        quantile_lines = [
+            f"# HELP {self.name}_quantile Estimated quantiles of {self.name}",
+            f"# TYPE {self.name}_quantile gauge",
+        ]
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series.counts):
+                cumulative += bucket_count
+                labels = _fmt_labels(key, [("le", _fmt_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {_fmt_value(series.sum)}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {series.count}")
+            for q in QUANTILES:
+                estimate = self.quantile(q, **dict(key))
+                labels = _fmt_labels(key, [("quantile", str(q))])
+                quantile_lines.append(f"{self.name}_quantile{labels} {_fmt_value(estimate)}")
+        return lines + quantile_lines
+
+    def _add(self, key: LabelKey, counts: Sequence[int], total: float, count: int) -> None:
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(len(self.buckets))
+        series.counts = [a + b for a, b in zip(series.counts, counts)]
+        series.sum += total
+        series.count += count
+
+
+_registry: Dict[str, Counter | Gauge | Histogram] = {}
+
+
+def register(metric):
+    _registry[metric.name] = metric
+    return metric
+
+
+# Latest snapshot from each bot worker process, by source name.
+_remote: Dict[str, dict] = {}
+
+
+def snapshot() -> dict:
+    """Counter and histogram state of this process, picklable for relaying."""
+    return {
+        name: metric.snapshot()
+        for name, metric in _registry.items()
+        if isinstance(metric, (Counter, Histogram))
+    }
+
+
+def set_remote(source: str, state: dict) -> None:
+    _remote[source] = state
+
+
+def render() -> str:
+    lines: List[str] = []
+    for name, metric in _registry.items():
+        remote = [state[name] for state in _remote.values() if name in state]
+        lines.extend(metric.render(remote))
+    return "\n".join(lines) + "\n"
+
+
+ROUND_TRIP_MS = register(
+    Histogram("agent_round_trip_latency_ms", "User stop to bot start speaking, per turn")
+)
+STAGE_LATENCY_MS = register(
+    Histogram("agent_stage_latency_ms", "Per-turn latency of each pipeline stage")
+)
+BOT_FAILURES = register(Counter("agent_bot_failures_total", "Bot sessions that ended in an error"))
+SESSIONS_CREATED = register(Counter("agent_sessions_created_total", "Sessions started"))
+DAILY_RETRIES = register(
+    Counter("agent_daily_retries_total", "Retried Daily REST calls, by operation")
+)
+RAG_RETRIEVALS = register(
+    Counter(
+        "agent_rag_retrievals_total",
+        "RAG lookups by outcome (hit, lexical, empty, timeout, error, not_ready)",
+    )
+)
+RAG_RETRIEVAL_MS = register(Histogram("agent_rag_retrieval_ms", "RAG embed + search time"))
+RAG_LEXICAL_STALE = register(
+    Counter(
+        "agent_rag_lexical_stale_total",
+        "Keyword hits dropped because the vector store no longer holds them unchanged",
+    )
+)
+ADMISSION_REJECTIONS = register(
+    Counter("agent_admission_rejections_total", "Sessions refused by admission control, by reason")
+)
+ADMISSION_WAIT_MS = register(
+    Histogram("agent_admission_wait_ms", "Time new sessions waited for a bot slot")
+)
+RATE_LIMITED = register(
+    Counter("agent_rate_limited_total", "Requests refused by the rate limiter, by route")
+)
+ANSWER_CACHE_LOOKUPS = register(
+    Counter("agent_answer_cache_lookups_total", "Semantic answer cache lookups by outcome")
+)
+ANSWER_CACHE_SAVED_MS = register(
+    Histogram("agent_answer_cache_saved_ms", "LLM generation time skipped per answer cache hit")
+)
+PROMPT_TOKENS = register(
+    Histogram(
+        "agent_prompt_tokens",
+        "Estimated LLM prompt size per turn after context windowing",
+        buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+    )
+)
+CONTEXT_SUMMARIES = register(
+    Counter("agent_context_summaries_total", "Rolling context summaries by outcome (ok, error)")
+)
+DRAIN_CANCELLED_BOTS = register(
+    Counter("agent_drain_cancelled_bots_total", "Live bots cancelled when a drain hit its deadline")
+)
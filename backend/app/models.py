@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
 
@@ -35,4 +37,21 @@ class CreateSessionResponse(BaseModel):
 class BotState(BaseModel):
     state: str
     round_trip_latency_ms: int | None = None
+    # Last turn's breakdown: stt, turn_detection, rag, llm_ttft, tts_ttfa, playout, total.
+    stage_latency_ms: dict[str, int | None] | None = None
     error_message: str | None = None
+    # API node hosting the bot; any node can answer for any session.
+    node_id: str | None = None
+
+
+class IngestDocument(BaseModel):
+    id: str
+    title: str
+    body: str
+    url: str | None = None
+
+
+class IngestRequest(BaseModel):
+    documents: List[IngestDocument] = Field(max_length=5000)
+    # Delete previously ingested chunks that are not in this request.
+    prune: bool = False
@@ -1,6 +1,7 @@
 import time
 import logging
-from typing import Optional
+from collections import deque
+from typing import Deque, Dict, Optional
 
 from pipecat.observers.base_observer import BaseObserver, FramePushed
 from pipecat.frames.frames import (
@@ -8,24 +9,78 @@ from pipecat.frames.frames import (
     UserStoppedSpeakingFrame,
     BotStartedSpeakingFrame,
     BotStoppedSpeakingFrame,
+    LLMContextFrame,
     LLMFullResponseStartFrame,
+    TranscriptionFrame,
+    TTSAudioRawFrame,
     ErrorFrame,
 )
 
+from .rag_processor import RAGProcessor
+
 logger = logging.getLogger("agent-console")
 
+# Stage name -> (start mark, end mark). Marks are monotonic timestamps per turn.
+STAGES = {
+    "stt_ms": ("user_stopped", "transcript"),
+    "turn_detection_ms": ("transcript", "rag_in"),
+    "rag_ms": ("rag_in", "rag_out"),
+    "llm_ttft_ms": ("rag_out", "llm_start"),
+    "tts_ttfa_ms": ("llm_start", "tts_audio"),
+    "playout_ms": ("tts_audio", "bot_started"),
+    "total_ms": ("user_stopped", "bot_started"),
+}
+
+
+_STATE_FRAMES = (
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    LLMFullResponseStartFrame,
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    ErrorFrame,
+)
+
 
 class BotStateObserver(BaseObserver):
-    def __init__(self, on_state_change, on_latency, on_error):
+    def __init__(self, on_state_change, on_latency, on_error, on_stage_latency=None):
         super().__init__(name="BotStateObserver")
         self._on_state_change = on_state_change
         self._on_latency = on_latency
         self._on_error = on_error
-        self._last_user_stop: Optional[float] = None
+        self._on_stage_latency = on_stage_latency
         self._user_speaking = False
+        # Monotonic marks for the current turn, starting at the user's stop.
+        self._marks: Dict[str, float] = {}
+        self._last_transcript: Optional[float] = None
+        # Observers see a frame once per hop; remember recent ids to act only once.
+        self._seen: Deque[int] = deque(maxlen=64)
 
     async def on_push_frame(self, data: FramePushed) -> None:
         frame = data.frame
+        now = _timestamp(data)
+
+        if isinstance(frame, TranscriptionFrame):
+            self._last_transcript = now
+            if "user_stopped" in self._marks and "rag_in" not in self._marks:
+                self._marks["transcript"] = now
+            return
+
+        if isinstance(frame, LLMContextFrame):
+            if isinstance(data.destination, RAGProcessor):
+                self._mark("rag_in", now)
+            elif isinstance(data.source, RAGProcessor):
+                self._mark("rag_out", now)
+            return
+
+        if isinstance(frame, TTSAudioRawFrame):
+            if "llm_start" in self._marks:
+                self._mark("tts_audio", now)
+            return
+
+        if not isinstance(frame, _STATE_FRAMES) or frame.id in self._seen:
+            return
+        self._seen.append(frame.id)
 
         if isinstance(frame, UserStartedSpeakingFrame):
             self._user_speaking = True
@@ -35,21 +90,21 @@ class BotStateObserver(BaseObserver):
 
         if isinstance(frame, UserStoppedSpeakingFrame):
             self._user_speaking = False
-            self._last_user_stop = time.time()
+            self._marks = {"user_stopped": now}
             logger.info("state=thinking (user stopped speaking)")
             self._on_state_change("thinking")
             return
 
         if isinstance(frame, LLMFullResponseStartFrame):
+            self._mark("llm_start", now)
             logger.info("llm_response_start")
             self._on_state_change("thinking")
             return
 
         if isinstance(frame, BotStartedSpeakingFrame):
-            if self._last_user_stop is not None:
-                latency_ms = int((time.time() - self._last_user_stop) * 1000)
-                self._on_latency(latency_ms)
-                logger.info("bot_started_speaking latency_ms=%s", latency_ms)
+            if "user_stopped" in self._marks and "bot_started" not in self._marks:
+                self._mark("bot_started", now)
+                self._report_turn()
             else:
                 logger.info("bot_started_speaking latency_ms=unknown")
             self._on_state_change("speaking")
@@ -64,3 +119,36 @@ class BotStateObserver(BaseObserver):
             logger.error("pipeline_error: %s", frame.error)
             self._on_error(str(frame.error))
             self._on_state_change("error")
+
+    def _mark(self, name: str, now: float) -> None:
+        self._marks.setdefault(name, now)
+
+    def _report_turn(self) -> None:
+        marks = dict(self._marks)
+        # The final transcript often lands before VAD reports the stop; STT then costs nothing.
+        marks.setdefault("transcript", self._last_transcript or marks["user_stopped"])
+        marks["transcript"] = max(marks["transcript"], marks["user_stopped"])
+        breakdown = stage_breakdown(marks)
+        latency_ms = breakdown["total_ms"]
+        self._on_latency(latency_ms)
+        logger.info("bot_started_speaking latency_ms=%s stages=%s", latency_ms, breakdown)
+        if self._on_stage_latency is not None:
+            self._on_stage_latency(breakdown)
+
+
+def stage_breakdown(marks: Dict[str, float]) -> Dict[str, int | None]:
+    breakdown: Dict[str, int | None] = {}
+    for stage, (start, end) in STAGES.items():
+        if start in marks and end in marks:
+            breakdown[stage] = max(0, round((marks[end] - marks[start]) * 1000))
+        else:
+            breakdown[stage] = None
+    return breakdown
+
+
+def _timestamp(data: FramePushed) -> float:
+    # ``timestamp`` is the pipeline clock (monotonic ns) at push time, which is
+    # more accurate than reading the clock when the observer gets around to it.
+    if data.timestamp:
+        return data.timestamp / 1e9
+    return time.monotonic()
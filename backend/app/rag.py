@@ -1,13 +1,26 @@
 import os
+import asyncio
+import fcntl
 import logging
-from typing import List
+import tempfile
+import time
+from typing import TYPE_CHECKING, List
 
-from openai import OpenAI
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import VectorParams, Distance, PointStruct
+from .clients import clients
+from .embed_batcher import EmbeddingBatcher
+from .embedding_cache import embedding_cache
+from .lexical_index import LexicalIndex, reciprocal_rank_fusion
+from .metrics import RAG_LEXICAL_STALE, RAG_RETRIEVAL_MS, RAG_RETRIEVALS
+from .vector_index import NumpyIndex
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+    from qdrant_client import AsyncQdrantClient, QdrantClient
 
 logger = logging.getLogger("agent-console")
 
+CONTEXT_HEADER = "Relevant help-center answers:"
+
 FAQS = [
     {
         "question": "What is an eSIM?",
@@ -69,13 +82,55 @@ FAQS = [
 ]
 
 
-def _client() -> OpenAI:
-    return OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+def _client() -> "OpenAI":
+    return clients().openai_sync()
+
+
+def _qdrant() -> "QdrantClient":
+    return clients().qdrant_sync()
+
+
+def _async_client() -> "AsyncOpenAI":
+    # Retrieval has its own time budget, so don't let the SDK retry inside it.
+    return clients().openai(retries=False)
+
+
+def _async_qdrant() -> "AsyncQdrantClient":
+    return clients().qdrant()
+
+
+_numpy_index: NumpyIndex | None = None
+_lexical_index: LexicalIndex | None = None
+_batchers: dict[str, EmbeddingBatcher] = {}
+_init_task: asyncio.Task | None = None
+_init_status: dict = {"state": "idle", "error": None, "duration_ms": None}
+
+
+def _backend() -> str:
+    return os.environ.get("RAG_BACKEND", "qdrant").lower()
 
 
-def _qdrant() -> QdrantClient:
-    url = os.environ.get("QDRANT_URL", "http://qdrant:6333")
-    return QdrantClient(url=url)
+def _index() -> NumpyIndex:
+    global _numpy_index
+    if _numpy_index is None:
+        _numpy_index = NumpyIndex(path=os.environ.get("RAG_INDEX_PATH") or None)
+    return _numpy_index
+
+
+def lexical_index() -> LexicalIndex:
+    """BM25 index over the same payloads as the vector index, kept in process."""
+    global _lexical_index
+    if _lexical_index is None:
+        _lexical_index = LexicalIndex()
+    return _lexical_index
+
+
+def _hybrid() -> bool:
+    return os.environ.get("RAG_HYBRID", "1").lower() not in ("0", "false", "no")
+
+
+def _lexical_margin() -> float:
+    return float(os.environ.get("RAG_LEXICAL_MARGIN", "2.0"))
 
 
 def _collection() -> str:
@@ -86,12 +141,160 @@ def _embedding_model() -> str:
     return os.environ.get("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
 
 
+def _cached_vectors(model: str, texts: List[str]) -> tuple[list, list[int]]:
+    cache = embedding_cache()
+    vectors = [cache.get(model, t) for t in texts]
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    return vectors, missing
+
+
+def _store_vectors(
+    model: str, texts: List[str], vectors: list, missing: list[int], fetched: list
+) -> None:
+    cache = embedding_cache()
+    for i, vector in zip(missing, fetched):
+        vectors[i] = vector
+        cache.put(model, texts[i], vector)
+
+
 def _embed(texts: List[str]) -> List[List[float]]:
-    resp = _client().embeddings.create(model=_embedding_model(), input=texts)
-    return [item.embedding for item in resp.data]
+    model = _embedding_model()
+    vectors, missing = _cached_vectors(model, texts)
+    if missing:
+        resp = _client().embeddings.create(model=model, input=[texts[i] for i in missing])
+        _store_vectors(model, texts, vectors, missing, [item.embedding for item in resp.data])
+    return vectors
+
+
+def _retrieval_timeout() -> float:
+    return float(os.environ.get("RAG_TIMEOUT_SECS", "0.5"))
+
+
+def embed_batcher(model: str | None = None) -> EmbeddingBatcher:
+    """Process-wide batcher that coalesces embed calls from all sessions."""
+    model = model or _embedding_model()
+    batcher = _batchers.get(model)
+    if batcher is None:
+
+        async def _embed_batch(texts: List[str]) -> List[List[float]]:
+            resp = await _async_client().embeddings.create(model=model, input=texts)
+            return [item.embedding for item in resp.data]
+
+        batcher = EmbeddingBatcher(
+            _embed_batch,
+            window_secs=float(os.environ.get("EMBED_BATCH_WINDOW_MS", "5")) / 1000,
+            max_batch=int(os.environ.get("EMBED_BATCH_MAX", "64")),
+        )
+        _batchers[model] = batcher
+    return batcher
+
+
+async def _aembed(texts: List[str]) -> List[List[float]]:
+    model = _embedding_model()
+    vectors, missing = _cached_vectors(model, texts)
+    if missing:
+        fetched = await embed_batcher(model).embed([texts[i] for i in missing])
+        _store_vectors(model, texts, vectors, missing, fetched)
+    return vectors
+
+
+def _faq_points() -> tuple[list[int], list[str], list[dict]]:
+    ids = [i + 1 for i in range(len(FAQS))]
+    texts = [f"Q: {f['question']}\nA: {f['answer']}" for f in FAQS]
+    payloads = [{"question": f["question"], "answer": f["answer"]} for f in FAQS]
+    return ids, texts, payloads
 
 
 def init_collection() -> None:
+    if _backend() == "numpy":
+        _init_numpy_index()
+    else:
+        _init_qdrant_collection()
+    if _hybrid():
+        _init_lexical_index()
+
+
+def start_init_collection() -> asyncio.Task:
+    """Initialize the collection in the background; later calls share the same run.
+
+    Startup no longer waits on Qdrant or the embedding API. Progress is in
+    :func:`init_status`; retrieval finds nothing until the collection is ready.
+    """
+    global _init_task
+    if _init_task is None:
+        _init_task = asyncio.create_task(_run_init())
+    return _init_task
+
+
+def init_status() -> dict:
+    """``state`` is ``idle``, ``running``, ``ready`` or ``failed``."""
+    return dict(_init_status)
+
+
+async def _run_init() -> None:
+    _init_status.update(state="running", error=None)
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(init_collection_locked)
+    except Exception as exc:
+        logger.exception("RAG init failed")
+        _init_status.update(state="failed", error=str(exc))
+    else:
+        _init_status["state"] = "ready"
+    _init_status["duration_ms"] = round((time.perf_counter() - started) * 1000)
+
+
+def _initializing() -> bool:
+    return _init_status["state"] == "running"
+
+
+def init_collection_locked() -> None:
+    """:func:`init_collection` under a host-wide file lock (``RAG_INIT_LOCK_PATH``)."""
+    # Every uvicorn worker (and bot worker) runs this at startup. The lock lets one of
+    # them seed the collection; the rest then find it populated (Qdrant) or, with a shared
+    # EMBEDDING_CACHE_PATH, read the FAQ vectors from it instead of embedding again.
+    path = os.environ.get("RAG_INIT_LOCK_PATH") or os.path.join(
+        tempfile.gettempdir(), "agent-console-rag-init.lock"
+    )
+    with open(path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            init_collection()
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _init_lexical_index() -> None:
+    if _backend() == "numpy":
+        index = _index()
+        ids = index.ids()
+        lexical_index().upsert(ids, [index.payload(i) or {} for i in ids])
+    else:
+        client, offset = _qdrant(), None
+        while True:
+            points, offset = client.scroll(
+                collection_name=_collection(), limit=1000, offset=offset, with_vectors=False
+            )
+            lexical_index().upsert([p.id for p in points], [p.payload or {} for p in points])
+            if offset is None:
+                break
+    logger.info("RAG: lexical index holds %d documents", len(lexical_index()))
+
+
+def _init_numpy_index() -> None:
+    index = _index()
+    if len(index) > 0:
+        return
+
+    ids, texts, payloads = _faq_points()
+    index.upsert(ids, _embed(texts), payloads)
+    index.flush()
+    logger.info("RAG: inserted %d FAQ items into the in-process index", len(ids))
+
+
+def _init_qdrant_collection() -> None:
+    from qdrant_client.http.models import VectorParams, Distance, PointStruct
+
     client = _qdrant()
     name = _collection()
 
@@ -106,35 +309,195 @@ def init_collection() -> None:
     if count > 0:
         return
 
-    texts = [f"Q: {f['question']}\nA: {f['answer']}" for f in FAQS]
+    ids, texts, payloads = _faq_points()
     vectors = _embed(texts)
     points = [
-        PointStruct(
-            id=i + 1,
-            vector=vectors[i],
-            payload={"question": FAQS[i]["question"], "answer": FAQS[i]["answer"]},
-        )
-        for i in range(len(FAQS))
+        PointStruct(id=ids[i], vector=vectors[i], payload=payloads[i])
+        for i in range(len(ids))
     ]
     client.upsert(collection_name=name, points=points)
     logger.info("RAG: inserted %d FAQ items into Qdrant", len(points))
 
 
+def _lexical_search(query: str, top_k: int) -> tuple[list, bool]:
+    """BM25 hits for ``query`` and whether they are confident enough to skip embedding."""
+    if not _hybrid():
+        return [], False
+    index = lexical_index()
+    hits = index.search(query, limit=top_k)
+    return hits, index.is_confident(query, hits, margin=_lexical_margin())
+
+
+# The BM25 index only sees ingests run in this process. Bot workers, other uvicorn
+# workers and nodes, and a server after a CLI ingest hold stale copies, so keyword
+# hits are checked against the vector store (a lookup by id, no embedding) first.
+
+
+def _stored_payloads(ids: list) -> dict:
+    """Current payloads of ``ids`` in the vector store, keyed by ``str(id)``."""
+    if _backend() == "numpy":
+        index = _index()
+        return {str(i): index.payload(i) for i in ids}
+    points = _qdrant().retrieve(collection_name=_collection(), ids=ids, with_vectors=False)
+    return {str(p.id): p.payload or {} for p in points}
+
+
+async def _astored_payloads(ids: list) -> dict:
+    if _backend() == "numpy":
+        return _stored_payloads(ids)
+    points = await _async_qdrant().retrieve(
+        collection_name=_collection(), ids=ids, with_vectors=False
+    )
+    return {str(p.id): p.payload or {} for p in points}
+
+
+def _drop_stale(hits: list, stored: dict) -> list:
+    """Keep hits the store still holds unchanged; resync the rest into the BM25 index."""
+    fresh, deleted, changed = [], [], {}
+    for hit in hits:
+        payload = stored.get(str(hit.id))
+        if payload == hit.payload:
+            fresh.append(hit)
+        elif payload is None:
+            deleted.append(hit.id)
+        else:
+            changed[hit.id] = payload
+    if deleted:
+        lexical_index().delete(deleted)
+    if changed:
+        lexical_index().upsert(list(changed), list(changed.values()))
+    if len(fresh) < len(hits):
+        RAG_LEXICAL_STALE.inc(len(hits) - len(fresh))
+        logger.info(
+            "RAG: lexical index was stale (%d deleted, %d changed)", len(deleted), len(changed)
+        )
+    return fresh
+
+
 def retrieve_context(query: str, top_k: int = 3) -> str | None:
-    if not query.strip():
+    if not query.strip() or _initializing():
         return None
 
-    client = _qdrant()
-    name = _collection()
+    lexical, confident = _lexical_search(query, top_k)
+    if lexical:
+        fresh = _drop_stale(lexical, _stored_payloads([h.id for h in lexical]))
+        if len(fresh) < len(lexical):
+            lexical, confident = fresh, False
+    if confident:
+        return format_context(_payloads(lexical))
     vector = _embed([query])[0]
-    results = client.search(collection_name=name, query_vector=vector, limit=top_k)
-    if not results:
-        return None
+    if _backend() == "numpy":
+        results = _index().search(vector, limit=top_k)
+    else:
+        results = _qdrant().search(collection_name=_collection(), query_vector=vector, limit=top_k)
+    if lexical:
+        results = reciprocal_rank_fusion([results, lexical], limit=top_k)
+    return format_context(_payloads(results))
+
+
+# Above this many rows a numpy search is run in a worker thread (the matmul releases
+# the GIL) so it can't stall the event loop.
+_INLINE_SEARCH_ROWS = 4096
+
+
+async def _asearch(query: str, top_k: int):
+    vector = (await _aembed([query]))[0]
+    if _backend() == "numpy":
+        index = _index()
+        if len(index) <= _INLINE_SEARCH_ROWS:
+            return index.search(vector, limit=top_k)
+        return await asyncio.to_thread(index.search, vector, top_k)
+    return await _async_qdrant().search(
+        collection_name=_collection(), query_vector=vector, limit=top_k
+    )
+
+
+async def aretrieve(query: str, top_k: int = 3, timeout: float | None = None) -> List[dict]:
+    """Non-blocking retrieval bounded by a per-turn time budget.
+
+    Returns the payloads of the best matches. Keyword hits are first checked
+    against the vector store, and a confident one that is still current is
+    returned without embedding the query; otherwise keyword and vector hits are
+    merged by reciprocal rank fusion. A slow embedding or vector search degrades
+    to the keyword hits (often none) rather than delaying the LLM call.
+    """
+    if not query.strip():
+        return []
+    if _initializing():
+        # The indexes are being filled on another thread; answer without help-center context.
+        RAG_RETRIEVALS.inc(outcome="not_ready")
+        return []
 
-    lines = ["Relevant help-center answers:"]
-    for r in results:
-        payload = r.payload or {}
+    budget = _retrieval_timeout() if timeout is None else timeout
+    started = time.monotonic()
+    lexical, confident = _lexical_search(query, top_k)
+    if lexical:
+        try:
+            stored = await asyncio.wait_for(
+                _astored_payloads([h.id for h in lexical]), timeout=budget
+            )
+        except Exception:
+            logger.warning("RAG: could not check keyword hits against the store", exc_info=True)
+            lexical, confident = [], False
+        else:
+            fresh = _drop_stale(lexical, stored)
+            if len(fresh) < len(lexical):
+                # Stale hits were dropped; let the vector search rank this turn.
+                lexical, confident = fresh, False
+    if confident:
+        RAG_RETRIEVAL_MS.observe((time.monotonic() - started) * 1000)
+        RAG_RETRIEVALS.inc(outcome="lexical")
+        return _payloads(lexical)
+    left = max(0.0, budget - (time.monotonic() - started))
+    try:
+        results = await asyncio.wait_for(_asearch(query, top_k), timeout=left)
+    except asyncio.TimeoutError:
+        RAG_RETRIEVALS.inc(outcome="timeout")
+        logger.warning(
+            "RAG: retrieval exceeded %.0fms budget, using keyword matches", budget * 1000
+        )
+        return _payloads(lexical)
+    except Exception:
+        RAG_RETRIEVALS.inc(outcome="error")
+        raise
+    if lexical:
+        results = reciprocal_rank_fusion([results, lexical], limit=top_k)
+    RAG_RETRIEVAL_MS.observe((time.monotonic() - started) * 1000)
+    RAG_RETRIEVALS.inc(outcome="hit" if results else "empty")
+    return _payloads(results)
+
+
+async def aretrieve_context(
+    query: str, top_k: int = 3, timeout: float | None = None
+) -> str | None:
+    return format_context(await aretrieve(query, top_k=top_k, timeout=timeout))
+
+
+def _payloads(results) -> List[dict]:
+    return [r.payload or {} for r in results or []]
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; close enough for budgeting.
+    return (len(text) + 3) // 4
+
+
+def format_context(payloads: List[dict], max_tokens: int | None = None) -> str | None:
+    """Render retrieved FAQ payloads as a system-message body, best match first.
+
+    Entries that would push the block past ``max_tokens`` are dropped.
+    """
+    lines = [CONTEXT_HEADER]
+    used = estimate_tokens(CONTEXT_HEADER)
+    for payload in payloads:
         q = payload.get("question", "")
         a = payload.get("answer", "")
-        lines.append(f"- Q: {q}\n  A: {a}")
+        entry = f"- Q: {q}\n  A: {a}"
+        cost = estimate_tokens(entry) + 1
+        if max_tokens is not None and used + cost > max_tokens:
+            break
+        lines.append(entry)
+        used += cost
+    if len(lines) == 1:
+        return None
     return "\n".join(lines)
@@ -1,14 +1,209 @@
+import asyncio
 import logging
+import os
+import re
+from collections import Counter
+from typing import List, Optional
 
 from pipecat.processors.frame_processor import FrameProcessor, FrameDirection
-from pipecat.frames.frames import LLMContextFrame, LLMMessagesFrame, StartFrame
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    InterimTranscriptionFrame,
+    LLMContextFrame,
+    LLMMessagesFrame,
+    StartFrame,
+    TranscriptionFrame,
+    UserStoppedSpeakingFrame,
+)
 
-from .rag import retrieve_context
+from .rag import CONTEXT_HEADER, aretrieve, format_context
 
 logger = logging.getLogger("agent-console")
 
 
+def _role(message) -> str | None:
+    return message.get("role") if isinstance(message, dict) else None
+
+
+def is_retrieval_slot(message) -> bool:
+    return _role(message) == "system" and str(message.get("content", "")).startswith(
+        CONTEXT_HEADER
+    )
+
+
+def _speculation_key(text: str) -> str:
+    # Interim and final transcripts differ in casing and punctuation only.
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+_speculation_totals: Counter = Counter()
+
+
+def speculation_stats() -> dict:
+    """Process-wide counters for speculative retrieval across all sessions."""
+    totals = dict(_speculation_totals)
+    finished = totals.get("reused", 0) + totals.get("missed", 0)
+    totals["reuse_rate"] = (totals.get("reused", 0) / finished) if finished else None
+    return totals
+
+
+class SpeculativeRetrieval:
+    """Runs retrieval on the user's words while they are still speaking.
+
+    ``InterimRetrievalProcessor`` feeds it transcripts as they arrive; each new
+    text supersedes (cancels) the previous lookup. ``RAGProcessor`` then calls
+    :meth:`take` with the final user message and reuses the result if it was
+    computed for the same words.
+    """
+
+    def __init__(self, top_k: int = 3, debounce_secs: float = 0.15, min_chars: int = 8):
+        self._top_k = top_k
+        self._debounce_secs = debounce_secs
+        self._min_chars = min_chars
+        self._final_text = ""
+        self._key: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def on_interim(self, text: str) -> None:
+        self._speculate(f"{self._final_text} {text}", debounce=True)
+
+    def on_final(self, text: str) -> None:
+        self._final_text = f"{self._final_text} {text}".strip()
+        self._speculate(self._final_text, debounce=False)
+
+    def end_turn(self) -> None:
+        """Start the next turn's text from scratch, whether or not :meth:`take` ran."""
+        self._final_text = ""
+
+    async def take(self, query: str) -> Optional[List[dict]]:
+        task, key = self._task, self._key
+        self._task, self._key, self._final_text = None, None, ""
+        if task is None:
+            return None
+        if key != _speculation_key(query):
+            task.cancel()
+            _speculation_totals["missed"] += 1
+            return None
+        try:
+            payloads = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            payloads = None
+        if payloads is None:
+            _speculation_totals["missed"] += 1
+            return None
+        _speculation_totals["reused"] += 1
+        return payloads
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        self._task, self._key, self._final_text = None, None, ""
+
+    def _speculate(self, text: str, debounce: bool) -> None:
+        key = _speculation_key(text)
+        if len(key) < self._min_chars or key == self._key:
+            return
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            _speculation_totals["superseded"] += 1
+        self._key = key
+        self._task = asyncio.create_task(
+            self._retrieve(text.strip(), self._debounce_secs if debounce else 0.0)
+        )
+        _speculation_totals["started"] += 1
+
+    async def _retrieve(self, text: str, delay: float) -> Optional[List[dict]]:
+        # The debounce lets rapidly changing interims cancel before any API call.
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            return await aretrieve(text, top_k=self._top_k)
+        except Exception:
+            logger.warning("RAG: speculative retrieval failed", exc_info=True)
+            return None
+
+
+class InterimRetrievalProcessor(FrameProcessor):
+    """Placed right after STT; starts retrieval from interim/final transcripts."""
+
+    def __init__(self, speculation: SpeculativeRetrieval, **kwargs):
+        super().__init__(**kwargs)
+        self._speculation = speculation
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if direction == FrameDirection.DOWNSTREAM:
+            if isinstance(frame, InterimTranscriptionFrame):
+                self._speculation.on_interim(frame.text)
+            elif isinstance(frame, TranscriptionFrame):
+                self._speculation.on_final(frame.text)
+            elif isinstance(frame, (EndFrame, CancelFrame)):
+                self._speculation.cancel()
+        # The user aggregator broadcasts this upstream once the turn's transcripts are in.
+        # RAGProcessor may never see the turn (e.g. an answer cache hit), so reset here.
+        if isinstance(frame, UserStoppedSpeakingFrame):
+            self._speculation.end_turn()
+
+        await self.push_frame(frame, direction)
+
+
 class RAGProcessor(FrameProcessor):
+    """Keeps a single help-center retrieval slot in the LLM context.
+
+    Every user turn replaces the previous slot instead of appending another one,
+    so the prompt does not grow with the number of turns. The slot is placed just
+    before the latest user message, leaving the conversation prefix unchanged.
+    """
+
+    def __init__(
+        self,
+        token_budget: int | None = None,
+        top_k: int = 3,
+        speculation: SpeculativeRetrieval | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        if token_budget is None:
+            token_budget = int(os.environ.get("RAG_CONTEXT_TOKEN_BUDGET", "400"))
+        self._token_budget = token_budget
+        self._top_k = top_k
+        self._speculation = speculation
+
+    async def augment_messages(self, messages: list) -> list:
+        messages = [m for m in messages if not is_retrieval_slot(m)]
+        last_user = next(
+            (i for i in range(len(messages) - 1, -1, -1) if _role(messages[i]) == "user"),
+            None,
+        )
+        if last_user is None or not messages[last_user].get("content"):
+            return messages
+
+        query = str(messages[last_user]["content"])
+        payloads = None
+        if self._speculation is not None:
+            payloads = await self._speculation.take(query)
+        if payloads is None:
+            payloads = await aretrieve(query, top_k=self._top_k)
+
+        # Skip answers the model can already see (system prompt, earlier replies).
+        present = "\n".join(str(m.get("content", "")) for m in messages if isinstance(m, dict))
+        fresh = []
+        for payload in payloads:
+            answer = payload.get("answer", "")
+            if not answer or answer in present:
+                continue
+            present += "\n" + answer
+            fresh.append(payload)
+
+        context = format_context(fresh, max_tokens=self._token_budget)
+        if context:
+            messages.insert(last_user, {"role": "system", "content": context})
+        return messages
+
     async def process_frame(self, frame, direction: FrameDirection):
         # Let the base class handle Start/Cancel/Pause/etc. so the processor is marked started.
         await super().process_frame(frame, direction)
@@ -18,26 +213,11 @@ class RAGProcessor(FrameProcessor):
         ):
             try:
                 if isinstance(frame, LLMContextFrame):
-                    messages = list(frame.context.get_messages())
+                    messages = await self.augment_messages(list(frame.context.get_messages()))
+                    frame.context.set_messages(messages)
                 else:
-                    messages = list(frame.messages)
-                last_user = next(
-                    (m for m in reversed(messages) if m.get("role") == "user"), None
-                )
-                if last_user and last_user.get("content"):
-                    context = retrieve_context(str(last_user["content"]))
-                    if context:
-                        messages.insert(
-                            0,
-                            {
-                                "role": "system",
-                                "content": context,
-                            },
-                        )
-                        if isinstance(frame, LLMContextFrame):
-                            frame.context.set_messages(messages)
-                        else:
-                            frame = LLMMessagesFrame(messages=messages)
+                    messages = await self.augment_messages(list(frame.messages))
+                    frame = LLMMessagesFrame(messages=messages)
             except Exception:
                 logger.exception("RAG: failed to augment context")
 
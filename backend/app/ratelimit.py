@@ -0,0 +1,179 @@
+"""Rate limiting for API routes.
+
+Limits use a sliding-window counter: two integer counters per key (this
+window and the previous one), weighted by how far into the current window we
+are. That is constant memory per key regardless of request rate. Only allowed
+requests count: a rejected hit is taken back, so a client retrying on 429 is
+let in once its estimate decays, at the ``Retry-After`` it was given. Counters live
+in a pluggable store: in process memory (bounded, idle keys evicted) or in a
+Redis-compatible server so the limit holds across API processes.
+"""
+
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Protocol, Tuple
+
+logger = logging.getLogger("agent-console")
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitPolicy:
+    name: str
+    limit: int
+    window_secs: float
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after_secs: int
+
+
+class RateLimitStore(Protocol):
+    async def hit(self, key: str, window: int, ttl_secs: float) -> Tuple[int, int]:
+        """Count one hit in ``window`` and return (current, previous) window counts."""
+
+    async def unhit(self, key: str, window: int) -> None:
+        """Take back a hit counted in ``window`` (the request was rejected)."""
+
+
+class MemoryStore:
+    """In-process counters, LRU-bounded to ``max_keys`` with idle keys expiring."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> (window index, current count, previous count, expires_at)
+        self._counters: "OrderedDict[str, Tuple[int, int, int, float]]" = OrderedDict()
+        self.evictions = 0
+
+    async def hit(self, key: str, window: int, ttl_secs: float) -> Tuple[int, int]:
+        now = time.monotonic()
+        entry = self._counters.pop(key, None)
+        current = previous = 0
+        if entry is not None and entry[3] > now:
+            last_window, count, last_previous, _ = entry
+            if last_window == window:
+                current, previous = count, last_previous
+            elif last_window == window - 1:
+                previous = count
+        current += 1
+        self._counters[key] = (window, current, previous, now + ttl_secs)
+        self._evict(now)
+        return current, previous
+
+    async def unhit(self, key: str, window: int) -> None:
+        entry = self._counters.get(key)
+        if entry is not None and entry[0] == window and entry[1] > 0:
+            self._counters[key] = (window, entry[1] - 1, entry[2], entry[3])
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def _evict(self, now: float) -> None:
+        # Entries are in last-hit order, so idle keys sit at the front.
+        while self._counters:
+            key, entry = next(iter(self._counters.items()))
+            if entry[3] > now and len(self._counters) <= self.max_keys:
+                break
+            del self._counters[key]
+            self.evictions += 1
+
+
+class RedisStore:
+    """Counters in a Redis-compatible server, shared by every API process."""
+
+    def __init__(self, client, prefix: str = "ratelimit"):
+        self._client = client
+        self._prefix = prefix
+
+    async def hit(self, key: str, window: int, ttl_secs: float) -> Tuple[int, int]:
+        current_key = f"{self._prefix}:{key}:{window}"
+        pipe = self._client.pipeline(transaction=True)
+        pipe.incr(current_key)
+        pipe.expire(current_key, math.ceil(ttl_secs))
+        pipe.get(f"{self._prefix}:{key}:{window - 1}")
+        current, _, previous = await pipe.execute()
+        return int(current), int(previous or 0)
+
+    async def unhit(self, key: str, window: int) -> None:
+        await self._client.decr(f"{self._prefix}:{key}:{window}")
+
+
+class RateLimiter:
+    def __init__(self, store: RateLimitStore, fail_open: bool = True):
+        self.store = store
+        self.fail_open = fail_open
+        self.rejected = 0
+
+    async def check(self, policy: RateLimitPolicy, key: str) -> RateLimitResult:
+        now = time.time()
+        window = int(now // policy.window_secs)
+        store_key = f"{policy.name}:{key}"
+        try:
+            current, previous = await self.store.hit(
+                store_key, window, ttl_secs=policy.window_secs * 2
+            )
+        except Exception:
+            # A store outage should not take session creation down with it.
+            logger.warning("rate limit store unavailable", exc_info=True)
+            if self.fail_open:
+                return RateLimitResult(True, policy.limit, 0)
+            raise
+
+        left_secs = (window + 1) * policy.window_secs - now
+        estimate = previous * left_secs / policy.window_secs + current
+        if estimate <= policy.limit:
+            return RateLimitResult(True, int(policy.limit - estimate), 0)
+        self.rejected += 1
+        try:
+            await self.store.unhit(store_key, window)
+        except Exception:
+            logger.warning("rate limit store unavailable", exc_info=True)
+        retry_after = _retry_after_secs(policy, current - 1, previous, left_secs)
+        return RateLimitResult(False, 0, max(1, math.ceil(retry_after)))
+
+
+def _retry_after_secs(
+    policy: RateLimitPolicy, current: int, previous: int, left_secs: float
+) -> float:
+    """Seconds until one more request fits, as the previous window's weight decays."""
+    window = policy.window_secs
+    room = policy.limit - 1 - current
+    if room >= 0:
+        # It fits later in this window once enough of the previous window has slid out.
+        return max(0.0, left_secs - room * window / previous) if previous else 0.0
+    # It needs the next window, where this window's count is the one decaying.
+    return left_secs + max(0.0, window * (1 - (policy.limit - 1) / current))
+
+
+def _policies() -> Dict[str, RateLimitPolicy]:
+    return {
+        "create_session": RateLimitPolicy(
+            "create_session",
+            limit=int(os.environ.get("RATE_LIMIT_SESSIONS", "5")),
+            window_secs=float(os.environ.get("RATE_LIMIT_SESSIONS_WINDOW_SECS", "60")),
+        ),
+    }
+
+
+POLICIES: Dict[str, RateLimitPolicy] = _policies()
+
+_limiter: RateLimiter | None = None
+
+
+def rate_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        if os.environ.get("RATE_LIMIT_BACKEND", "memory") == "redis":
+            from .clients import clients
+
+            store: RateLimitStore = RedisStore(clients().redis())
+        else:
+            store = MemoryStore(max_keys=int(os.environ.get("RATE_LIMIT_MAX_KEYS", "100000")))
+        _limiter = RateLimiter(store)
+    return _limiter
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional
+
+from .daily import ROOM_TTL_SECS, DailyRoom, provision_room
+
+logger = logging.getLogger("agent-console")
+
+ProvisionFn = Callable[[str], Awaitable[DailyRoom]]
+
+
+class RoomPool:
+    """Keeps ``size`` Daily rooms with pre-minted tokens ready for new sessions.
+
+    A background task tops the pool up and drops rooms whose remaining lifetime
+    is below ``min_ttl_secs``, the longest call, so a handed-out room is good for
+    a full call just like one created on demand. When the pool is empty,
+    :meth:`acquire` provisions a room on demand.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        min_ttl_secs: float = 45 * 60,
+        provision: ProvisionFn = provision_room,
+        refill_concurrency: int = 4,
+        check_interval_secs: float = 30.0,
+    ):
+        self.size = size
+        self.min_ttl_secs = min_ttl_secs
+        self._provision = provision
+        self._refill_concurrency = refill_concurrency
+        self._check_interval_secs = check_interval_secs
+        self._rooms: Deque[DailyRoom] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def acquire(self, session_name: str) -> DailyRoom:
+        self._evict_expiring()
+        self._wakeup.set()
+        if self._rooms:
+            self.hits += 1
+            return self._rooms.popleft()
+        self.misses += 1
+        return await self._provision(session_name)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "available": len(self._rooms),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "failures": self.failures,
+        }
+
+    def _evict_expiring(self) -> None:
+        deadline = time.time() + self.min_ttl_secs
+        fresh = deque(room for room in self._rooms if room.expires_at > deadline)
+        self.evicted += len(self._rooms) - len(fresh)
+        self._rooms = fresh
+
+    async def _refill_loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            self._evict_expiring()
+            missing = min(self.size - len(self._rooms), self._refill_concurrency)
+            if missing > 0:
+                results = await asyncio.gather(
+                    *(self._provision(f"agent-{uuid.uuid4()}") for _ in range(missing)),
+                    return_exceptions=True,
+                )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        self.failures += 1
+                        logger.warning("room pool: provisioning failed: %s", result)
+                    else:
+                        self._rooms.append(result)
+                if len(self._rooms) < self.size and not any(
+                    isinstance(r, BaseException) for r in results
+                ):
+                    continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._check_interval_secs)
+            except asyncio.TimeoutError:
+                pass
+
+
+_pool: RoomPool | None = None
+
+
+def start_room_pool() -> RoomPool | None:
+    global _pool
+    size = int(os.environ.get("ROOM_POOL_SIZE", "0"))
+    if size <= 0:
+        return None
+    max_call_secs = float(os.environ.get("MAX_CALL_SECS", "2700"))
+    if max_call_secs >= ROOM_TTL_SECS:
+        # Every pooled room would be discarded as soon as it was made.
+        logger.error(
+            "room pool disabled: MAX_CALL_SECS (%.0f) must be below ROOM_TTL_SECS (%d)",
+            max_call_secs,
+            ROOM_TTL_SECS,
+        )
+        return None
+    _pool = RoomPool(size=size, min_ttl_secs=max_call_secs)
+    _pool.start()
+    return _pool
+
+
+async def stop_room_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
+
+
+def room_pool() -> RoomPool | None:
+    return _pool
+
+
+async def acquire_room(session_name: str) -> DailyRoom:
+    if _pool is None:
+        return await provision_room(session_name)
+    return await _pool.acquire(session_name)
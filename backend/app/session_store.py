@@ -0,0 +1,203 @@
+"""Session records shared between API nodes.
+
+The node that runs a session's bot keeps the live ``SessionState`` in
+``app.state``; it also mirrors every state event into a session store, tagged
+with its ``NODE_ID``. Any node can then answer ``GET /sessions/{id}/state``
+from the stored record and stream ``/events`` from the store's pub/sub
+channel, so replicas behind a load balancer don't need sticky routing.
+
+The default store is in-process memory (a single node); ``SESSION_STORE=redis``
+uses a Redis-compatible server shared by all nodes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional, Protocol, Set, Tuple
+
+logger = logging.getLogger("agent-console")
+
+NODE_ID = os.environ.get("NODE_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+# Published on a session's channel when its record is deleted.
+_CLOSED = {"type": "closed"}
+
+
+class SessionStore(Protocol):
+    async def save(self, session_id: str, record: dict, ttl_secs: float) -> None: ...
+
+    async def load(self, session_id: str) -> Optional[dict]: ...
+
+    async def delete(self, session_id: str) -> None: ...
+
+    async def publish(self, session_id: str, event: dict) -> None: ...
+
+    def subscribe(self, session_id: str) -> AsyncIterator[dict]:
+        """Yield events published for the session until its record is deleted."""
+
+
+class MemorySessionStore:
+    def __init__(self):
+        self._records: Dict[str, Tuple[float, dict]] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    async def save(self, session_id: str, record: dict, ttl_secs: float) -> None:
+        self._records[session_id] = (time.monotonic() + ttl_secs, record)
+
+    async def load(self, session_id: str) -> Optional[dict]:
+        entry = self._records.get(session_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._records[session_id]
+            return None
+        return entry[1]
+
+    async def delete(self, session_id: str) -> None:
+        self._records.pop(session_id, None)
+        await self.publish(session_id, _CLOSED)
+
+    async def publish(self, session_id: str, event: dict) -> None:
+        for queue in self._subscribers.get(session_id, ()):
+            queue.put_nowait(event)
+
+    async def subscribe(self, session_id: str) -> AsyncIterator[dict]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(session_id, set()).add(queue)
+        try:
+            while (event := await queue.get()) != _CLOSED:
+                yield event
+        finally:
+            subscribers = self._subscribers.get(session_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[session_id]
+
+
+class RedisSessionStore:
+    def __init__(self, client, prefix: str = "session"):
+        self._client = client
+        self._prefix = prefix
+
+    def _key(self, session_id: str) -> str:
+        return f"{self._prefix}:{session_id}"
+
+    def _channel(self, session_id: str) -> str:
+        return f"{self._prefix}-events:{session_id}"
+
+    async def save(self, session_id: str, record: dict, ttl_secs: float) -> None:
+        await self._client.set(self._key(session_id), json.dumps(record), ex=max(1, int(ttl_secs)))
+
+    async def load(self, session_id: str) -> Optional[dict]:
+        raw = await self._client.get(self._key(session_id))
+        return json.loads(raw) if raw else None
+
+    async def delete(self, session_id: str) -> None:
+        await self._client.delete(self._key(session_id))
+        await self.publish(session_id, _CLOSED)
+
+    async def publish(self, session_id: str, event: dict) -> None:
+        await self._client.publish(self._channel(session_id), json.dumps(event))
+
+    async def subscribe(self, session_id: str) -> AsyncIterator[dict]:
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self._channel(session_id))
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                event = json.loads(message["data"])
+                if event == _CLOSED:
+                    return
+                yield event
+        finally:
+            await pubsub.unsubscribe(self._channel(session_id))
+            await pubsub.aclose()
+
+
+class SessionMirror:
+    """Writes local session events to the store without blocking bot callbacks.
+
+    Events for one session are published in order by a single flush task per
+    session; only the latest snapshot is saved as the session's record.
+    """
+
+    def __init__(self, store: SessionStore, ttl_secs: float = 3600.0):
+        self.store = store
+        self.ttl_secs = ttl_secs
+        self._pending: Dict[str, Deque[Optional[dict]]] = {}
+        self._flushing: Dict[str, asyncio.Task] = {}
+        self.failures = 0
+
+    def update(self, session_id: str, event: dict, expires_at: float | None = None) -> None:
+        record = dict(event, node_id=NODE_ID, expires_at=expires_at)
+        self._enqueue(session_id, record)
+
+    def remove(self, session_id: str) -> None:
+        self._enqueue(session_id, None)
+
+    async def flush(self) -> None:
+        """Wait for every queued write; used on shutdown and in tests."""
+        while self._flushing:
+            await asyncio.gather(*self._flushing.values(), return_exceptions=True)
+
+    def _enqueue(self, session_id: str, record: Optional[dict]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._pending.setdefault(session_id, deque()).append(record)
+        if session_id not in self._flushing:
+            self._flushing[session_id] = loop.create_task(self._flush(session_id))
+
+    async def _flush(self, session_id: str) -> None:
+        queue = self._pending[session_id]
+        try:
+            while queue:
+                record = queue.popleft()
+                try:
+                    if record is None:
+                        await self.store.delete(session_id)
+                        continue
+                    await self.store.publish(session_id, record)
+                    if not queue:
+                        await self.store.save(session_id, record, self._ttl(record))
+                except Exception:
+                    self.failures += 1
+                    logger.warning("session store write failed for %s", session_id, exc_info=True)
+        finally:
+            del self._pending[session_id]
+            del self._flushing[session_id]
+
+    def _ttl(self, record: dict) -> float:
+        expires_at = record.get("expires_at")
+        if expires_at is None:
+            return self.ttl_secs
+        return max(1.0, min(self.ttl_secs, expires_at - time.time()))
+
+
+_mirror: SessionMirror | None = None
+
+
+def session_mirror() -> SessionMirror:
+    global _mirror
+    if _mirror is None:
+        if os.environ.get("SESSION_STORE", "memory") == "redis":
+            from .clients import clients
+
+            store: SessionStore = RedisSessionStore(clients().redis())
+        else:
+            store = MemorySessionStore()
+        _mirror = SessionMirror(
+            store, ttl_secs=float(os.environ.get("SESSION_STORE_TTL_SECS", "3600"))
+        )
+    return _mirror
+
+
+def session_store() -> SessionStore:
+    return session_mirror().store
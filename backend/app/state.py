@@ -1,31 +1,129 @@
-from dataclasses import dataclass
-from typing import Dict, Optional
+import asyncio
+import logging
+import os
 import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
+from .events import close_events
 from .models import AgentConfig
+from .session_store import NODE_ID, session_mirror
 
+logger = logging.getLogger("agent-console")
 
-@dataclass
+
+@dataclass(slots=True)
 class SessionState:
     config: AgentConfig
+    node_id: str = NODE_ID
     bot_state: str = "idle"
     round_trip_latency_ms: int | None = None
-    created_at: float = time.time()
+    stage_latency_ms: Optional[Dict[str, int | None]] = None
+    created_at: float = field(default_factory=time.time)
+    last_seen: float = field(default_factory=time.time)
+    expires_at: Optional[float] = None
+    finished_at: Optional[float] = None
     room_url: Optional[str] = None
     client_token: Optional[str] = None
     bot_token: Optional[str] = None
-    task: Optional[object] = None
+    task: Optional[asyncio.Task] = None
     last_error: Optional[str] = None
 
 
+class SessionLimitError(RuntimeError):
+    pass
+
+
 _sessions: Dict[str, SessionState] = {}
 
 
+def _max_sessions() -> int:
+    return int(os.environ.get("MAX_SESSIONS", "500"))
+
+
+def _idle_ttl() -> float:
+    return float(os.environ.get("SESSION_IDLE_TTL_SECS", "900"))
+
+
+def _finished_grace() -> float:
+    # Finished sessions stay readable for a while so the UI can show the final state.
+    return float(os.environ.get("SESSION_FINISHED_GRACE_SECS", "120"))
+
+
 def create_session(session_id: str, config: AgentConfig) -> SessionState:
+    if len(_sessions) >= _max_sessions():
+        evict_expired()
+        if len(_sessions) >= _max_sessions():
+            raise SessionLimitError("too many live sessions")
     state = SessionState(config=config)
     _sessions[session_id] = state
     return state
 
 
 def get_session(session_id: str) -> SessionState | None:
-    return _sessions.get(session_id)
+    state = _sessions.get(session_id)
+    if state is not None:
+        state.last_seen = time.time()
+    return state
+
+
+def remove_session(session_id: str) -> None:
+    state = _sessions.pop(session_id, None)
+    close_events(session_id)
+    session_mirror().remove(session_id)
+    if state is not None and state.task is not None and not state.task.done():
+        state.task.cancel()
+
+
+def session_count() -> int:
+    return len(_sessions)
+
+
+def active_bot_count() -> int:
+    return sum(1 for state in _sessions.values() if state.task is not None)
+
+
+def active_bot_tasks() -> List[asyncio.Task]:
+    return [s.task for s in _sessions.values() if s.task is not None and not s.task.done()]
+
+
+def attach_task(state: SessionState, task: asyncio.Task) -> None:
+    """Track the bot task; once it ends the record drops its reference to it."""
+    state.task = task
+
+    def _on_done(_task: asyncio.Task) -> None:
+        state.task = None
+        state.finished_at = time.time()
+
+    task.add_done_callback(_on_done)
+
+
+def _is_expired(state: SessionState, now: float) -> bool:
+    # Daily's room expiry only blocks new joins, so a call in progress keeps its session.
+    if state.task is not None:
+        return False
+    if state.expires_at is not None and now >= state.expires_at:
+        return True
+    if state.finished_at is not None:
+        return now - state.finished_at > _finished_grace()
+    # A session without a bot (e.g. room creation never finished) expires when idle.
+    return state.task is None and now - state.last_seen > _idle_ttl()
+
+
+def evict_expired(now: float | None = None) -> int:
+    now = time.time() if now is None else now
+    expired = [sid for sid, state in _sessions.items() if _is_expired(state, now)]
+    for sid in expired:
+        remove_session(sid)
+    if expired:
+        logger.info("evicted %d expired sessions", len(expired))
+    return len(expired)
+
+
+async def sweep_sessions(interval_secs: float = 30.0) -> None:
+    while True:
+        await asyncio.sleep(interval_secs)
+        try:
+            evict_expired()
+        except Exception:
+            logger.exception("session sweep failed")
@@ -0,0 +1,326 @@
+"""Cache of synthesized speech for fixed and frequent utterances.
+
+Audio is stored as raw PCM keyed by (voice, speed, temperature, sample rate,
+normalized text), in memory or as one file per utterance under
+``TTS_CACHE_PATH`` so worker processes and restarts share it. The cache is
+size-bounded with least-recently-used eviction.
+
+``CachedCartesiaTTSService`` serves hits straight into the pipeline as audio
+frames. A sentence that misses ``admit_after`` times is synthesized once in
+the background over Cartesia's HTTP API and served from the cache after that.
+Utterances listed in ``TTS_CACHE_PREWARM_FILE`` are synthesized at startup.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import uuid
+from collections import OrderedDict
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from pipecat.frames.frames import (
+    Frame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    TTSTextFrame,
+)
+from pipecat.services.cartesia.tts import CartesiaTTSService
+from pipecat.utils.text.base_text_aggregator import AggregationType
+
+from .clients import clients
+from .embedding_cache import normalize
+
+logger = logging.getLogger("agent-console")
+
+# Cached audio is pushed in chunks of this length.
+_CHUNK_SECS = 0.1
+
+
+def tts_key(voice: str, speed: float, temperature: float, sample_rate: int, text: str) -> str:
+    raw = f"{voice}|{speed}|{temperature}|{sample_rate}|{normalize(text)}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+class TTSAudioCache:
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        path: str | None = None,
+        admit_after: int = 2,
+        max_tracked: int = 10_000,
+        concurrency: int = 2,
+    ):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.admit_after = admit_after
+        self.max_tracked = max_tracked
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fills = 0
+        self.bytes = 0
+        # key -> size in LRU order; audio lives in _audio (memory) or under path.
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._audio: Dict[str, bytes] = {}
+        self._seen: "OrderedDict[str, int]" = OrderedDict()
+        self._filling: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        if path:
+            self._scan()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        audio = None
+        if key in self._entries or self._adopt(key):
+            audio = self._read(key)
+        if audio is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        if not audio or len(audio) > self.max_bytes:
+            return
+        if self.path:
+            try:
+                self._write(key, audio)
+            except OSError:
+                logger.exception("tts cache: failed to write entry")
+                return
+        else:
+            self._audio[key] = audio
+        self.bytes += len(audio) - self._entries.pop(key, 0)
+        self._entries[key] = len(audio)
+        self._seen.pop(key, None)
+        self._evict()
+
+    def note_miss(self, key: str) -> bool:
+        """Count a miss; True once ``key`` has missed often enough to be cached."""
+        count = self._seen.pop(key, 0) + 1
+        self._seen[key] = count
+        while len(self._seen) > self.max_tracked:
+            self._seen.popitem(last=False)
+        return count >= self.admit_after and key not in self._filling
+
+    def fill(self, key: str, synthesize: Callable[[], Awaitable[bytes]]) -> None:
+        """Synthesize ``key`` in the background, off the call's critical path."""
+        if key in self._filling or key in self._entries:
+            return
+        self._filling.add(key)
+        task = asyncio.get_running_loop().create_task(self._fill(key, synthesize))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        """Wait for background fills; used on shutdown and in tests."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else None,
+            "fills": self.fills,
+            "evictions": self.evictions,
+            "persistent": bool(self.path),
+        }
+
+    async def _fill(self, key: str, synthesize: Callable[[], Awaitable[bytes]]) -> None:
+        try:
+            async with self._semaphore:
+                audio = await synthesize()
+            self.put(key, audio)
+            self.fills += 1
+        except Exception:
+            logger.warning("tts cache: background synthesis failed", exc_info=True)
+        finally:
+            self._filling.discard(key)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.pcm")
+
+    def _scan(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".pcm"):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.bytes += size
+        self._evict()
+
+    def _adopt(self, key: str) -> bool:
+        # Another process sharing the directory may have written it.
+        if not self.path:
+            return False
+        try:
+            size = os.path.getsize(self._file(key))
+        except OSError:
+            return False
+        self._entries[key] = size
+        self.bytes += size
+        self._evict()
+        return key in self._entries
+
+    def _read(self, key: str) -> Optional[bytes]:
+        if not self.path:
+            return self._audio.get(key)
+        try:
+            with open(self._file(key), "rb") as f:
+                audio = f.read()
+            os.utime(self._file(key))
+            return audio
+        except OSError:
+            self.bytes -= self._entries.pop(key, 0)
+            return None
+
+    def _write(self, key: str, audio: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, self._file(key))
+
+    def _evict(self) -> None:
+        while self.bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+            if self.path:
+                try:
+                    os.remove(self._file(key))
+                except OSError:
+                    pass
+            else:
+                self._audio.pop(key, None)
+
+
+class CachedCartesiaTTSService(CartesiaTTSService):
+    """Cartesia TTS that plays cached sentences instead of synthesizing them."""
+
+    def __init__(
+        self, *, cache: TTSAudioCache, speed: float = 1.0, temperature: float = 0.3, **kwargs
+    ):
+        super().__init__(speed=speed, temperature=temperature, **kwargs)
+        self._cache = cache
+        self._speed = speed
+        self._temperature = temperature
+
+    def cache_key(self, text: str, sample_rate: int | None = None) -> str:
+        return tts_key(
+            self._voice_id, self._speed, self._temperature, sample_rate or self.sample_rate, text
+        )
+
+    async def synthesize(self, text: str, sample_rate: int) -> bytes:
+        """Render ``text`` to raw PCM with Cartesia's HTTP API, as the stream would."""
+        payload = {
+            "model_id": self.model_name,
+            "transcript": text.strip(),
+            "voice": {"mode": "id", "id": self._voice_id},
+            "output_format": dict(self._settings["output_format"], sample_rate=sample_rate),
+        }
+        for name in ("language", "speed"):
+            if self._settings[name]:
+                payload[name] = self._settings[name]
+        if self._settings["generation_config"]:
+            payload["generation_config"] = self._settings["generation_config"].model_dump(
+                exclude_none=True
+            )
+        headers = {"Cartesia-Version": self._cartesia_version, "X-API-Key": self._api_key}
+        url = f"{os.environ.get('CARTESIA_API_URL', 'https://api.cartesia.ai')}/tts/bytes"
+        async with clients().http("cartesia").post(url, json=payload, headers=headers) as resp:
+            resp.raise_for_status()
+            return await resp.read()
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        key = self.cache_key(text)
+        audio = self._cache.get(key)
+        if audio is None:
+            if self._cache.note_miss(key):
+                sample_rate = self.sample_rate
+                self._cache.fill(key, lambda: self.synthesize(text, sample_rate))
+            async for frame in super().run_tts(text):
+                yield frame
+            return
+
+        # Close any streaming context first; audio contexts play in creation order.
+        await self.flush_audio()
+        context_id = str(uuid.uuid4())
+        await self.create_audio_context(context_id)
+        yield TTSStartedFrame()
+        # Cartesia's word timestamps normally produce the text for the context
+        # aggregator; cached audio has none, so send the sentence as one frame.
+        await self.append_to_audio_context(
+            context_id, TTSTextFrame(text.strip(), aggregated_by=AggregationType.SENTENCE)
+        )
+        for chunk in _chunks(audio, self.sample_rate):
+            await self.append_to_audio_context(
+                context_id,
+                TTSAudioRawFrame(audio=chunk, sample_rate=self.sample_rate, num_channels=1),
+            )
+        await self.append_to_audio_context(context_id, TTSStoppedFrame())
+        await self.remove_audio_context(context_id)
+        yield None
+
+
+def _chunks(audio: bytes, sample_rate: int) -> Iterable[bytes]:
+    size = max(2, int(sample_rate * _CHUNK_SECS) * 2)
+    for start in range(0, len(audio), size):
+        yield audio[start : start + size]
+
+
+async def prewarm_tts_cache(
+    service: CachedCartesiaTTSService, texts: Iterable[str], sample_rate: int
+) -> int:
+    """Synthesize ``texts`` that are not cached yet; returns how many were added."""
+    cache = service._cache
+    added = 0
+    for text in texts:
+        key = service.cache_key(text, sample_rate)
+        if cache.get(key) is not None:
+            continue
+        try:
+            cache.put(key, await service.synthesize(text, sample_rate))
+            added += 1
+        except Exception:
+            logger.warning("tts cache: prewarm failed for %r", text, exc_info=True)
+    logger.info("tts cache: prewarmed %d utterances", added)
+    return added
+
+
+def prewarm_texts() -> List[str]:
+    """Utterances from ``TTS_CACHE_PREWARM_FILE``, one per line."""
+    path = os.environ.get("TTS_CACHE_PREWARM_FILE")
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+_cache: TTSAudioCache | None = None
+
+
+def tts_cache() -> TTSAudioCache | None:
+    """The process-wide cache, or ``None`` unless ``TTS_CACHE`` is enabled."""
+    global _cache
+    if _cache is None and os.environ.get("TTS_CACHE", "0").lower() in ("1", "true", "yes"):
+        _cache = TTSAudioCache(
+            max_bytes=int(float(os.environ.get("TTS_CACHE_MAX_MB", "64")) * 1024 * 1024),
+            path=os.environ.get("TTS_CACHE_PATH") or None,
+            admit_after=int(os.environ.get("TTS_CACHE_ADMIT_AFTER", "2")),
+        )
+    return _cache
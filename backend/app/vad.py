@@ -0,0 +1,45 @@
+"""Process-wide Silero VAD model.
+
+``SileroVADAnalyzer`` normally loads its own ONNX inference session, which
+puts a model load on the call-answer path and keeps a copy of the weights per
+session. The inference session itself is stateless, so it is loaded once here
+and every session gets a lightweight model wrapper with its own RNN state.
+"""
+
+import copy
+import logging
+import threading
+import time
+
+import numpy as np
+from pipecat.audio.vad.silero import SileroOnnxModel, SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+
+logger = logging.getLogger("agent-console")
+
+_template: SileroOnnxModel | None = None
+_lock = threading.Lock()
+
+
+def load_vad_model() -> SileroOnnxModel:
+    """Load the shared ONNX session (once) and run one inference to warm it up."""
+    global _template
+    with _lock:
+        if _template is None:
+            started = time.perf_counter()
+            _template = SileroVADAnalyzer()._model
+            _template(np.zeros(512, dtype=np.float32), 16000)
+            _template.reset_states()
+            logger.info("silero vad loaded in %.0f ms", (time.perf_counter() - started) * 1000)
+    return _template
+
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """``SileroVADAnalyzer`` that reuses the process-wide inference session."""
+
+    def __init__(self, *, sample_rate: int | None = None, params: VADParams | None = None):
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        self._model = copy.copy(load_vad_model())
+        self._model.reset_states()
+        self._last_reset_time = 0
+
@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("agent-console")
+
+
+@dataclass
+class Hit:
+    # Same attribute names as qdrant's ScoredPoint so callers can treat both alike.
+    id: Any
+    score: float
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class NumpyIndex:
+    """In-process cosine-similarity index.
+
+    Embeddings are L2-normalized once at insert time and kept in a single
+    contiguous float32 matrix, so a query is one matrix-vector product plus an
+    ``argpartition`` top-k. The matrix has spare rows, so upserts write in place
+    and only a full buffer is copied (doubling). With ``path`` set, :meth:`flush`
+    saves the matrix as ``.npy``, which is memory-mapped on load so large corpora
+    are shared through the page cache.
+
+    Writes may come from a worker thread (ingestion) while the event loop
+    searches; a lock keeps each search on a consistent matrix, ids and payloads.
+    """
+
+    def __init__(self, path: str | None = None):
+        self._path = path
+        # Rows past ``_count`` are spare capacity.
+        self._rows = np.empty((0, 0), dtype=np.float32)
+        self._count = 0
+        self._dirty = False
+        self._ids: List[Any] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._positions: Dict[Any, int] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(self._matrix_file):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def dim(self) -> int:
+        return self._rows.shape[1]
+
+    @property
+    def _matrix(self) -> np.ndarray:
+        return self._rows[: self._count]
+
+    @property
+    def _matrix_file(self) -> str:
+        return os.path.join(self._path, "vectors.npy")
+
+    @property
+    def _payload_file(self) -> str:
+        return os.path.join(self._path, "payloads.json")
+
+    def ids(self) -> List[Any]:
+        return list(self._ids)
+
+    def payload(self, point_id: Any) -> Dict[str, Any] | None:
+        pos = self._positions.get(point_id)
+        return None if pos is None else self._payloads[pos]
+
+    def upsert(
+        self,
+        ids: Sequence[Any],
+        vectors: Sequence[Sequence[float]],
+        payloads: Sequence[Dict[str, Any]],
+    ) -> None:
+        if not ids:
+            return
+        # A batch may repeat an id; keep its last write, in first-seen order.
+        last = {point_id: i for i, point_id in enumerate(ids)}
+        if len(last) < len(ids):
+            ids = list(last)
+            vectors = [vectors[i] for i in last.values()]
+            payloads = [payloads[i] for i in last.values()]
+        rows = _normalize(np.asarray(vectors, dtype=np.float32))
+        with self._lock:
+            added = sum(1 for point_id in ids if point_id not in self._positions)
+            self._reserve(self._count + added, rows.shape[1])
+            for point_id, row, payload in zip(ids, rows, payloads):
+                pos = self._positions.get(point_id)
+                if pos is not None:
+                    self._rows[pos] = row
+                    self._payloads[pos] = payload
+                    continue
+                pos = len(self._ids)
+                self._rows[pos] = row
+                self._positions[point_id] = pos
+                self._ids.append(point_id)
+                self._payloads.append(payload)
+            self._count = len(self._ids)
+            self._dirty = True
+
+    def delete(self, ids: Sequence[Any]) -> None:
+        with self._lock:
+            drop = {self._positions[i] for i in ids if i in self._positions}
+            if not drop:
+                return
+            keep = [p for p in range(len(self._ids)) if p not in drop]
+            self._rows = np.ascontiguousarray(self._matrix[keep])
+            self._count = len(keep)
+            self._ids = [self._ids[p] for p in keep]
+            self._payloads = [self._payloads[p] for p in keep]
+            self._positions = {point_id: pos for pos, point_id in enumerate(self._ids)}
+            self._dirty = True
+
+    def search(self, vector: Sequence[float], limit: int = 3) -> List[Hit]:
+        return self.search_batch([vector], limit=limit)[0]
+
+    def search_batch(self, vectors: Sequence[Sequence[float]], limit: int = 3) -> List[List[Hit]]:
+        with self._lock:
+            # Upserts only append to these lists, so the first ``count`` entries stay valid.
+            matrix, ids, payloads = self._matrix, self._ids, self._payloads
+        count = len(matrix)
+        if not count or limit <= 0:
+            return [[] for _ in vectors]
+        queries = _normalize(np.asarray(vectors, dtype=np.float32))
+        scores = queries @ matrix.T
+        k = min(limit, count)
+        if k < count:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), (len(queries), k))
+        results = []
+        for row_scores, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-row_scores[candidates])]
+            results.append(
+                [
+                    Hit(id=ids[p], score=float(row_scores[p]), payload=payloads[p])
+                    for p in ordered
+                ]
+            )
+        return results
+
+    def flush(self) -> None:
+        """Write the index to ``path`` if it changed; upserts and deletes stay in memory."""
+        if not self._path or not self._dirty:
+            return
+        with self._lock:
+            matrix, ids, payloads = self._matrix, list(self._ids), list(self._payloads)
+            self._dirty = False
+        os.makedirs(self._path, exist_ok=True)
+        tmp_matrix = self._matrix_file + ".tmp.npy"
+        tmp_payloads = self._payload_file + ".tmp"
+        np.save(tmp_matrix, matrix)
+        with open(tmp_payloads, "w") as f:
+            json.dump({"ids": ids, "payloads": payloads}, f)
+        os.replace(tmp_matrix, self._matrix_file)
+        os.replace(tmp_payloads, self._payload_file)
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        """Make the buffer writable with room for ``rows`` rows, growing it geometrically."""
+        if self._count and dim != self.dim:
+            raise ValueError(f"vectors have {dim} dimensions, the index has {self.dim}")
+        buffer = self._rows
+        if buffer.flags.writeable and len(buffer) >= rows and buffer.shape[1] == dim:
+            return
+        grown = np.empty((max(rows, 2 * len(buffer), 64), dim), dtype=np.float32)
+        if self._count:
+            grown[: self._count] = buffer[: self._count]
+        self._rows = grown
+
+    def _load(self) -> None:
+        # Read-only until the first write copies it into a growable buffer.
+        self._rows = np.load(self._matrix_file, mmap_mode="r")
+        self._count = len(self._rows)
+        with open(self._payload_file) as f:
+            data = json.load(f)
+        self._ids = data["ids"]
+        self._payloads = data["payloads"]
+        self._positions = {point_id: pos for pos, point_id in enumerate(self._ids)}
+        logger.info("RAG: loaded %d vectors from %s", len(self._ids), self._path)
@@ -0,0 +1,433 @@
+"""Bot worker processes.
+
+With ``BOT_WORKERS`` set, bot pipelines run in a pool of worker processes
+instead of on the API process's event loop, so VAD inference and audio frame
+processing for different calls use different cores. Each session is placed on
+the least-loaded worker; its state, latency and error callbacks are relayed
+back over a per-worker pipe and invoked on the API event loop. Each worker also
+reports its metrics and cache stats over that pipe every few seconds, so
+``/metrics`` and the stats endpoints cover bots running in workers.
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing.connection import Connection, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import metrics
+from .models import AgentConfig
+
+logger = logging.getLogger("agent-console")
+
+_mp = multiprocessing.get_context("spawn")
+
+
+class WorkerPoolFullError(RuntimeError):
+    pass
+
+
+class BotWorkerError(RuntimeError):
+    pass
+
+
+def _resolve(path: str) -> Callable:
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+# --- Worker process side -------------------------------------------------------
+
+
+def _worker_main(index: int, commands, events, *options) -> None:
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(index, commands, events, *options))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _report(index: int, events, reporter: Optional[str], interval_secs: float) -> None:
+    from . import metrics
+    from .admission import LoadSampler
+
+    stats = _resolve(reporter) if reporter else None
+    # The bots' loop and CPU live here, so admission control in the API process needs them.
+    sampler = LoadSampler(interval_secs)
+    load = None
+    while True:
+        try:
+            report = {"metrics": metrics.snapshot(), "stats": stats() if stats else {}}
+            events.send(("stats", index, dict(report, load=load)))
+        except Exception:
+            logger.exception("bot worker %d: stats report failed", index)
+        lag_ms, cpu = await sampler.sample()
+        load = {"loop_lag_ms": lag_ms, "cpu": cpu}
+
+
+async def _serve(
+    index: int,
+    commands,
+    events,
+    runner: str,
+    initializer: Optional[str],
+    reporter: Optional[str],
+    report_interval_secs: float,
+) -> None:
+    run_bot = _resolve(runner)
+    if initializer:
+        try:
+            _resolve(initializer)()
+        except Exception:
+            logger.exception("bot worker %d: init failed", index)
+
+    loop = asyncio.get_running_loop()
+    tasks: Dict[str, asyncio.Task] = {}
+    report = asyncio.create_task(_report(index, events, reporter, report_interval_secs))
+
+    async def _run_session(session_id: str, room_url: str, token: str, config: dict) -> None:
+        def relay(kind: str) -> Callable:
+            return lambda value: events.send((kind, session_id, value))
+
+        error = None
+        try:
+            await run_bot(
+                room_url=room_url,
+                token=token,
+                config=AgentConfig.model_validate(config),
+                on_state_change=relay("state"),
+                on_latency=relay("latency"),
+                on_error=relay("error"),
+                on_stage_latency=relay("stages"),
+            )
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("bot worker %d: session %s failed", index, session_id)
+            error = "bot session failed"
+        finally:
+            tasks.pop(session_id, None)
+            events.send(("ended", session_id, error))
+
+    while True:
+        kind, *args = await loop.run_in_executor(None, commands.get)
+        if kind == "start":
+            session_id = args[0]
+            tasks[session_id] = asyncio.create_task(_run_session(*args))
+        elif kind == "cancel":
+            task = tasks.get(args[0])
+            if task is not None:
+                task.cancel()
+        elif kind == "stop":
+            break
+
+    report.cancel()
+    for task in list(tasks.values()):
+        task.cancel()
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    await _close_worker_clients()
+
+
+async def _close_worker_clients() -> None:
+    from .clients import close_clients
+    from .embedding_cache import embedding_cache
+
+    await close_clients()
+    embedding_cache().close()
+
+
+# --- API process side ----------------------------------------------------------
+
+
+@dataclass(slots=True)
+class _Worker:
+    index: int
+    process: multiprocessing.process.BaseProcess
+    commands: "multiprocessing.Queue"
+    # Read end of the worker's own event pipe. A worker that dies mid-write can
+    # only break its own pipe; a queue shared by all workers would jam for everyone.
+    events: Connection
+    active: int = 0
+    started: int = 0
+
+
+@dataclass(slots=True)
+class _RemoteSession:
+    worker: _Worker
+    done: asyncio.Future
+    on_state_change: Callable
+    on_latency: Callable
+    on_error: Callable
+    on_stage_latency: Optional[Callable]
+
+
+class WorkerPool:
+    """Runs ``run_bot`` in ``size`` worker processes, at most ``max_sessions`` each.
+
+    :meth:`start_bot` places a session synchronously (raising
+    :class:`WorkerPoolFullError` when every worker is at its cap) and returns a
+    future that resolves when the remote bot ends. Cancelling the future
+    cancels the bot in its worker. A worker that dies fails its sessions and is
+    replaced.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_sessions: int = 20,
+        runner: str = "app.bot:run_bot",
+        initializer: Optional[str] = "app.bot:init_bot_worker",
+        reporter: Optional[str] = "app.bot:runtime_stats",
+        check_interval_secs: float = 1.0,
+        report_interval_secs: float = 5.0,
+    ):
+        self.size = size
+        self.max_sessions = max_sessions
+        self._runner = runner
+        self._initializer = initializer
+        self._reporter = reporter
+        self._check_interval_secs = check_interval_secs
+        self._report_interval_secs = report_interval_secs
+        self._reports: Dict[int, dict] = {}
+        # index -> (loop lag ms, CPU share, monotonic time received)
+        self._loads: Dict[int, Tuple[float, float, float]] = {}
+        self._workers: List[_Worker] = []
+        self._sessions: Dict[str, _RemoteSession] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pump: Optional[threading.Thread] = None
+        self._monitor: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.restarts = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        if self._pump is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._workers = [self._spawn(i) for i in range(self.size)]
+        self._pump = threading.Thread(
+            target=self._pump_events, name="bot-worker-events", daemon=True
+        )
+        self._pump.start()
+        self._monitor = asyncio.create_task(self._watch())
+
+    async def stop(self, timeout_secs: float = 10.0) -> None:
+        if self._pump is None:
+            return
+        self._stopping = True
+        self._monitor.cancel()
+        for worker in self._workers:
+            worker.commands.put(("stop",))
+        for worker in self._workers:
+            await asyncio.to_thread(worker.process.join, timeout_secs)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        await asyncio.to_thread(self._pump.join)
+        self._pump = None
+        for session_id in list(self._sessions):
+            self._finish(session_id, "bot worker pool stopped")
+
+    def has_capacity(self) -> bool:
+        return any(w.active < self.max_sessions for w in self._workers if w.process.is_alive())
+
+    def start_bot(
+        self,
+        session_id: str,
+        *,
+        room_url: str,
+        token: str,
+        config: AgentConfig,
+        on_state_change,
+        on_latency,
+        on_error,
+        on_stage_latency=None,
+    ) -> asyncio.Future:
+        worker = self._place()
+        done = self._loop.create_future()
+        self._sessions[session_id] = _RemoteSession(
+            worker, done, on_state_change, on_latency, on_error, on_stage_latency
+        )
+        worker.active += 1
+        worker.started += 1
+        worker.commands.put(("start", session_id, room_url, token, config.model_dump()))
+        done.add_done_callback(lambda _: self._release(session_id))
+        return done
+
+    def worker_stats(self) -> Dict[int, dict]:
+        """Latest cache and retrieval stats reported by each worker, by index."""
+        return dict(self._reports)
+
+    def worker_load(self) -> List[Tuple[float, float]]:
+        """(loop lag ms, CPU share) last reported by each worker.
+
+        An overdue report counts as loop lag, since a saturated worker loop is
+        exactly what keeps it from reporting.
+        """
+        now = time.monotonic()
+        loads = []
+        for lag_ms, cpu, received_at in self._loads.values():
+            overdue_ms = (now - received_at - 2 * self._report_interval_secs) * 1000
+            loads.append((max(lag_ms, overdue_ms), cpu))
+        return loads
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "max_sessions_per_worker": self.max_sessions,
+            "active": sum(w.active for w in self._workers),
+            "restarts": self.restarts,
+            "rejected": self.rejected,
+            "workers": [
+                {
+                    "pid": w.process.pid,
+                    "alive": w.process.is_alive(),
+                    "active": w.active,
+                    "started": w.started,
+                }
+                for w in self._workers
+            ],
+        }
+
+    def _spawn(self, index: int) -> _Worker:
+        commands = _mp.Queue()
+        events, worker_events = _mp.Pipe(duplex=False)
+        process = _mp.Process(
+            target=_worker_main,
+            args=(
+                index,
+                commands,
+                worker_events,
+                self._runner,
+                self._initializer,
+                self._reporter,
+                self._report_interval_secs,
+            ),
+            name=f"bot-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        # Only the child holds the write end now, so its exit shows up here as EOF.
+        worker_events.close()
+        return _Worker(index=index, process=process, commands=commands, events=events)
+
+    def _place(self) -> _Worker:
+        candidates = [w for w in self._workers if w.process.is_alive()]
+        worker = min(candidates, key=lambda w: w.active, default=None)
+        if worker is None or worker.active >= self.max_sessions:
+            self.rejected += 1
+            raise WorkerPoolFullError("all bot workers are at capacity")
+        return worker
+
+    def _release(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        session.worker.active -= 1
+        if session.done.cancelled() and session.worker.process.is_alive():
+            session.worker.commands.put(("cancel", session_id))
+
+    def _finish(self, session_id: str, error: Optional[str]) -> None:
+        session = self._sessions.get(session_id)
+        if session is None or session.done.done():
+            return
+        if error:
+            session.done.set_exception(BotWorkerError(error))
+        else:
+            session.done.set_result(None)
+
+    def _pump_events(self) -> None:
+        # Blocking pipe reads happen on this thread; dispatch happens on the loop.
+        while not self._stopping:
+            readers = [w.events for w in list(self._workers) if not w.events.closed]
+            for conn in wait(readers, timeout=self._check_interval_secs):
+                try:
+                    message = conn.recv()
+                except Exception:
+                    # The worker exited, possibly mid-message; _reap replaces it.
+                    conn.close()
+                    continue
+                self._loop.call_soon_threadsafe(self._dispatch, *message)
+        for worker in self._workers:
+            worker.events.close()
+
+    async def _watch(self) -> None:
+        # Liveness is checked on its own timer: with steady event traffic the pump
+        # never idles, so it can't be what notices a crashed worker.
+        while True:
+            await asyncio.sleep(self._check_interval_secs)
+            self._reap()
+
+    def _dispatch(self, kind: str, session_id, value) -> None:
+        if kind == "stats":
+            # ``session_id`` carries the worker index for these.
+            self._reports[session_id] = value["stats"]
+            load = value.get("load")
+            if load:
+                self._loads[session_id] = (load["loop_lag_ms"], load["cpu"], time.monotonic())
+            metrics.set_remote(f"bot-worker-{session_id}", value["metrics"])
+            return
+        session = self._sessions.get(session_id)
+        if session is None:
+            return
+        if kind == "ended":
+            self._finish(session_id, value)
+            return
+        callback = {
+            "state": session.on_state_change,
+            "latency": session.on_latency,
+            "error": session.on_error,
+            "stages": session.on_stage_latency,
+        }.get(kind)
+        if callback is None:
+            return
+        try:
+            callback(value)
+        except Exception:
+            logger.exception("bot worker: %s callback failed", kind)
+
+    def _reap(self) -> None:
+        if self._stopping:
+            return
+        for i, worker in enumerate(self._workers):
+            if worker.process.is_alive():
+                continue
+            logger.warning(
+                "bot worker %d exited with %s; restarting", worker.index, worker.process.exitcode
+            )
+            for session_id, session in list(self._sessions.items()):
+                if session.worker is worker:
+                    self._finish(session_id, "bot worker exited")
+            self._loads.pop(worker.index, None)
+            self._workers[i] = self._spawn(worker.index)
+            self.restarts += 1
+
+
+_pool: WorkerPool | None = None
+
+
+def start_worker_pool() -> WorkerPool | None:
+    global _pool
+    size = int(os.environ.get("BOT_WORKERS", "0"))
+    if size <= 0:
+        return None
+    _pool = WorkerPool(
+        size=size, max_sessions=int(os.environ.get("BOT_WORKER_MAX_SESSIONS", "20"))
+    )
+    _pool.start()
+    return _pool
+
+
+async def stop_worker_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
+
+
+def worker_pool() -> WorkerPool | None:
+    return _pool
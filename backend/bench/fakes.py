@@ -0,0 +1,508 @@
+"""Offline stand-ins for external providers, used by tests and local benchmarks.
+
+Kept out of the ``app`` package so production images never ship them.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import List
+
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    CancelFrame,
+    EndFrame,
+    InputAudioRawFrame,
+    InterimTranscriptionFrame,
+    LLMContextFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    LLMTextFrame,
+    StartFrame,
+    TranscriptionFrame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    TTSTextFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+
+@dataclass
+class FakeDailyRoom:
+    url: str
+    name: str
+
+
+class FakeDailyRESTHelper:
+    """Implements the parts of ``DailyRESTHelper`` that ``app.daily`` uses."""
+
+    def __init__(self, latency_secs: float = 0.0, fail_times: int = 0):
+        self.latency_secs = latency_secs
+        self.fail_times = fail_times
+        self.rooms_created = 0
+        self.tokens_issued = 0
+        self._ids = itertools.count(1)
+
+    async def create_room(self, params) -> FakeDailyRoom:
+        await asyncio.sleep(self.latency_secs)
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("fake daily: room creation failed")
+        self.rooms_created += 1
+        name = params.name or f"room-{next(self._ids)}"
+        return FakeDailyRoom(url=f"https://fake.daily.co/{name}", name=name)
+
+    async def get_token(
+        self, room_url: str, expiry_time: float = 60 * 60, owner: bool = True, **_
+    ) -> str:
+        await asyncio.sleep(self.latency_secs)
+        self.tokens_issued += 1
+        role = "owner" if owner else "guest"
+        return f"token-{role}-{room_url.rsplit('/', 1)[-1]}-{self.tokens_issued}"
+
+
+async def fake_run_bot(
+    room_url: str,
+    token: str,
+    config,
+    on_state_change,
+    on_latency,
+    on_error,
+    on_stage_latency=None,
+) -> None:
+    """Stand-in for ``bot.run_bot`` whose behaviour is picked by the token:
+    ``fail`` raises, ``hang`` runs until cancelled, ``crash`` kills the process and
+    ``chatty`` reports a latency every 10 ms until cancelled."""
+    on_state_change("listening")
+    if token == "fail":
+        raise RuntimeError("fake bot: session failed")
+    if token == "crash":
+        os._exit(1)
+    if token == "hang":
+        await asyncio.Event().wait()
+    while token == "chatty":
+        on_latency(1)
+        await asyncio.sleep(0.01)
+    on_latency(123)
+    if on_stage_latency is not None:
+        on_stage_latency({"total_ms": 123})
+    on_state_change("idle")
+
+
+def fake_runtime_stats() -> dict:
+    """Stand-in for ``bot.runtime_stats`` in worker processes."""
+    return {"embedding_cache": {"hits": 3, "misses": 1}}
+
+
+# --- Fake pipeline processors -------------------------------------------------
+#
+# These stand in for DailyTransport, DeepgramSTTService, OpenAILLMService and
+# CartesiaTTSService so the real pipeline topology from ``bot.build_pipeline_task``
+# can run offline (see ``bench/load.py``). They emit the same frame types at
+# realistic rates: 20 ms audio frames in both directions, interim transcripts
+# while the user speaks, and streamed LLM tokens.
+
+SAMPLE_RATE = 16000
+CHUNK_SECS = 0.02
+_SILENT_CHUNK = b"\0\0" * int(SAMPLE_RATE * CHUNK_SECS)
+
+
+@dataclass
+class FakeTimings:
+    word_secs: float = 0.3
+    pause_secs: float = 0.5
+    stt_final_secs: float = 0.15
+    llm_ttft_secs: float = 0.35
+    llm_token_secs: float = 0.02
+    tts_ttfa_secs: float = 0.15
+    bot_turn_timeout_secs: float = 30.0
+
+
+class FakeTransportInput(FrameProcessor):
+    """Plays a scripted caller: speaks each utterance as 20 ms audio frames framed
+    by VAD start/stop, then waits for the bot to finish answering."""
+
+    def __init__(self, utterances: List[str], timings: FakeTimings, **kwargs):
+        super().__init__(**kwargs)
+        self._utterances = utterances
+        self._timings = timings
+        self._bot_done = asyncio.Event()
+        self._script_task = None
+        self.finished = asyncio.Event()
+        self.turns_completed = 0
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, StartFrame):
+            await self.push_frame(frame, direction)
+            self._script_task = self.create_task(self._run_script())
+            return
+        if isinstance(frame, (EndFrame, CancelFrame)) and self._script_task:
+            await self.cancel_task(self._script_task)
+            self._script_task = None
+        if isinstance(frame, BotStoppedSpeakingFrame) and direction == FrameDirection.UPSTREAM:
+            self._bot_done.set()
+        await self.push_frame(frame, direction)
+
+    async def _run_script(self):
+        timings = self._timings
+        for text in self._utterances:
+            await asyncio.sleep(timings.pause_secs)
+            self._bot_done.clear()
+            await self.push_frame(VADUserStartedSpeakingFrame())
+            chunks = int(len(text.split()) * timings.word_secs / CHUNK_SECS)
+            for _ in range(max(1, chunks)):
+                await self.push_frame(
+                    InputAudioRawFrame(audio=_SILENT_CHUNK, sample_rate=SAMPLE_RATE, num_channels=1)
+                )
+                await asyncio.sleep(CHUNK_SECS)
+            await self.push_frame(VADUserStoppedSpeakingFrame())
+            try:
+                await asyncio.wait_for(self._bot_done.wait(), timeout=timings.bot_turn_timeout_secs)
+            except asyncio.TimeoutError:
+                break
+            self.turns_completed += 1
+        self.finished.set()
+
+
+class FakeSTTService(FrameProcessor):
+    """Emits interim transcripts every 200 ms of speech and a final one after VAD stop."""
+
+    def __init__(self, utterances: List[str], timings: FakeTimings, **kwargs):
+        super().__init__(**kwargs)
+        self._utterances = iter(utterances)
+        self._timings = timings
+        self._words: List[str] = []
+        self._chunks = 0
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, VADUserStartedSpeakingFrame):
+            self._words = next(self._utterances, "").split()
+            self._chunks = 0
+        elif isinstance(frame, InputAudioRawFrame):
+            self._chunks += 1
+            if self._chunks % 10 == 0 and self._words:
+                heard = int(self._chunks * CHUNK_SECS / self._timings.word_secs)
+                partial = " ".join(self._words[: max(1, heard)])
+                await self.push_frame(InterimTranscriptionFrame(partial, "bench-user", _now_iso()))
+            return
+        elif isinstance(frame, VADUserStoppedSpeakingFrame):
+            await self.push_frame(frame, direction)
+            self.create_task(self._finalize(" ".join(self._words)))
+            return
+
+        await self.push_frame(frame, direction)
+
+    async def _finalize(self, text: str):
+        await asyncio.sleep(self._timings.stt_final_secs)
+        await self.push_frame(TranscriptionFrame(text, "bench-user", _now_iso()))
+
+
+class FakeLLMService(FrameProcessor):
+    """Answers every context frame with a streamed, canned reply."""
+
+    def __init__(self, timings: FakeTimings, reply: str | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self._timings = timings
+        self._reply = reply or "Sure. Open the Zepliner app and tap your eSIM to activate it."
+        self.requests = 0
+        self.last_messages: list = []
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, LLMContextFrame):
+            self.requests += 1
+            self.last_messages = list(frame.context.get_messages())
+            await asyncio.sleep(self._timings.llm_ttft_secs)
+            await self.push_frame(LLMFullResponseStartFrame())
+            for token in self._reply.split():
+                await self.push_frame(LLMTextFrame(f"{token} "))
+                await asyncio.sleep(self._timings.llm_token_secs)
+            await self.push_frame(LLMFullResponseEndFrame())
+            return
+
+        await self.push_frame(frame, direction)
+
+
+class FakeTTSService(FrameProcessor):
+    """Synthesizes each sentence into 20 ms chunks of silence after a TTFA delay."""
+
+    def __init__(self, timings: FakeTimings, **kwargs):
+        super().__init__(**kwargs)
+        self._timings = timings
+        self._buffer = ""
+        self._first = True
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, LLMFullResponseStartFrame):
+            self._buffer = ""
+            self._first = True
+        elif isinstance(frame, LLMTextFrame):
+            self._buffer += frame.text
+            if self._buffer.rstrip().endswith((".", "?", "!")):
+                await self._speak()
+            return
+        elif isinstance(frame, LLMFullResponseEndFrame):
+            await self._speak()
+
+        await self.push_frame(frame, direction)
+
+    async def _speak(self):
+        sentence, self._buffer = self._buffer.strip(), ""
+        if not sentence:
+            return
+        if self._first:
+            await asyncio.sleep(self._timings.tts_ttfa_secs)
+            self._first = False
+        await self.push_frame(TTSStartedFrame())
+        chunks = int(len(sentence.split()) * self._timings.word_secs / CHUNK_SECS)
+        for _ in range(max(1, chunks)):
+            await self.push_frame(
+                TTSAudioRawFrame(audio=_SILENT_CHUNK, sample_rate=SAMPLE_RATE, num_channels=1)
+            )
+        await self.push_frame(TTSTextFrame(sentence, aggregated_by="sentence"))
+        await self.push_frame(TTSStoppedFrame())
+
+
+class FakeTransportOutput(FrameProcessor):
+    """Plays TTS audio out in real time and reports bot speaking start/stop."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._speaking = False
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, TTSAudioRawFrame):
+            if not self._speaking:
+                self._speaking = True
+                await self.push_frame(BotStartedSpeakingFrame())
+                await self.push_frame(BotStartedSpeakingFrame(), FrameDirection.UPSTREAM)
+            await asyncio.sleep(CHUNK_SECS)
+            return
+        if isinstance(frame, LLMFullResponseEndFrame) and self._speaking:
+            self._speaking = False
+            await self.push_frame(frame, direction)
+            await self.push_frame(BotStoppedSpeakingFrame())
+            await self.push_frame(BotStoppedSpeakingFrame(), FrameDirection.UPSTREAM)
+            return
+
+        await self.push_frame(frame, direction)
+
+
+# --- Fake OpenAI embeddings ---------------------------------------------------
+
+
+def fake_embedding(text: str, dim: int = 64) -> List[float]:
+    """Deterministic bag-of-words vector, so similar questions land close together."""
+    vector = [0.0] * dim
+    for word in re.findall(r"\w+", text.lower()):
+        digest = hashlib.blake2b(word.encode(), digest_size=4).digest()
+        vector[int.from_bytes(digest, "little") % dim] += 1.0
+    return vector
+
+
+class _Embeddings:
+    def __init__(self, latency_secs: float):
+        self.latency_secs = latency_secs
+        self.calls = 0
+
+    def _response(self, input):
+        self.calls += 1
+        texts = [input] if isinstance(input, str) else list(input)
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=fake_embedding(t)) for t in texts]
+        )
+
+
+class _AsyncEmbeddings(_Embeddings):
+    async def create(self, model: str, input, **_):
+        await asyncio.sleep(self.latency_secs)
+        return self._response(input)
+
+
+class _SyncEmbeddings(_Embeddings):
+    def create(self, model: str, input, **_):
+        time.sleep(self.latency_secs)
+        return self._response(input)
+
+
+class _AsyncCompletions:
+    """Chat completions that echo the first words of the last message."""
+
+    def __init__(self, latency_secs: float):
+        self.latency_secs = latency_secs
+        self.calls = 0
+
+    async def create(self, model: str, messages, max_tokens: int = 64, **_):
+        self.calls += 1
+        await asyncio.sleep(self.latency_secs)
+        words = str(messages[-1]["content"]).split()[:max_tokens]
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=" ".join(words)))]
+        )
+
+
+class FakeAsyncOpenAI:
+    """Offline stand-in for ``AsyncOpenAI`` covering the embeddings and chat APIs."""
+
+    def __init__(self, latency_secs: float = 0.05):
+        self.embeddings = _AsyncEmbeddings(latency_secs)
+        self.chat = SimpleNamespace(completions=_AsyncCompletions(latency_secs))
+
+    def with_options(self, **_):
+        return self
+
+    async def close(self):
+        pass
+
+
+class FakeOpenAI:
+    """Offline stand-in for the synchronous ``OpenAI`` client."""
+
+    def __init__(self, latency_secs: float = 0.0):
+        self.embeddings = _SyncEmbeddings(latency_secs)
+
+    def close(self):
+        pass
+
+
+# --- Fake Redis ----------------------------------------------------------------
+
+
+class FakeRedis:
+    """In-memory stand-in for ``redis.asyncio.Redis`` covering the commands we use."""
+
+    def __init__(self):
+        self._data: dict = {}
+        self._expires: dict = {}
+        self._channels: dict = {}
+        self.commands = 0
+
+    def _alive(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    async def get(self, key: str):
+        self.commands += 1
+        return self._data[key] if self._alive(key) else None
+
+    async def incr(self, key: str) -> int:
+        self.commands += 1
+        value = int(self._data[key]) + 1 if self._alive(key) else 1
+        self._data[key] = str(value).encode()
+        return value
+
+    async def decr(self, key: str) -> int:
+        self.commands += 1
+        value = int(self._data[key]) - 1 if self._alive(key) else -1
+        self._data[key] = str(value).encode()
+        return value
+
+    async def expire(self, key: str, seconds: float) -> bool:
+        self.commands += 1
+        if not self._alive(key):
+            return False
+        self._expires[key] = time.monotonic() + seconds
+        return True
+
+    async def set(self, key: str, value, ex: float | None = None) -> bool:
+        self.commands += 1
+        self._data[key] = value.encode() if isinstance(value, str) else value
+        self._expires.pop(key, None)
+        if ex is not None:
+            self._expires[key] = time.monotonic() + ex
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        self.commands += 1
+        removed = sum(1 for key in keys if self._alive(key))
+        for key in keys:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return removed
+
+    async def publish(self, channel: str, message) -> int:
+        self.commands += 1
+        data = message.encode() if isinstance(message, str) else message
+        queues = self._channels.get(channel, ())
+        for queue in queues:
+            queue.put_nowait({"type": "message", "channel": channel.encode(), "data": data})
+        return len(queues)
+
+    def pubsub(self) -> "_FakePubSub":
+        return _FakePubSub(self)
+
+    def pipeline(self, transaction: bool = True) -> "_FakePipeline":
+        return _FakePipeline(self)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class _FakePubSub:
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._subscribed: set = set()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._redis._channels.setdefault(channel, set()).add(self._queue)
+            self._subscribed.add(channel)
+            self._queue.put_nowait({"type": "subscribe", "channel": channel.encode(), "data": 1})
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or tuple(self._subscribed):
+            self._redis._channels.get(channel, set()).discard(self._queue)
+            self._subscribed.discard(channel)
+
+    async def listen(self):
+        while self._subscribed:
+            yield await self._queue.get()
+
+    async def aclose(self) -> None:
+        await self.unsubscribe()
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._calls: list = []
+
+    def __getattr__(self, name: str):
+        command = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._calls.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list:
+        calls, self._calls = self._calls, []
+        return [await command(*args, **kwargs) for command, args, kwargs in calls]
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,234 @@
+"""Offline load test for the voice pipeline.
+
+Runs N concurrent sessions through the real pipeline (aggregators, RAG,
+speculative retrieval, observer) with the fake transport, STT, LLM, TTS and
+embedding providers from ``bench.fakes``, then reports throughput, event-loop
+lag, per-stage latency percentiles and memory per session::
+
+    cd backend && python -m bench.load --sessions 50 --turns 3
+
+Pass ``--max-p95-ms`` to exit non-zero when total round-trip p95 regresses.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import time
+from typing import Dict, List
+
+os.environ.setdefault("RAG_BACKEND", "numpy")
+
+from pipecat.frames.frames import EndFrame  # noqa: E402
+from pipecat.pipeline.runner import PipelineRunner  # noqa: E402
+
+from app.bot import build_pipeline_task  # noqa: E402
+from app.clients import clients  # noqa: E402
+from app.models import AgentConfig  # noqa: E402
+from app.observability import STAGES, BotStateObserver  # noqa: E402
+from app.rag import init_collection  # noqa: E402
+from bench.fakes import (  # noqa: E402
+    FakeAsyncOpenAI,
+    FakeLLMService,
+    FakeOpenAI,
+    FakeSTTService,
+    FakeTimings,
+    FakeTransportInput,
+    FakeTransportOutput,
+    FakeTTSService,
+)
+
+UTTERANCES = [
+    "How do I activate my eSIM?",
+    "Which countries does Zepliner cover?",
+    "Can I get a refund if the eSIM does not work?",
+    "Does the plan include hotspot tethering?",
+]
+
+
+def percentile(values: List[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        # ru_maxrss is KiB on Linux, bytes on macOS; only the peak is available.
+        scale = 1e6 if sys.platform == "darwin" else 1e3
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+class LoopMonitor:
+    """Samples event-loop lag (oversleep of a short timer) and peak RSS."""
+
+    def __init__(self, interval_secs: float = 0.01):
+        self.interval_secs = interval_secs
+        self.lag_ms: List[float] = []
+        self.peak_rss_mb = rss_mb()
+
+    async def run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval_secs)
+            self.lag_ms.append((time.perf_counter() - start - self.interval_secs) * 1000)
+            if len(self.lag_ms) % 50 == 0:
+                self.peak_rss_mb = max(self.peak_rss_mb, rss_mb())
+
+
+async def run_session(index: int, turns: int, timings: FakeTimings, stages: List[Dict]) -> int:
+    utterances = [UTTERANCES[(index + t) % len(UTTERANCES)] for t in range(turns)]
+    transport_input = FakeTransportInput(utterances, timings)
+    observer = BotStateObserver(
+        on_state_change=lambda state: None,
+        on_latency=lambda ms: None,
+        on_error=lambda error: None,
+        on_stage_latency=stages.append,
+    )
+    task = build_pipeline_task(
+        AgentConfig(),
+        transport_input=transport_input,
+        stt=FakeSTTService(utterances, timings),
+        llm=FakeLLMService(timings),
+        tts=FakeTTSService(timings),
+        transport_output=FakeTransportOutput(),
+        observer=observer,
+    )
+    runner = PipelineRunner(handle_sigint=False)
+    run = asyncio.create_task(runner.run(task))
+    await transport_input.finished.wait()
+    await task.queue_frame(EndFrame())
+    await run
+    return transport_input.turns_completed
+
+
+async def run_benchmark(
+    sessions: int,
+    turns: int,
+    ramp_secs: float = 1.0,
+    timings: FakeTimings | None = None,
+    embed_latency_secs: float = 0.05,
+) -> dict:
+    timings = timings or FakeTimings()
+    clients().override(
+        openai=FakeAsyncOpenAI(latency_secs=embed_latency_secs), openai_sync=FakeOpenAI()
+    )
+    init_collection()
+
+    monitor = LoopMonitor()
+    baseline_rss = rss_mb()
+    monitor_task = asyncio.create_task(monitor.run())
+    stages: List[Dict] = []
+
+    async def staggered(i: int) -> int:
+        await asyncio.sleep(ramp_secs * i / max(1, sessions))
+        return await run_session(i, turns, timings, stages)
+
+    started = time.perf_counter()
+    completed = await asyncio.gather(*(staggered(i) for i in range(sessions)))
+    wall_secs = time.perf_counter() - started
+    monitor_task.cancel()
+
+    total_turns = sum(completed)
+    stage_stats = {}
+    for stage in STAGES:
+        values = [s[stage] for s in stages if s.get(stage) is not None]
+        stage_stats[stage] = {
+            "p50": percentile(values, 0.5),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+        }
+    return {
+        "sessions": sessions,
+        "turns": total_turns,
+        "expected_turns": sessions * turns,
+        "wall_secs": round(wall_secs, 2),
+        "turns_per_sec": round(total_turns / wall_secs, 2) if wall_secs else None,
+        "loop_lag_ms": {
+            "p50": percentile(monitor.lag_ms, 0.5),
+            "p95": percentile(monitor.lag_ms, 0.95),
+            "p99": percentile(monitor.lag_ms, 0.99),
+            "max": max(monitor.lag_ms, default=None),
+        },
+        "stages_ms": stage_stats,
+        "memory_mb_per_session": round(
+            max(0.0, monitor.peak_rss_mb - baseline_rss) / max(1, sessions), 3
+        ),
+    }
+
+
+def _fmt(value) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.1f}" if isinstance(value, float) else str(value)
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"sessions={report['sessions']} turns={report['turns']}/{report['expected_turns']} "
+        f"wall={report['wall_secs']}s throughput={report['turns_per_sec']} turns/s "
+        f"memory={report['memory_mb_per_session']} MB/session"
+    )
+    lag = report["loop_lag_ms"]
+    print(
+        f"event loop lag ms: p50={_fmt(lag['p50'])} p95={_fmt(lag['p95'])} "
+        f"p99={_fmt(lag['p99'])} max={_fmt(lag['max'])}"
+    )
+    print(f"{'stage':<20}{'p50':>8}{'p95':>8}{'p99':>8}")
+    for stage, values in report["stages_ms"].items():
+        print(f"{stage:<20}" + "".join(f"{_fmt(values[q]):>8}" for q in ("p50", "p95", "p99")))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--ramp-secs", type=float, default=1.0)
+    parser.add_argument("--llm-ttft-ms", type=float, default=350)
+    parser.add_argument("--tts-ttfa-ms", type=float, default=150)
+    parser.add_argument("--embed-ms", type=float, default=50)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--max-p95-ms", type=float, help="fail if total_ms p95 exceeds this")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    from loguru import logger as pipecat_logger
+
+    pipecat_logger.remove()
+    pipecat_logger.add(sys.stderr, level="WARNING")
+
+    timings = FakeTimings(
+        llm_ttft_secs=args.llm_ttft_ms / 1000, tts_ttfa_secs=args.tts_ttfa_ms / 1000
+    )
+    report = asyncio.run(
+        run_benchmark(
+            args.sessions,
+            args.turns,
+            ramp_secs=args.ramp_secs,
+            timings=timings,
+            embed_latency_secs=args.embed_ms / 1000,
+        )
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    p95 = report["stages_ms"]["total_ms"]["p95"]
+    if report["turns"] < report["expected_turns"]:
+        sys.exit("some turns never completed")
+    if args.max_p95_ms is not None and (p95 is None or p95 > args.max_p95_ms):
+        sys.exit(f"total_ms p95 {p95} exceeds {args.max_p95_ms}")
+
+
+if __name__ == "__main__":
+    main()
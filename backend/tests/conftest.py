@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    # The app (and pipecat) are asyncio-only.
+    return "asyncio"
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionController, AdmissionRejected
+
+
+@pytest.mark.anyio
+async def test_waiters_get_freed_slots_and_full_queue_is_rejected():
+    controller = AdmissionController(max_bots=1, queue_size=1, queue_timeout_secs=1.0)
+    first = await controller.acquire()
+    waiting = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    assert controller.queue_depth == 1
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire()
+    assert rejected.value.reason == "queue_full"
+    assert rejected.value.retry_after_secs == 1
+
+    first.release()
+    first.release()
+    second = await asyncio.wait_for(waiting, timeout=1)
+    assert controller.active == 1
+    second.release()
+    assert controller.active == 0
+
+
+@pytest.mark.anyio
+async def test_waiter_is_rejected_at_deadline():
+    controller = AdmissionController(max_bots=1, queue_timeout_secs=0.05)
+    await controller.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire()
+    assert rejected.value.reason == "timeout"
+    assert controller.queue_depth == 0
+    assert controller.stats()["rejected"] == 1
+
+
+@pytest.mark.anyio
+async def test_limit_shrinks_under_load_and_recovers():
+    controller = AdmissionController(max_bots=10, max_loop_lag_ms=50, max_cpu=0.9)
+    tickets = [await controller.acquire() for _ in range(10)]
+
+    controller.update_limit(loop_lag_ms=120, cpu=0.5)
+    assert controller.limit == 9
+    controller.update_limit(loop_lag_ms=5, cpu=0.95)
+    assert controller.limit == 8
+
+    for ticket in tickets[:5]:
+        ticket.release()
+    controller.update_limit(loop_lag_ms=5, cpu=0.2)
+    assert controller.limit == 8
+
+    waiting = asyncio.create_task(controller.acquire())
+    for _ in range(3):
+        await controller.acquire()
+    await asyncio.sleep(0)
+    assert controller.queue_depth == 1
+    controller.update_limit(loop_lag_ms=5, cpu=0.2)
+    assert controller.limit == 9
+    await asyncio.wait_for(waiting, timeout=1)
+
+
+def test_load_without_bots_does_not_shrink_the_limit():
+    controller = AdmissionController(max_bots=10, max_loop_lag_ms=50, max_cpu=0.9)
+
+    controller.update_limit(loop_lag_ms=800, cpu=1.0)
+    assert controller.limit == 10
+
+    controller.limit = 3
+    controller.update_limit(loop_lag_ms=800, cpu=1.0)
+    controller.update_limit(loop_lag_ms=5, cpu=0.1)
+    assert controller.limit == 4
+
+
+@pytest.mark.anyio
+async def test_saturated_bot_workers_lower_the_limit():
+    # This process is idle; the bots' worker processes are not.
+    controller = AdmissionController(
+        max_bots=10,
+        max_cpu=0.9,
+        sample_interval_secs=0.01,
+        worker_load=lambda: [(5, 0.2), (8, 0.99)],
+    )
+    tickets = [await controller.acquire() for _ in range(10)]
+    controller.start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        await controller.stop()
+
+    assert controller.limit < 10 and controller.cpu >= 0.99
+    for ticket in tickets:
+        ticket.release()
@@ -0,0 +1,131 @@
+import time
+
+import pytest
+
+from app import answer_cache as answer_cache_module
+from app import clients as clients_module
+from app import embedding_cache, rag
+from app.answer_cache import AnswerCacheSession, SemanticAnswerCache, answer_scope
+from app.clients import ClientRegistry
+from app.context_window import SUMMARY_HEADER
+from bench.fakes import FakeTimings, fake_embedding
+from bench.load import run_benchmark
+
+
+def test_similar_question_in_same_scope_hits():
+    cache = SemanticAnswerCache(threshold=0.9)
+    scope = answer_scope("You are a QA bot.", "gpt-4o-mini")
+    cache.put(
+        scope,
+        "How do I activate my eSIM?",
+        fake_embedding("how do i activate my esim"),
+        "Open the app and tap activate.",
+        generation_ms=800,
+    )
+
+    hit = cache.lookup(scope, fake_embedding("how do I activate my eSIM please"))
+    assert hit is not None and hit.answer == "Open the app and tap activate."
+    assert cache.lookup(scope, fake_embedding("do you offer refunds")) is None
+    other = answer_scope("You are a pirate.", "gpt-4o-mini")
+    assert cache.lookup(other, fake_embedding("how do i activate my esim")) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["saved_ms"]) == (1, 2, 800)
+
+
+def test_entries_are_evicted_by_size_and_age():
+    cache = SemanticAnswerCache(max_entries=2, ttl_secs=60)
+    for question in ("what is an esim", "do you offer refunds", "why sign in"):
+        cache.put("s", question, fake_embedding(question), f"answer to {question}")
+    assert len(cache) == 2
+    assert cache.lookup("s", fake_embedding("what is an esim")) is None
+
+    for entry in cache._entries.values():
+        entry.created_at = time.time() - 61
+    assert cache.lookup("s", fake_embedding("why sign in")) is None
+    assert len(cache) == 0
+    assert cache.stats()["evictions"] == 3
+
+
+def test_long_answers_are_not_cached():
+    cache = SemanticAnswerCache(max_answer_chars=10)
+    assert not cache.put("s", "q", fake_embedding("q"), "a" * 11)
+    assert len(cache) == 0
+
+
+@pytest.mark.anyio
+async def test_session_only_stores_answers_for_pending_turns(monkeypatch):
+    async def fake_aembed(texts):
+        return [fake_embedding(t) for t in texts]
+
+    monkeypatch.setattr(rag, "_aembed", fake_aembed)
+    session = AnswerCacheSession(SemanticAnswerCache(), scope="s")
+    messages = [{"role": "user", "content": "What is an eSIM?"}]
+
+    assert await session.answer(messages) is None
+    session.store("A digital SIM.")
+    session.store("A second reply for the same turn is ignored.")
+
+    assert await session.answer(messages) == "A digital SIM."
+    assert session.pending is None
+
+
+@pytest.mark.anyio
+async def test_follow_up_turns_are_never_cached_or_served(monkeypatch):
+    async def fake_aembed(texts):
+        return [fake_embedding(t) for t in texts]
+
+    monkeypatch.setattr(rag, "_aembed", fake_aembed)
+    cache = SemanticAnswerCache()
+    session = AnswerCacheSession(cache, scope="s")
+    opening = [{"role": "user", "content": "How much is the Europe plan?"}]
+    follow_up = opening + [
+        {"role": "assistant", "content": "It costs 20 euros."},
+        {"role": "user", "content": "Yes"},
+    ]
+    folded = [{"role": "system", "content": f"{SUMMARY_HEADER}\n..."}, follow_up[-1]]
+
+    for messages in (follow_up, folded):
+        assert await session.answer(messages) is None
+        assert session.pending is None
+        session.store("Great, it's booked.")
+    assert len(cache) == 0
+
+    # Another caller opening with the same word is not handed that answer.
+    cache.put("s", "Yes", fake_embedding("Yes"), "Great, it's booked.")
+    assert await session.answer(follow_up) is None
+
+
+@pytest.fixture
+def isolated_rag(monkeypatch):
+    monkeypatch.setenv("RAG_BACKEND", "numpy")
+    monkeypatch.setenv("ANSWER_CACHE", "1")
+    monkeypatch.delenv("RAG_INDEX_PATH", raising=False)
+    monkeypatch.setattr(clients_module, "_registry", ClientRegistry())
+    monkeypatch.setattr(rag, "_numpy_index", None)
+    monkeypatch.setattr(rag, "_lexical_index", None)
+    monkeypatch.setattr(rag, "_batchers", {})
+    monkeypatch.setattr(embedding_cache, "_cache", None)
+    monkeypatch.setattr(answer_cache_module, "_cache", None)
+
+
+@pytest.mark.anyio
+async def test_repeated_questions_skip_the_llm_in_the_pipeline(isolated_rag):
+    timings = FakeTimings(
+        word_secs=0.04,
+        pause_secs=0.02,
+        stt_final_secs=0.01,
+        llm_ttft_secs=0.05,
+        llm_token_secs=0.0,
+        tts_ttfa_secs=0.01,
+        bot_turn_timeout_secs=5.0,
+    )
+
+    first = await run_benchmark(2, 1, ramp_secs=0.0, timings=timings, embed_latency_secs=0.0)
+    second = await run_benchmark(2, 1, ramp_secs=0.0, timings=timings, embed_latency_secs=0.0)
+
+    cache = answer_cache_module.answer_cache()
+    assert first["turns"] == second["turns"] == 2
+    assert len(cache) == 2
+    assert cache.hits == 2
+    assert cache.saved_ms >= 2 * 50
@@ -0,0 +1,43 @@
+import pytest
+
+from app import clients as clients_module
+from app import embedding_cache, rag
+from app.clients import ClientRegistry
+from bench.fakes import FakeTimings
+from bench.load import percentile, run_benchmark
+
+
+@pytest.fixture
+def isolated_rag(monkeypatch):
+    monkeypatch.setenv("RAG_BACKEND", "numpy")
+    monkeypatch.delenv("RAG_INDEX_PATH", raising=False)
+    monkeypatch.setattr(clients_module, "_registry", ClientRegistry())
+    monkeypatch.setattr(rag, "_numpy_index", None)
+    monkeypatch.setattr(rag, "_lexical_index", None)
+    monkeypatch.setattr(rag, "_batchers", {})
+    monkeypatch.setattr(embedding_cache, "_cache", None)
+
+
+def test_percentile_picks_nearest_rank():
+    assert percentile([], 0.5) is None
+    assert percentile([3.0, 1.0, 2.0], 0.5) == 2.0
+    assert percentile(list(range(101)), 0.95) == 95
+
+
+@pytest.mark.anyio
+async def test_benchmark_drives_every_turn_through_the_pipeline(isolated_rag):
+    timings = FakeTimings(
+        word_secs=0.04,
+        pause_secs=0.02,
+        stt_final_secs=0.01,
+        llm_ttft_secs=0.02,
+        llm_token_secs=0.0,
+        tts_ttfa_secs=0.01,
+        bot_turn_timeout_secs=5.0,
+    )
+
+    report = await run_benchmark(3, 2, ramp_secs=0.0, timings=timings, embed_latency_secs=0.0)
+
+    assert report["turns"] == report["expected_turns"] == 6
+    assert report["stages_ms"]["total_ms"]["p50"] is not None
+    assert report["loop_lag_ms"]["max"] is not None
@@ -0,0 +1,22 @@
+import pytest
+
+from app.clients import ClientRegistry
+
+
+@pytest.mark.anyio
+async def test_registry_reuses_pooled_clients_and_closes_them(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    registry = ClientRegistry(max_connections=10, max_per_host=4)
+
+    daily = registry.http("daily")
+    assert registry.http("daily") is daily
+    assert registry.http("cartesia") is not daily
+    assert daily.connector.limit == 10
+    assert daily.connector.limit_per_host == 4
+    assert registry.openai() is registry.openai()
+    assert registry.openai(retries=False).max_retries == 0
+    assert registry.stats()["daily"]["utilization"] == 0
+
+    await registry.close()
+    assert daily.closed
+    assert registry.stats() == {}
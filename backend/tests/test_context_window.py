@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.context_window import (
+    SUMMARY_HEADER,
+    ContextWindowProcessor,
+    is_summary_slot,
+    prompt_tokens,
+)
+from app.rag import CONTEXT_HEADER
+from app.rag_processor import is_retrieval_slot
+
+SYSTEM = {"role": "system", "content": "You are a QA bot."}
+
+
+def _turn(i: int) -> list:
+    return [
+        {"role": "user", "content": f"Question {i}: " + "my eSIM does not connect " * 5},
+        {"role": "assistant", "content": f"Answer {i}: " + "try restarting the phone " * 5},
+    ]
+
+
+@pytest.mark.anyio
+async def test_prompt_stays_bounded_and_old_turns_are_summarized():
+    summarized = []
+
+    async def summarize(previous, messages):
+        summarized.extend(messages)
+        return f"{previous or ''} {len(messages)} messages".strip()
+
+    processor = ContextWindowProcessor(
+        reserve_tokens=100, token_budget=200, max_context_tokens=4000, summarize=summarize
+    )
+    messages = [SYSTEM]
+    sizes = []
+    for i in range(30):
+        messages = messages + _turn(i)[:1]
+        messages = processor.window_messages(messages)
+        sizes.append(processor.last_prompt_tokens)
+        await asyncio.sleep(0)
+        messages.append(_turn(i)[1])
+
+    assert messages[0] is SYSTEM
+    assert is_summary_slot(messages[1])
+    assert messages[1]["content"].startswith(SUMMARY_HEADER)
+    assert _roles(messages[2:]) == ["user", "assistant"] * (len(messages[2:]) // 2)
+    assert max(sizes[10:]) < 200 + prompt_tokens(messages[:2]) + 50
+    # Every dropped message is summarized once, in order.
+    assert [m["content"] for m in summarized] == [
+        m["content"] for i in range(len(summarized) // 2) for m in _turn(i)
+    ]
+
+
+@pytest.mark.anyio
+async def test_latest_turn_and_retrieval_slot_are_always_kept():
+    processor = ContextWindowProcessor(token_budget=10, summarize=_echo)
+    slot = {"role": "system", "content": f"{CONTEXT_HEADER}\n- Q: x\n  A: y"}
+    last = {"role": "user", "content": "A very long question " * 50}
+
+    messages = processor.window_messages([SYSTEM, *_turn(0), slot, last])
+
+    assert messages == [SYSTEM, slot, last]
+    assert is_retrieval_slot(messages[1])
+
+
+@pytest.mark.anyio
+async def test_reply_reserve_shrinks_the_window():
+    messages = [SYSTEM] + [m for i in range(10) for m in _turn(i)] + [_turn(10)[0]]
+    roomy = ContextWindowProcessor(token_budget=10_000, max_context_tokens=10_000)
+    tight = ContextWindowProcessor(token_budget=10_000, max_context_tokens=1000, summarize=_echo)
+
+    assert len(roomy.window_messages(list(messages))) == len(messages)
+    assert prompt_tokens(tight.window_messages(list(messages))) + 512 <= 1000
+
+
+@pytest.mark.anyio
+async def test_summarizer_failure_keeps_windowing():
+    async def failing(previous, messages):
+        raise RuntimeError("boom")
+
+    processor = ContextWindowProcessor(token_budget=100, summarize=failing)
+    messages = [SYSTEM] + [m for i in range(5) for m in _turn(i)] + [_turn(5)[0]]
+
+    windowed = processor.window_messages(messages)
+    await asyncio.sleep(0)
+
+    assert processor.summary is None
+    assert windowed[0] is SYSTEM and windowed[-1]["content"].startswith("Question 5")
+    assert len(windowed) < len(messages)
+
+
+async def _echo(previous, messages):
+    return f"{len(messages)} messages"
+
+
+def _roles(messages):
+    return [m["role"] for m in messages]
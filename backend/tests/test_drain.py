@@ -0,0 +1,103 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app import drain, state
+from app.drain import Drainer
+from app.main import app
+from app.models import AgentConfig
+from app.state import attach_task, create_session, remove_session
+
+
+@pytest.fixture(autouse=True)
+def fresh_drainer(monkeypatch):
+    monkeypatch.setattr(drain, "_drainer", None)
+    for sid in list(state._sessions):
+        remove_session(sid)
+    yield
+    for sid in list(state._sessions):
+        remove_session(sid)
+
+
+ADMIN = {"Authorization": "Bearer s3cret"}
+
+
+def _bot(session_id: str, secs: float) -> asyncio.Task:
+    task = asyncio.create_task(asyncio.sleep(secs))
+    attach_task(create_session(session_id, AgentConfig()), task)
+    return task
+
+
+@pytest.mark.anyio
+async def test_drain_waits_for_bots_that_finish_in_time():
+    short = _bot("short", 0.05)
+    drainer = Drainer(timeout_secs=5, poll_interval_secs=0.01)
+
+    await drainer.drain()
+
+    assert short.done() and not short.cancelled()
+    assert drainer.stats()["done"] and drainer.stats()["cancelled_bots"] == 0
+
+
+@pytest.mark.anyio
+async def test_bots_past_the_deadline_are_cancelled():
+    short, stuck = _bot("short", 0.01), _bot("stuck", 60)
+    drainer = Drainer(timeout_secs=0.1, poll_interval_secs=0.01)
+
+    await drainer.drain()
+
+    assert not short.cancelled() and stuck.cancelled()
+    assert drainer.initial_bots == 2 and drainer.cancelled_bots == 1
+
+
+@pytest.mark.anyio
+async def test_draining_node_is_not_ready_and_refuses_sessions(monkeypatch):
+    for key in ["OPENAI_API_KEY", "DEEPGRAM_API_KEY", "CARTESIA_API_KEY", "DAILY_API_KEY"]:
+        monkeypatch.setenv(key, "test")
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    live = _bot("live", 60)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/ready")).status_code == 200
+        started = await client.post("/drain", headers=ADMIN)
+        ready = await client.get("/ready")
+        created = await client.post("/sessions", json={})
+        progress = await client.get("/drain")
+
+    assert started.json()["draining"] and started.json()["initial_bots"] == 1
+    assert ready.status_code == 503
+    assert created.status_code == 503 and created.headers["Retry-After"] == "1"
+    assert progress.json()["remaining_bots"] == 1
+    assert not live.done()
+
+
+@pytest.mark.anyio
+async def test_drain_needs_the_admin_token(monkeypatch):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        disabled = await client.post("/drain", headers=ADMIN)
+        monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+        anonymous = await client.post("/drain")
+        wrong = await client.post("/drain", headers={"Authorization": "Bearer guess"})
+        ready = await client.get("/ready")
+
+    assert disabled.status_code == 403
+    assert anonymous.status_code == 401 and wrong.status_code == 401
+    assert ready.status_code == 200 and not drain.drainer().draining
+
+
+@pytest.mark.anyio
+async def test_http_drain_can_be_cancelled_until_shutdown(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post("/drain", headers=ADMIN)
+        cancelled = await client.delete("/drain", headers=ADMIN)
+        ready = await client.get("/ready")
+        await drain.drainer().drain()
+        refused = await client.delete("/drain", headers=ADMIN)
+
+    assert cancelled.status_code == 200 and not cancelled.json()["draining"]
+    assert ready.status_code == 200
+    assert refused.status_code == 409 and drain.drainer().draining
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from app.embed_batcher import EmbeddingBatcher
+
+
+@pytest.mark.anyio
+async def test_concurrent_requests_share_one_call():
+    calls = []
+
+    async def embed_batch(texts):
+        calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    batcher = EmbeddingBatcher(embed_batch, window_secs=0.01, max_batch=64)
+    results = await asyncio.gather(
+        batcher.embed(["a"]), batcher.embed(["bb"]), batcher.embed(["a", "ccc"])
+    )
+
+    assert calls == [["a", "bb", "ccc"]]
+    assert results == [[[1.0]], [[2.0]], [[1.0], [3.0]]]
+    assert batcher.stats()["items"] == 4
+
+
+@pytest.mark.anyio
+async def test_full_batch_flushes_without_waiting_and_errors_fan_out():
+    calls = []
+
+    async def embed_batch(texts):
+        calls.append(list(texts))
+        raise RuntimeError("rate limited")
+
+    batcher = EmbeddingBatcher(embed_batch, window_secs=10, max_batch=2)
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.embed(["a"]), batcher.embed(["b"]), return_exceptions=True),
+        timeout=1,
+    )
+
+    assert calls == [["a", "b"]]
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert batcher.stats()["failures"] == 1
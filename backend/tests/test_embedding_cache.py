@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+
+from app import embedding_cache as ec
+from app.embedding_cache import EmbeddingCache
+
+
+def test_lru_eviction_and_counters():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    assert cache.get("m", "a") == [1.0]
+    cache.put("m", "c", [3.0])
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "  A ") == [1.0]
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = EmbeddingCache(ttl_secs=10)
+    monkeypatch.setattr(ec.time, "time", lambda: 1000.0)
+    cache.put("m", "a", [1.0])
+    monkeypatch.setattr(ec.time, "time", lambda: 1011.0)
+    assert cache.get("m", "a") is None
+
+
+def test_persistent_store_survives_restart(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    cache = EmbeddingCache(path=path)
+    cache.put("m", "How do I activate my eSIM?", [0.5, 0.25])
+    cache.close()
+
+    warm = EmbeddingCache(path=path)
+    assert warm.get("m", "how do i activate my esim?") == [0.5, 0.25]
+    assert warm.get("other-model", "how do i activate my esim?") is None
+
+
+def test_persistent_store_is_capped_and_written_off_the_caller(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    cache = EmbeddingCache(max_entries=3, path=path, prune_interval_secs=0.01)
+    for i in range(10):
+        cache.put("m", f"q{i}", [float(i)])
+    assert cache._writer.name == "embedding-cache-writer"
+    cache.close()
+
+    rows = sqlite3.connect(path).execute("SELECT text FROM embeddings ORDER BY text").fetchall()
+    assert rows == [("q7",), ("q8",), ("q9",)]
+    warm = EmbeddingCache(max_entries=3, path=path)
+    assert warm.get("m", "q9") == [9.0] and warm.stats()["entries"] == 3
+    warm.close()
+
+
+def test_concurrent_threads_share_the_cache():
+    cache = EmbeddingCache(max_entries=50)
+
+    def work(n):
+        for i in range(500):
+            cache.put("m", f"{n}-{i}", [float(i)])
+            cache.get("m", f"{n}-{i - 1}")
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.stats()["entries"] == 50
+    assert cache.stats()["hits"] + cache.stats()["misses"] == 2000
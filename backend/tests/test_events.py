@@ -0,0 +1,44 @@
+import asyncio
+import json
+
+import pytest
+
+from app.events import SessionEvents, stream_events
+
+
+def _parse(chunk):
+    return json.loads(chunk.split("data: ", 1)[1])
+
+
+@pytest.mark.anyio
+async def test_stream_delivers_snapshot_then_every_transition():
+    bus = SessionEvents()
+    stream = stream_events(bus, {"type": "snapshot", "state": "idle"})
+
+    assert _parse(await stream.__anext__())["state"] == "idle"
+    for state in ("listening", "thinking", "speaking"):
+        bus.publish({"type": "state", "state": state})
+    bus.close()
+
+    received = [_parse(chunk)["state"] async for chunk in stream]
+    assert received == ["listening", "thinking", "speaking"]
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_drops_oldest_events():
+    bus = SessionEvents(queue_size=2)
+    queue = bus.subscribe()
+    for i in range(5):
+        bus.publish({"i": i})
+
+    assert [queue.get_nowait()["i"] for _ in range(2)] == [3, 4]
+    assert bus.dropped == 3
+
+
+@pytest.mark.anyio
+async def test_stream_sends_keepalive_when_idle():
+    bus = SessionEvents()
+    stream = stream_events(bus, {"type": "snapshot"}, keepalive_secs=0.01)
+    await stream.__anext__()
+    assert await asyncio.wait_for(stream.__anext__(), timeout=1) == ": keep-alive\n\n"
+    await stream.aclose()
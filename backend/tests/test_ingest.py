@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+from app import ingest as ingest_module
+from app.ingest import Document, IngestReport, NumpySink, chunk_document, ingest, read_documents
+from app.main import app
+from app.vector_index import NumpyIndex
+from bench.fakes import fake_embedding
+
+
+class CountingEmbed:
+    def __init__(self):
+        self.texts = 0
+        self.calls = 0
+
+    async def __call__(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        return [fake_embedding(t) for t in texts]
+
+
+def _docs(n, version="v1"):
+    return [
+        Document(id=f"doc-{i}", title=f"Article {i}", body=f"How to do thing {i}. {version}")
+        for i in range(n)
+    ]
+
+
+def test_chunks_split_on_paragraphs_with_stable_ids():
+    doc = Document(id="a", title="Refunds", body="First para.\n\nSecond para.\n\n" + "x" * 50)
+    chunks = chunk_document(doc, max_chars=30)
+
+    assert [c.payload["answer"] for c in chunks][:2] == ["First para.\n\nSecond para.", "x" * 30]
+    assert all(c.payload["question"] == "Refunds" for c in chunks)
+    assert chunk_document(doc, max_chars=30)[0].point_id == chunks[0].point_id
+
+
+@pytest.mark.anyio
+async def test_reingest_skips_unchanged_and_prunes_stale():
+    index = NumpyIndex()
+    index.upsert([1], [fake_embedding("seed")], [{"question": "seed", "answer": "faq"}])
+    embed = CountingEmbed()
+
+    first = await ingest(_docs(300), sink=NumpySink(index), embed=embed, embed_batch=64)
+    assert (first.chunks, first.embedded, first.skipped) == (300, 300, 0)
+    assert embed.calls == 5
+    assert len(index) == 301
+
+    docs = _docs(250)
+    docs[0] = Document(id="doc-0", title="Article 0", body="Changed text")
+    second = await ingest(docs, sink=NumpySink(index), embed=embed, prune=True)
+
+    assert (second.embedded, second.skipped, second.deleted) == (1, 249, 50)
+    assert len(index) == 251
+    assert index.payload(1)["question"] == "seed"
+    hit = index.search(fake_embedding("Q: Article 0\nA: Changed text"), limit=1)[0]
+    assert hit.payload["answer"] == "Changed text"
+
+
+@pytest.mark.anyio
+async def test_numpy_sink_writes_bounded_batches_off_the_event_loop():
+    writes = []
+
+    class RecordingIndex(NumpyIndex):
+        def upsert(self, ids, vectors, payloads):
+            writes.append((threading.get_ident(), len(ids)))
+            super().upsert(ids, vectors, payloads)
+
+    index = RecordingIndex()
+    sink = NumpySink(index, flush_rows=64)
+    await ingest(_docs(300), sink=sink, embed=CountingEmbed(), embed_batch=32, window=64)
+
+    assert len(index) == 300 and sum(n for _, n in writes) == 300
+    assert max(n for _, n in writes) < 128
+    assert threading.get_ident() not in {thread for thread, _ in writes}
+
+
+@pytest.mark.anyio
+async def test_shrunk_document_drops_its_trailing_chunks_without_prune():
+    index = NumpyIndex()
+    long = Document(id="a", title="Refunds", body="\n\n".join(["x" * 20, "y" * 20, "z" * 20]))
+    other = Document(id="b", title="Top ups", body="Use the app.")
+    await ingest([long, other], sink=NumpySink(index), embed=CountingEmbed(), max_chars=30)
+    assert len(index) == 4
+
+    short = Document(id="a", title="Refunds", body="x" * 20)
+    report = await ingest([short], sink=NumpySink(index), embed=CountingEmbed(), max_chars=30)
+
+    assert (report.skipped, report.deleted) == (1, 2)
+    assert sorted(index.payload(p)["source"] for p in index.ids()) == ["a", "b"]
+
+
+def test_reads_jsonl_and_markdown(tmp_path):
+    (tmp_path / "faq.jsonl").write_text(
+        json.dumps({"id": 7, "question": "What is an eSIM?", "answer": "A digital SIM."}) + "\n"
+    )
+    (tmp_path / "guides").mkdir()
+    (tmp_path / "guides" / "activate.md").write_text("# Activating\n\nOpen the app.")
+
+    docs = {d.id: d for d in read_documents(str(tmp_path))}
+
+    assert docs["7"].title == "What is an eSIM?"
+    assert docs["guides/activate.md"].title == "Activating"
+
+
+@pytest.mark.anyio
+async def test_http_ingest_runs_as_an_admin_only_background_job(monkeypatch):
+    monkeypatch.setattr(ingest_module, "_ingest_jobs", None)
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    release = asyncio.Event()
+
+    async def slow_ingest(documents, prune=False):
+        await release.wait()
+        return IngestReport(documents=len(documents), chunks=len(documents), embedded=1)
+
+    monkeypatch.setattr(ingest_module, "ingest", slow_ingest)
+    admin = {"Authorization": "Bearer s3cret"}
+    body = {"documents": [{"id": "a", "title": "Refunds", "body": "Within 30 days."}]}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        anonymous = await client.post("/rag/ingest", json=body)
+        started = await client.post("/rag/ingest", json=body, headers=admin)
+        busy = await client.post("/rag/ingest", json=body, headers=admin)
+        job_id = started.json()["id"]
+        running = await client.get(f"/rag/ingest/{job_id}", headers=admin)
+        release.set()
+        await ingest_module.ingest_jobs().wait()
+        done = await client.get(f"/rag/ingest/{job_id}", headers=admin)
+        missing = await client.get("/rag/ingest/nope", headers=admin)
+
+    assert anonymous.status_code == 401
+    assert started.status_code == 202 and busy.status_code == 409
+    assert running.json()["state"] == "running" and running.json()["report"] is None
+    assert done.json()["state"] == "done" and done.json()["report"]["embedded"] == 1
+    assert missing.status_code == 404
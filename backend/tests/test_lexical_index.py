@@ -0,0 +1,164 @@
+import pytest
+
+from app import lexical_index, rag
+from app.ingest import Document, NumpySink, ingest
+from app.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+from app.rag import FAQS
+from app.vector_index import Hit, NumpyIndex
+
+
+@pytest.fixture
+def faq_index():
+    index = LexicalIndex()
+    index.upsert([i + 1 for i in range(len(FAQS))], FAQS)
+    return index
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals():
+    assert tokenize("Do you offer refunds?") == ["offer", "refund"]
+    assert tokenize("Which devices are compatible") == ["device", "compatible"]
+
+
+def test_keyword_query_is_answered_confidently(faq_index):
+    hits = faq_index.search("refund", limit=3)
+
+    assert hits[0].payload["question"] == "Do you offer refunds?"
+    assert faq_index.is_confident("refund", hits)
+    assert not faq_index.is_confident("refund for my cat", faq_index.search("refund for my cat"))
+
+
+def test_ambiguous_query_is_not_confident(faq_index):
+    hits = faq_index.search("QR code", limit=3)
+
+    questions = {h.payload["question"] for h in hits}
+    assert {"What happens after I pay?", "How do I activate my eSIM?"} <= questions
+    assert not faq_index.is_confident("QR code", hits)
+
+
+def test_upsert_and_delete_keep_postings_current(faq_index):
+    faq_index.upsert([8], [{"question": "Cancellation policy", "answer": "Cancel anytime."}])
+    assert faq_index.search("refund") == []
+    assert faq_index.search("cancellation")[0].id == 8
+
+    faq_index.delete([8])
+    assert len(faq_index) == len(FAQS) - 1
+    assert faq_index.search("cancellation") == []
+
+
+def test_replacing_documents_does_not_retokenize_the_corpus(monkeypatch):
+    docs = {
+        i: {"question": f"Plan {i}", "answer": f"Covers {i % 7} countries."} for i in range(500)
+    }
+    index = LexicalIndex()
+    index.upsert(list(docs), list(docs.values()))
+    calls = []
+    real = lexical_index.tokenize
+    monkeypatch.setattr(lexical_index, "tokenize", lambda text: calls.append(text) or real(text))
+
+    index.upsert([3, 4], [{"question": "Roaming", "answer": "Roaming works."}] * 2)
+
+    assert len(calls) == 2 and len(index) == 500
+
+
+def test_tombstones_and_compaction_match_a_fresh_index():
+    docs = {i: {"question": f"Plan {i}", "answer": f"Covers {i % 7} countries."} for i in range(40)}
+    index = LexicalIndex()
+    index.upsert(list(docs), list(docs.values()))
+    docs[5] = {"question": "Roaming", "answer": "Roaming covers 3 countries."}
+    index.upsert([5], [docs[5]])
+    for batch in (range(10, 25), range(25, 32)):  # the second batch triggers compaction
+        index.delete(list(batch))
+        for i in batch:
+            del docs[i]
+        fresh = LexicalIndex()
+        fresh.upsert(list(docs), list(docs.values()))
+        for query in ("roaming countries", "plan 3", "covers 2"):
+            got, want = index.search(query, limit=5), fresh.search(query, limit=5)
+            assert [h.id for h in got] == [h.id for h in want]
+            assert [h.score for h in got] == pytest.approx([h.score for h in want])
+    assert len(index) == len(docs) == 18
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    a, b, c = (Hit(id=i, score=0.0, payload={"n": i}) for i in ("a", "b", "c"))
+
+    fused = reciprocal_rank_fusion([[a, b, c], [b, c]], limit=3)
+
+    assert [h.id for h in fused] == ["b", "c", "a"]
+
+
+def _store(monkeypatch, payloads):
+    async def stored_payloads(ids):
+        return {str(i): payloads.get(i) for i in ids}
+
+    monkeypatch.setattr(rag, "_astored_payloads", stored_payloads)
+
+
+@pytest.mark.anyio
+async def test_confident_keyword_match_skips_the_embedding(monkeypatch, faq_index):
+    monkeypatch.setattr(rag, "_lexical_index", faq_index)
+    _store(monkeypatch, {i + 1: faq for i, faq in enumerate(FAQS)})
+
+    async def no_search(query, top_k):
+        raise AssertionError("vector search should not run")
+
+    monkeypatch.setattr(rag, "_asearch", no_search)
+    payloads = await rag.aretrieve("refunds")
+    assert payloads[0]["question"] == "Do you offer refunds?"
+
+
+@pytest.mark.anyio
+async def test_keyword_and_vector_hits_are_fused(monkeypatch, faq_index):
+    monkeypatch.setattr(rag, "_lexical_index", faq_index)
+    _store(monkeypatch, {i + 1: faq for i, faq in enumerate(FAQS)})
+
+    async def vector_search(query, top_k):
+        return [Hit(id=5, score=0.9, payload=FAQS[4]), Hit(id=2, score=0.8, payload=FAQS[1])]
+
+    monkeypatch.setattr(rag, "_asearch", vector_search)
+    payloads = await rag.aretrieve("QR code", top_k=3)
+
+    # Both retrievers rank these two; the vector-only and keyword-only tails follow.
+    assert {p["question"] for p in payloads[:2]} == {
+        "How do I activate my eSIM?",
+        "What happens after I pay?",
+    }
+
+
+@pytest.mark.anyio
+async def test_stale_keyword_hits_are_not_served(monkeypatch, faq_index):
+    # Another process deleted the refunds article and edited the eSIM one.
+    monkeypatch.setattr(rag, "_lexical_index", faq_index)
+    stored = {i + 1: faq for i, faq in enumerate(FAQS)}
+    del stored[8]
+    stored[1] = {"question": "What is an eSIM?", "answer": "A SIM built into the phone."}
+    _store(monkeypatch, stored)
+    searched = []
+
+    async def vector_search(query, top_k):
+        searched.append(query)
+        return [Hit(id=1, score=0.9, payload=stored[1])]
+
+    monkeypatch.setattr(rag, "_asearch", vector_search)
+    refunds = await rag.aretrieve("refunds")
+    esim = await rag.aretrieve("eSIM")
+
+    assert searched == ["refunds", "eSIM"]
+    assert [p["question"] for p in refunds] == ["What is an eSIM?"]
+    # The local index is healed from the store.
+    assert faq_index.search("refund") == [] and len(faq_index) == len(FAQS) - 1
+    assert faq_index.search("built")[0].payload == stored[1]
+    assert esim[0]["answer"] == "A SIM built into the phone."
+
+
+@pytest.mark.anyio
+async def test_ingestion_updates_the_lexical_index():
+    lexical = LexicalIndex()
+
+    async def embed(texts):
+        return [[1.0, float(len(t))] for t in texts]
+
+    docs = [Document(id="roaming", title="Roaming abroad", body="Roaming works in 120 countries.")]
+    await ingest(docs, sink=NumpySink(NumpyIndex(), lexical=lexical), embed=embed)
+
+    assert lexical.search("roaming")[0].payload["source"] == "roaming"
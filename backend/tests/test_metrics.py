@@ -0,0 +1,60 @@
+import pytest
+import httpx
+
+from app.main import app
+from app.metrics import Counter, Histogram
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    hist = Histogram("t_ms", "test", buckets=(100, 200, 400))
+    for value in [50] * 50 + [150] * 45 + [300] * 5:
+        hist.observe(value)
+
+    assert hist.quantile(0.5) == pytest.approx(100)
+    assert hist.quantile(0.95) == pytest.approx(200)
+    assert 200 < hist.quantile(0.99) <= 400
+    assert hist.count() == 100
+
+
+def test_render_uses_prometheus_text_format():
+    counter = Counter("t_total", "test counter")
+    counter.inc(operation="daily.create_room")
+    hist = Histogram("t_lat_ms", "test", buckets=(10,))
+    hist.observe(5, stage="rag_ms")
+
+    text = "\n".join(counter.render() + hist.render())
+
+    assert '# TYPE t_total counter' in text
+    assert 't_total{operation="daily.create_room"} 1' in text
+    assert 't_lat_ms_bucket{stage="rag_ms",le="10"} 1' in text
+    assert 't_lat_ms_bucket{stage="rag_ms",le="+Inf"} 1' in text
+    assert 't_lat_ms_quantile{stage="rag_ms",quantile="0.5"} 5' in text
+
+
+def test_worker_snapshots_are_added_to_local_values():
+    counter = Counter("t_relayed_total", "test counter")
+    counter.inc(outcome="hit")
+    hist = Histogram("t_relayed_ms", "test", buckets=(10, 100))
+    hist.observe(5)
+    worker = Histogram("t_relayed_ms", "test", buckets=(10, 100))
+    worker.observe(50)
+    worker.observe(50)
+
+    text = "\n".join(
+        counter.render([[((("outcome", "hit"),), 2)]]) + hist.render([worker.snapshot()])
+    )
+
+    assert 't_relayed_total{outcome="hit"} 3' in text
+    assert 't_relayed_ms_bucket{le="100"} 3' in text
+    assert "t_relayed_ms_count 3" in text
+    assert hist.count() == 1
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    assert "agent_active_bots" in resp.text
+    assert "# TYPE agent_round_trip_latency_ms histogram" in resp.text
@@ -0,0 +1,74 @@
+import pytest
+
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    LLMContextFrame,
+    LLMFullResponseStartFrame,
+    TTSAudioRawFrame,
+    TranscriptionFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.observers.base_observer import FramePushed
+from pipecat.processors.aggregators.llm_context import LLMContext
+from pipecat.processors.frame_processor import FrameDirection
+
+from app.observability import BotStateObserver
+from app.rag_processor import RAGProcessor
+
+
+def _push(frame, at_ms, source=None, destination=None):
+    return FramePushed(
+        source=source,
+        destination=destination,
+        frame=frame,
+        direction=FrameDirection.DOWNSTREAM,
+        timestamp=int(at_ms * 1_000_000),
+    )
+
+
+@pytest.mark.anyio
+async def test_observer_reports_per_stage_breakdown_once_per_turn():
+    states, latencies, breakdowns = [], [], []
+    observer = BotStateObserver(
+        on_state_change=states.append,
+        on_latency=latencies.append,
+        on_error=lambda message: None,
+        on_stage_latency=breakdowns.append,
+    )
+    rag = RAGProcessor()
+    started = UserStartedSpeakingFrame()
+    stopped = UserStoppedSpeakingFrame()
+    context = LLMContextFrame(context=LLMContext())
+    bot_started = BotStartedSpeakingFrame()
+
+    events = [
+        _push(started, 1000),
+        _push(started, 1001),  # same frame, next hop
+        _push(stopped, 2000),
+        _push(stopped, 2001),
+        _push(TranscriptionFrame("hi", "u", "t"), 2100),
+        _push(context, 2600, destination=rag),
+        _push(context, 2650, source=rag),
+        _push(LLMFullResponseStartFrame(), 3000),
+        _push(TTSAudioRawFrame(audio=b"\0\0", sample_rate=16000, num_channels=1), 3200),
+        _push(TTSAudioRawFrame(audio=b"\0\0", sample_rate=16000, num_channels=1), 3300),
+        _push(bot_started, 3250),
+        _push(bot_started, 3260),
+    ]
+    for event in events:
+        await observer.on_push_frame(event)
+
+    assert states == ["listening", "thinking", "thinking", "speaking"]
+    assert latencies == [1250]
+    assert breakdowns == [
+        {
+            "stt_ms": 100,
+            "turn_detection_ms": 500,
+            "rag_ms": 50,
+            "llm_ttft_ms": 350,
+            "tts_ttfa_ms": 200,
+            "playout_ms": 50,
+            "total_ms": 1250,
+        }
+    ]
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from app import rag
+
+
+class _Hit:
+    def __init__(self, question, answer):
+        self.payload = {"question": question, "answer": answer}
+
+
+@pytest.mark.anyio
+async def test_aretrieve_context_formats_results(monkeypatch):
+    async def fake_search(query, top_k):
+        return [_Hit("Do you offer refunds?", "Yes, within 30 days.")]
+
+    monkeypatch.setattr(rag, "_asearch", fake_search)
+    context = await rag.aretrieve_context("refund please")
+    assert context.startswith("Relevant help-center answers:")
+    assert "Yes, within 30 days." in context
+
+
+@pytest.mark.anyio
+async def test_aretrieve_context_degrades_on_timeout(monkeypatch):
+    async def slow_search(query, top_k):
+        await asyncio.sleep(1)
+        return [_Hit("q", "a")]
+
+    monkeypatch.setattr(rag, "_asearch", slow_search)
+    assert await rag.aretrieve_context("anything", timeout=0.01) is None
@@ -0,0 +1,129 @@
+import pytest
+
+from pipecat.processors.aggregators.llm_context import LLMContext
+
+from app import rag_processor
+from app.rag import FAQS, estimate_tokens
+from app.rag_processor import (
+    RAGProcessor,
+    SpeculativeRetrieval,
+    is_retrieval_slot,
+    speculation_stats,
+)
+
+
+def _prompt_chars(messages):
+    return sum(len(str(m["content"])) for m in messages)
+
+
+@pytest.fixture
+def fake_retrieval(monkeypatch):
+    async def fake_aretrieve(query, top_k=3, timeout=None):
+        return FAQS[:top_k]
+
+    monkeypatch.setattr(rag_processor, "aretrieve", fake_aretrieve)
+
+
+@pytest.mark.anyio
+async def test_retrieval_slot_does_not_grow_prompt_over_100_turns(fake_retrieval):
+    processor = RAGProcessor(token_budget=200)
+    context = LLMContext(messages=[{"role": "system", "content": "You are a QA bot."}])
+
+    overheads = set()
+    for turn in range(100):
+        context.add_message({"role": "user", "content": f"How do I activate my eSIM? #{turn}"})
+        context.set_messages(await processor.augment_messages(list(context.get_messages())))
+
+        messages = context.get_messages()
+        slots = [m for m in messages if is_retrieval_slot(m)]
+        assert len(slots) == 1
+        assert estimate_tokens(slots[0]["content"]) <= 200
+        assert messages[-2] is slots[0]
+        conversation = [m for m in messages if not is_retrieval_slot(m)]
+        overheads.add(_prompt_chars(messages) - _prompt_chars(conversation))
+
+        context.add_message({"role": "assistant", "content": "Open the app and tap activate."})
+
+    assert len(overheads) == 1
+
+
+@pytest.mark.anyio
+async def test_answers_already_in_context_are_not_repeated(fake_retrieval):
+    processor = RAGProcessor(token_budget=1000)
+    messages = [
+        {"role": "system", "content": f"Known answer: {FAQS[0]['answer']}"},
+        {"role": "user", "content": "What is an eSIM?"},
+    ]
+
+    augmented = await processor.augment_messages(messages)
+
+    slot = next(m for m in augmented if is_retrieval_slot(m))
+    assert FAQS[0]["answer"] not in slot["content"]
+    assert FAQS[1]["answer"] in slot["content"]
+
+
+@pytest.mark.anyio
+async def test_speculative_result_is_reused_for_matching_final_text(monkeypatch):
+    calls = []
+
+    async def fake_aretrieve(query, top_k=3, timeout=None):
+        calls.append(query)
+        return FAQS[:1]
+
+    monkeypatch.setattr(rag_processor, "aretrieve", fake_aretrieve)
+    speculation = SpeculativeRetrieval(debounce_secs=0.01)
+    processor = RAGProcessor(speculation=speculation)
+
+    speculation.on_interim("how do I")
+    speculation.on_interim("how do I activate")
+    speculation.on_final("How do I activate my eSIM?")
+    before = speculation_stats().get("reused", 0)
+
+    messages = await processor.augment_messages(
+        [{"role": "user", "content": "how do I activate my eSIM"}]
+    )
+
+    assert calls == ["How do I activate my eSIM?"]
+    assert speculation_stats()["reused"] == before + 1
+    assert is_retrieval_slot(messages[0])
+
+
+@pytest.mark.anyio
+async def test_stale_speculation_falls_back_to_fresh_retrieval(monkeypatch):
+    calls = []
+
+    async def fake_aretrieve(query, top_k=3, timeout=None):
+        calls.append(query)
+        return FAQS[:1]
+
+    monkeypatch.setattr(rag_processor, "aretrieve", fake_aretrieve)
+    speculation = SpeculativeRetrieval(debounce_secs=0.01)
+    processor = RAGProcessor(speculation=speculation)
+
+    speculation.on_final("What is an eSIM")
+    await processor.augment_messages([{"role": "user", "content": "Do you offer refunds?"}])
+
+    assert calls[-1] == "Do you offer refunds?"
+
+
+@pytest.mark.anyio
+async def test_turn_boundary_resets_speculated_text(monkeypatch):
+    calls = []
+
+    async def fake_aretrieve(query, top_k=3, timeout=None):
+        calls.append(query)
+        return FAQS[:1]
+
+    monkeypatch.setattr(rag_processor, "aretrieve", fake_aretrieve)
+    speculation = SpeculativeRetrieval(debounce_secs=0.01)
+    processor = RAGProcessor(speculation=speculation)
+
+    # The first turn is answered without RAGProcessor ever calling take().
+    speculation.on_final("What is an eSIM?")
+    speculation.end_turn()
+    speculation.on_final("Do you offer refunds?")
+    before = speculation_stats().get("reused", 0)
+    await processor.augment_messages([{"role": "user", "content": "Do you offer refunds?"}])
+
+    assert calls == ["Do you offer refunds?"]
+    assert speculation_stats()["reused"] == before + 1
@@ -0,0 +1,75 @@
+import pytest
+
+from app import ratelimit
+from app.ratelimit import MemoryStore, RateLimiter, RateLimitPolicy, RedisStore
+from bench.fakes import FakeRedis
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    now = [1_000_040.0]
+    monkeypatch.setattr(ratelimit.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("make_store", [MemoryStore, lambda: RedisStore(FakeRedis())])
+async def test_sliding_window_limits_per_key(make_store, frozen_time):
+    limiter = RateLimiter(make_store())
+    policy = RateLimitPolicy("sessions", limit=3, window_secs=60)
+
+    results = [await limiter.check(policy, "1.2.3.4") for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    # The full window's 3 hits must decay to 2 a third into the next window.
+    assert results[-1].retry_after_secs == 60
+    assert (await limiter.check(policy, "5.6.7.8")).allowed
+
+    # Retrying on 429 doesn't count against the client.
+    for _ in range(5):
+        frozen_time[0] += 11
+        assert not (await limiter.check(policy, "1.2.3.4")).allowed
+    frozen_time[0] += 5
+    assert (await limiter.check(policy, "1.2.3.4")).allowed
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("make_store", [MemoryStore, lambda: RedisStore(FakeRedis())])
+async def test_retry_after_is_when_the_estimate_fits(make_store, frozen_time):
+    limiter = RateLimiter(make_store())
+    policy = RateLimitPolicy("sessions", limit=4, window_secs=60)
+    frozen_time[0] = 1_000_020.0  # the start of a window
+    for _ in range(4):
+        await limiter.check(policy, "ip")
+    frozen_time[0] += 60
+
+    # With current hits c: 4 * (1 - elapsed / 60) + c + 1 <= 4.
+    rejected = await limiter.check(policy, "ip")
+    assert not rejected.allowed and rejected.retry_after_secs == 15
+    frozen_time[0] += 14
+    assert not (await limiter.check(policy, "ip")).allowed
+    frozen_time[0] += 1
+    assert (await limiter.check(policy, "ip")).allowed
+    assert (await limiter.check(policy, "ip")).retry_after_secs == 15
+
+
+@pytest.mark.anyio
+async def test_memory_store_stays_bounded_and_drops_idle_keys(monkeypatch):
+    store = MemoryStore(max_keys=100)
+    for i in range(1000):
+        await store.hit(f"ip-{i}", window=1, ttl_secs=60)
+    assert len(store) == 100
+
+    clock = [ratelimit.time.monotonic() + 120]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: clock[0])
+    await store.hit("fresh", window=3, ttl_secs=60)
+    assert len(store) == 1
+
+
+@pytest.mark.anyio
+async def test_store_outage_fails_open():
+    class BrokenStore:
+        async def hit(self, key, window, ttl_secs):
+            raise ConnectionError("redis down")
+
+    limiter = RateLimiter(BrokenStore())
+    assert (await limiter.check(RateLimitPolicy("s", 1, 60), "ip")).allowed
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from app import room_pool
+from app.daily import ROOM_TTL_SECS, provision_room
+from app.room_pool import RoomPool
+from bench.fakes import FakeDailyRESTHelper
+
+
+@pytest.mark.anyio
+async def test_provision_room_mints_both_tokens_concurrently():
+    helper = FakeDailyRESTHelper(latency_secs=0.05)
+    started = time.monotonic()
+    room = await provision_room("agent-x", helper=helper)
+    elapsed = time.monotonic() - started
+
+    assert room.url.endswith("/agent-x")
+    assert "guest" in room.client_token and "owner" in room.bot_token
+    assert room.expires_at > time.time() + ROOM_TTL_SECS - 5
+    assert elapsed < 0.14
+
+
+@pytest.mark.anyio
+async def test_pool_serves_prebuilt_rooms_and_refills():
+    helper = FakeDailyRESTHelper()
+    pool = RoomPool(size=2, provision=lambda name: provision_room(name, helper=helper))
+    pool.start()
+    try:
+        for _ in range(50):
+            if pool.stats()["available"] == 2:
+                break
+            await asyncio.sleep(0.01)
+
+        room = await pool.acquire("agent-1")
+        assert not room.url.endswith("/agent-1")
+        await asyncio.sleep(0.05)
+        assert pool.stats()["available"] == 2
+        assert pool.stats()["hits"] == 1
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.anyio
+async def test_pool_evicts_expiring_rooms_and_falls_back_on_demand():
+    helper = FakeDailyRESTHelper()
+    pool = RoomPool(
+        size=1,
+        min_ttl_secs=ROOM_TTL_SECS + 60,
+        provision=lambda name: provision_room(name, helper=helper),
+    )
+    pool._rooms.append(await provision_room("stale", helper=helper))
+
+    room = await pool.acquire("agent-2")
+
+    assert room.url.endswith("/agent-2")
+    assert pool.stats()["evicted"] == 1
+    assert pool.stats()["misses"] == 1
+
+
+@pytest.mark.anyio
+async def test_pooled_rooms_must_outlast_the_longest_call(monkeypatch):
+    monkeypatch.setenv("ROOM_POOL_SIZE", "1")
+    monkeypatch.setenv("MAX_CALL_SECS", str(ROOM_TTL_SECS))
+    assert room_pool.start_room_pool() is None
+
+    monkeypatch.setenv("MAX_CALL_SECS", "1200")
+    pool = room_pool.start_room_pool()
+    # Stopped before the refill task first runs, so nothing is provisioned.
+    await room_pool.stop_room_pool()
+    assert pool.min_ttl_secs == 1200
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app import session_store
+from app.main import app
+from app.session_store import NODE_ID, MemorySessionStore, RedisSessionStore, SessionMirror
+from bench.fakes import FakeRedis
+
+STORES = [MemorySessionStore, lambda: RedisSessionStore(FakeRedis())]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("make_store", STORES)
+async def test_mirror_publishes_in_order_and_saves_latest_snapshot(make_store):
+    mirror = SessionMirror(make_store())
+    received = []
+
+    async def listen():
+        async for event in mirror.store.subscribe("s1"):
+            received.append(event["state"])
+
+    listener = asyncio.create_task(listen())
+    await asyncio.sleep(0)
+    for state in ("listening", "thinking", "speaking"):
+        mirror.update("s1", {"type": "state", "state": state})
+    await mirror.flush()
+
+    record = await mirror.store.load("s1")
+    assert record["state"] == "speaking"
+    assert record["node_id"] == NODE_ID
+
+    mirror.remove("s1")
+    await mirror.flush()
+    await asyncio.wait_for(listener, timeout=1)
+    assert received == ["listening", "thinking", "speaking"]
+    assert await mirror.store.load("s1") is None
+
+
+@pytest.mark.anyio
+async def test_any_node_answers_for_a_session_hosted_elsewhere(monkeypatch):
+    mirror = SessionMirror(MemorySessionStore())
+    monkeypatch.setattr(session_store, "_mirror", mirror)
+    await mirror.store.save(
+        "remote-1",
+        {"state": "speaking", "round_trip_latency_ms": 640, "node_id": "node-b"},
+        ttl_secs=60,
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/sessions/remote-1/state")
+        missing = await client.get("/sessions/unknown/state")
+
+    assert resp.status_code == 200
+    assert resp.json()["state"] == "speaking"
+    assert resp.json()["node_id"] == "node-b"
+    assert missing.status_code == 404
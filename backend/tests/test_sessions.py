@@ -1,8 +1,19 @@
+import asyncio
+import time
+
 import pytest
 import httpx
 
+from app import state
 from app.main import app
-from app.state import create_session
+from app.state import (
+    SessionLimitError,
+    attach_task,
+    create_session,
+    evict_expired,
+    get_session,
+    remove_session,
+)
 from app.models import AgentConfig
 
 
@@ -34,3 +45,62 @@ async def test_state_includes_error_message():
     data = resp.json()
     assert data["state"] == "error"
     assert data["error_message"] == "boom"
+
+
+def test_sessions_get_their_own_timestamps():
+    first = create_session("ts-1", AgentConfig())
+    time.sleep(0.01)
+    second = create_session("ts-2", AgentConfig())
+    assert second.created_at > first.created_at
+
+
+@pytest.mark.anyio
+async def test_finished_sessions_are_evicted_after_grace(monkeypatch):
+    monkeypatch.setenv("SESSION_FINISHED_GRACE_SECS", "60")
+    session = create_session("finished", AgentConfig())
+
+    async def bot():
+        return None
+
+    task = asyncio.create_task(bot())
+    attach_task(session, task)
+    await task
+    await asyncio.sleep(0)
+
+    assert session.task is None
+    evict_expired(now=session.finished_at + 30)
+    assert get_session("finished") is session
+    evict_expired(now=session.finished_at + 61)
+    assert get_session("finished") is None
+
+
+def test_room_expiry_evicts_session_and_cap_is_enforced(monkeypatch):
+    monkeypatch.setenv("MAX_SESSIONS", "1")
+    for sid in list(state._sessions):
+        remove_session(sid)
+    session = create_session("capped", AgentConfig())
+    session.expires_at = time.time() + 3600
+
+    with pytest.raises(SessionLimitError):
+        create_session("overflow", AgentConfig())
+
+    session.expires_at = time.time() - 1
+    assert create_session("overflow", AgentConfig()) is not None
+    assert get_session("capped") is None
+
+
+@pytest.mark.anyio
+async def test_room_expiry_does_not_cut_a_live_call():
+    session = create_session("live-call", AgentConfig())
+    session.expires_at = time.time() - 1
+    task = asyncio.create_task(asyncio.sleep(60))
+    attach_task(session, task)
+
+    evict_expired()
+    assert get_session("live-call") is session and not task.cancelled()
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await asyncio.sleep(0)
+    evict_expired()
+    assert get_session("live-call") is None
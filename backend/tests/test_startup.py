@@ -0,0 +1,88 @@
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+
+from app import rag
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def fresh_init(monkeypatch, tmp_path):
+    monkeypatch.setattr(rag, "_init_task", None)
+    monkeypatch.setattr(rag, "_init_status", {"state": "idle", "error": None, "duration_ms": None})
+    monkeypatch.setenv("RAG_INIT_LOCK_PATH", str(tmp_path / "rag-init.lock"))
+
+
+@pytest.mark.anyio
+async def test_collection_seeds_in_the_background(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(rag, "init_collection", lambda: release.wait(5))
+
+    async def no_embed(texts):
+        raise AssertionError("retrieval should not run while seeding")
+
+    monkeypatch.setattr(rag, "_aembed", no_embed)
+    task = rag.start_init_collection()
+    assert rag.start_init_collection() is task
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/health")).status_code == 200
+        seeding = await client.get("/ready")
+        assert await rag.aretrieve("How do I top up?") == []
+        release.set()
+        await task
+        ready = await client.get("/ready")
+
+    assert seeding.status_code == 503 and seeding.json()["rag"]["state"] == "running"
+    assert ready.status_code == 200 and ready.json()["rag"]["state"] == "ready"
+
+
+@pytest.mark.anyio
+async def test_failed_init_is_reported_without_blocking_readiness(monkeypatch):
+    def broken():
+        raise ConnectionError("qdrant unreachable")
+
+    monkeypatch.setattr(rag, "init_collection", broken)
+    await rag.start_init_collection()
+
+    status = rag.init_status()
+    assert status["state"] == "failed" and "unreachable" in status["error"]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/ready")).status_code == 200
+
+
+def test_only_one_process_seeds_at_a_time(monkeypatch):
+    running, overlaps = [], []
+
+    def seed():
+        overlaps.append(bool(running))
+        running.append(1)
+        time.sleep(0.05)
+        running.pop()
+
+    monkeypatch.setattr(rag, "init_collection", seed)
+    # flock locks belong to the open file, so two threads stand in for two workers.
+    threads = [threading.Thread(target=rag.init_collection_locked) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [False, False]
+
+
+def test_api_module_does_not_import_the_bot_stack():
+    code = (
+        "import sys, app.main; "
+        "print(sorted({m.split('.')[0] for m in sys.modules} & {'pipecat', 'openai'}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
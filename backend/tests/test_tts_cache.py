@@ -0,0 +1,110 @@
+import asyncio
+import os
+
+import pytest
+
+from pipecat.frames.frames import TTSAudioRawFrame, TTSStartedFrame, TTSStoppedFrame, TTSTextFrame
+
+from app.tts_cache import CachedCartesiaTTSService, TTSAudioCache, prewarm_tts_cache, tts_key
+
+
+def test_key_depends_on_voice_settings_not_formatting():
+    key = tts_key("voice", 1.0, 0.3, 24000, "One moment, please.")
+    assert key == tts_key("voice", 1.0, 0.3, 24000, "  one MOMENT,   please. ")
+    assert key != tts_key("voice", 1.2, 0.3, 24000, "One moment, please.")
+    assert key != tts_key("other", 1.0, 0.3, 24000, "One moment, please.")
+    assert key != tts_key("voice", 1.0, 0.3, 16000, "One moment, please.")
+
+
+def test_memory_cache_evicts_least_recently_used_by_size():
+    cache = TTSAudioCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa" and cache.get("c") == b"cccc"
+    assert cache.stats()["bytes"] == 8
+    assert cache.evictions == 1
+
+
+def test_disk_cache_survives_restart_and_is_shared(tmp_path):
+    first = TTSAudioCache(max_bytes=10, path=str(tmp_path))
+    second = TTSAudioCache(max_bytes=10, path=str(tmp_path))
+    first.put("a", b"aaaa")
+
+    assert second.get("a") == b"aaaa"
+    first.put("b", b"bbbb")
+    first.put("c", b"cccc")
+    assert sorted(os.listdir(tmp_path)) == ["b.pcm", "c.pcm"]
+
+    restarted = TTSAudioCache(max_bytes=10, path=str(tmp_path))
+    assert len(restarted) == 2 and restarted.get("c") == b"cccc"
+
+
+@pytest.mark.anyio
+async def test_frequent_misses_are_filled_in_the_background():
+    cache = TTSAudioCache(admit_after=2)
+    calls = []
+
+    async def synthesize():
+        calls.append(1)
+        return b"\x01\x00" * 10
+
+    for _ in range(3):
+        if cache.get("k") is None and cache.note_miss("k"):
+            cache.fill("k", synthesize)
+    await cache.drain()
+
+    assert calls == [1]
+    assert cache.get("k") == b"\x01\x00" * 10
+    assert cache.stats()["fills"] == 1
+
+
+def _service(cache):
+    tts = CachedCartesiaTTSService(cache=cache, api_key="test", voice_id="voice")
+    tts._sample_rate = 16000
+    return tts
+
+
+@pytest.mark.anyio
+async def test_hit_is_queued_as_its_own_audio_context():
+    cache = TTSAudioCache()
+    tts = _service(cache)
+    tts._contexts_queue = asyncio.Queue()
+    audio = b"\x00\x01" * 4000
+    cache.put(tts.cache_key("Thanks for calling Zepliner."), audio)
+
+    yielded = [frame async for frame in tts.run_tts("Thanks for calling Zepliner. ")]
+
+    assert isinstance(yielded[0], TTSStartedFrame)
+    context = tts._contexts[await tts._contexts_queue.get()]
+    queued = []
+    while (frame := context.get_nowait()) is not None:
+        queued.append(frame)
+    assert isinstance(queued[0], TTSTextFrame)
+    assert queued[0].text == "Thanks for calling Zepliner."
+    assert isinstance(queued[-1], TTSStoppedFrame)
+    chunks = [f for f in queued if isinstance(f, TTSAudioRawFrame)]
+    assert b"".join(f.audio for f in chunks) == audio
+    assert len(chunks) == 3
+
+
+@pytest.mark.anyio
+async def test_prewarm_synthesizes_only_missing_utterances(monkeypatch):
+    cache = TTSAudioCache()
+    tts = _service(cache)
+    synthesized = []
+
+    async def fake_synthesize(text, sample_rate):
+        synthesized.append((text, sample_rate))
+        return b"\x00\x00" * 100
+
+    monkeypatch.setattr(tts, "synthesize", fake_synthesize)
+    texts = ["Hi, how can I help?", "One moment."]
+
+    assert await prewarm_tts_cache(tts, texts, 24000) == 2
+    assert await prewarm_tts_cache(tts, texts, 24000) == 0
+    assert synthesized == [(t, 24000) for t in texts]
+    assert cache.get(tts.cache_key("One moment.", 24000)) is not None
@@ -0,0 +1,13 @@
+import numpy as np
+
+from app.vad import SharedSileroVADAnalyzer, load_vad_model
+
+
+def test_sessions_share_one_inference_session_but_not_state():
+    first = SharedSileroVADAnalyzer()
+    second = SharedSileroVADAnalyzer()
+
+    assert first._model.session is second._model.session is load_vad_model().session
+
+    first._model(np.ones(512, dtype=np.float32), 16000)
+    assert not np.array_equal(first._model._state, second._model._state)
@@ -0,0 +1,73 @@
+import numpy as np
+
+from app.vector_index import NumpyIndex
+
+
+def _corpus(n=200, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n, dim)).astype(np.float32)
+
+
+def test_topk_matches_bruteforce_cosine():
+    vectors = _corpus()
+    index = NumpyIndex()
+    index.upsert(list(range(len(vectors))), vectors, [{"i": i} for i in range(len(vectors))])
+
+    queries = _corpus(n=5, seed=1)
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    for query, hits in zip(queries, index.search_batch(queries, limit=4)):
+        expected = np.argsort(-(normed @ (query / np.linalg.norm(query))))[:4]
+        assert [h.id for h in hits] == list(expected)
+        assert hits[0].score >= hits[-1].score
+
+
+def test_upsert_replaces_and_delete_removes():
+    index = NumpyIndex()
+    index.upsert([1, 2], [[1.0, 0.0], [0.0, 1.0]], [{"a": 1}, {"a": 2}])
+    index.upsert([2], [[1.0, 0.1]], [{"a": "2b"}])
+    assert len(index) == 2
+    assert index.search([1.0, 0.0], limit=2)[1].payload == {"a": "2b"}
+
+    index.delete([1])
+    hits = index.search([1.0, 0.0], limit=5)
+    assert [h.id for h in hits] == [2]
+
+
+def test_repeated_ids_in_one_batch_keep_the_last_write():
+    index = NumpyIndex()
+    index.upsert([1, 1], [[1.0, 0.0], [0.0, 1.0]], [{"v": "old"}, {"v": "new"}])
+    index.upsert([2, 1, 2], [[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]], [{}, {"v": "newer"}, {}])
+
+    assert index.ids() == [1, 2]
+    assert index.payload(1) == {"v": "newer"}
+    assert index.search([0.0, 1.0], limit=1)[0].id == 1
+
+
+def test_persists_and_memory_maps(tmp_path):
+    index = NumpyIndex(path=str(tmp_path))
+    index.upsert([1, 2], [[1.0, 0.0], [0.0, 1.0]], [{"q": "x"}, {"q": "y"}])
+    assert not (tmp_path / "vectors.npy").exists()
+    index.flush()
+
+    reloaded = NumpyIndex(path=str(tmp_path))
+    assert isinstance(reloaded._matrix, np.memmap)
+    assert reloaded.search([0.1, 0.9], limit=1)[0].payload == {"q": "y"}
+
+    reloaded.upsert([3, 1], [[0.6, 0.8], [0.0, 1.0]], [{"q": "z"}, {"q": "x2"}])
+    reloaded.flush()
+    again = NumpyIndex(path=str(tmp_path))
+    assert again.ids() == [1, 2, 3] and again.payload(1) == {"q": "x2"}
+    assert again.search([0.0, 1.0], limit=1)[0].id in (1, 2)
+
+
+def test_upserts_write_in_place_until_the_buffer_is_full():
+    index = NumpyIndex()
+    index.upsert([0], [[1.0, 0.0]], [{}])
+    buffer = index._rows
+    for i in range(1, len(buffer)):
+        index.upsert([i], [[1.0, float(i)]], [{}])
+        assert index._rows is buffer
+    index.upsert([len(buffer)], [[0.0, 1.0]], [{}])
+
+    assert len(index._rows) == 2 * len(buffer)
+    assert index.search([0.0, 1.0], limit=1)[0].id == len(buffer)
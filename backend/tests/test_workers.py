@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from app import metrics
+from app.models import AgentConfig
+from app.workers import BotWorkerError, WorkerPool, WorkerPoolFullError
+
+
+def _pool(size=2, max_sessions=2):
+    return WorkerPool(
+        size=size,
+        max_sessions=max_sessions,
+        runner="bench.fakes:fake_run_bot",
+        initializer=None,
+        reporter="bench.fakes:fake_runtime_stats",
+        check_interval_secs=0.1,
+        report_interval_secs=0.1,
+    )
+
+
+def _start(pool, session_id, token, events):
+    return pool.start_bot(
+        session_id,
+        room_url="https://fake.daily.co/room",
+        token=token,
+        config=AgentConfig(),
+        on_state_change=lambda state: events.append(("state", state)),
+        on_latency=lambda ms: events.append(("latency", ms)),
+        on_error=lambda message: events.append(("error", message)),
+        on_stage_latency=lambda stages: events.append(("stages", stages)),
+    )
+
+
+@pytest.mark.anyio
+async def test_callbacks_are_relayed_from_worker_process():
+    pool = _pool()
+    pool.start()
+    try:
+        events = []
+        await asyncio.wait_for(_start(pool, "s1", "ok", events), timeout=30)
+
+        assert events == [
+            ("state", "listening"),
+            ("latency", 123),
+            ("stages", {"total_ms": 123}),
+            ("state", "idle"),
+        ]
+        assert pool.stats()["active"] == 0
+
+        with pytest.raises(BotWorkerError):
+            await asyncio.wait_for(_start(pool, "s2", "fail", []), timeout=30)
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.anyio
+async def test_sessions_go_to_least_loaded_worker_and_respect_cap():
+    pool = _pool(size=2, max_sessions=1)
+    pool.start()
+    try:
+        first = _start(pool, "s1", "hang", [])
+        second = _start(pool, "s2", "hang", [])
+        assert [w["active"] for w in pool.stats()["workers"]] == [1, 1]
+        assert not pool.has_capacity()
+        with pytest.raises(WorkerPoolFullError):
+            _start(pool, "s3", "hang", [])
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await asyncio.sleep(0)
+        assert pool.has_capacity()
+        second.cancel()
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.anyio
+async def test_dead_worker_fails_its_sessions_and_is_replaced():
+    pool = _pool(size=1)
+    pool.start()
+    try:
+        with pytest.raises(BotWorkerError):
+            await asyncio.wait_for(_start(pool, "s1", "crash", []), timeout=30)
+        assert pool.stats()["restarts"] == 1
+
+        await asyncio.wait_for(_start(pool, "s2", "ok", []), timeout=30)
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.anyio
+async def test_crash_is_detected_under_steady_event_traffic():
+    pool = _pool(size=2, max_sessions=1)
+    pool.start()
+    try:
+        events = []
+        chatty = _start(pool, "s1", "chatty", events)
+        with pytest.raises(BotWorkerError):
+            await asyncio.wait_for(_start(pool, "s2", "crash", []), timeout=30)
+
+        assert pool.stats()["restarts"] == 1
+        assert ("latency", 1) in events and not chatty.done()
+        chatty.cancel()
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.anyio
+async def test_workers_report_metrics_and_cache_stats():
+    pool = _pool(size=1)
+    pool.start()
+    try:
+        await asyncio.wait_for(_start(pool, "s1", "ok", []), timeout=30)
+        for _ in range(100):
+            if pool.worker_stats():
+                break
+            await asyncio.sleep(0.1)
+
+        assert pool.worker_stats() == {0: {"embedding_cache": {"hits": 3, "misses": 1}}}
+        assert "agent_rag_retrievals_total" in metrics._remote["bot-worker-0"]
+        for _ in range(100):
+            if pool.worker_load():
+                break
+            await asyncio.sleep(0.1)
+        [(lag_ms, cpu)] = pool.worker_load()
+        assert lag_ms >= 0 and cpu >= 0
+    finally:
+        await pool.stop()
+        metrics._remote.clear()
@@ -2,11 +2,17 @@
 
 import { PipecatClient } from "@pipecat-ai/client-js";
 import { DailyTransport } from "@pipecat-ai/daily-transport";
-import { useMutation, useQuery } from "@tanstack/react-query";
+import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
 import { useEffect, useMemo, useRef, useState } from "react";
 
 const backendUrl = process.env.NEXT_PUBLIC_BACKEND_URL || "http://localhost:8000";
 
+type BotStateData = {
+  state: string;
+  round_trip_latency_ms: number | null;
+  error_message?: string | null;
+};
+
 type AgentConfig = {
   llm: { system_prompt: string; temperature: number; max_tokens: number };
   stt: { temperature: number };
@@ -28,6 +34,8 @@ export default function Home() {
   const [token, setToken] = useState<string | null>(null);
   const [transportState, setTransportState] = useState<string>("idle");
   const [sessionError, setSessionError] = useState<string | null>(null);
+  const [streaming, setStreaming] = useState(false);
+  const queryClient = useQueryClient();
   const audioRef = useRef<HTMLAudioElement | null>(null);
   const clientRef = useRef<PipecatClient | null>(null);
   const [config, setConfig] = useState<AgentConfig>({
@@ -71,16 +79,41 @@ export default function Home() {
         return { state: "idle", round_trip_latency_ms: null, error_message: null };
       }
       if (!resp.ok) throw new Error("failed to fetch state");
-      return (await resp.json()) as {
-        state: string;
-        round_trip_latency_ms: number | null;
-        error_message?: string | null;
-      };
+      return (await resp.json()) as BotStateData;
     },
     enabled: !!sessionId,
-    refetchInterval: 500,
+    // Poll only while the push stream is unavailable.
+    refetchInterval: streaming ? false : 500,
   });
 
+  useEffect(() => {
+    if (!sessionId || typeof EventSource === "undefined") return;
+
+    const source = new EventSource(`${backendUrl}/sessions/${sessionId}/events`);
+    const onEvent = (event: MessageEvent) => {
+      const data = JSON.parse(event.data) as BotStateData;
+      queryClient.setQueryData(["state", sessionId], {
+        state: data.state,
+        round_trip_latency_ms: data.round_trip_latency_ms,
+        error_message: data.error_message,
+      });
+    };
+    for (const type of ["snapshot", "state", "latency", "stages", "error", "ended"]) {
+      source.addEventListener(type, onEvent as EventListener);
+    }
+    source.onopen = () => setStreaming(true);
+    source.onerror = () => {
+      // Fall back to polling; the poll also detects expired sessions (404).
+      setStreaming(false);
+      source.close();
+    };
+
+    return () => {
+      source.close();
+      setStreaming(false);
+    };
+  }, [sessionId, queryClient]);
+
   const botState = stateQuery.data?.state || "idle";
   const latency = stateQuery.data?.round_trip_latency_ms;
   const errorMessage = stateQuery.data?.error_message;